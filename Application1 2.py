@@ -1,16 +1,47 @@
 import streamlit as st
-import requests
-import json
+import collections
 import re
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import base64
-import random
+import hashlib
+import mimetypes
+import os
+
+from analysis_engine import (
+    API_CONFIGS,
+    VUIA_MAPPING,
+    answer_score,
+    cancel_job,
+    clear_response_cache,
+    find_resumable_analysis,
+    get_circuit_stats,
+    get_header_negotiation_stats,
+    get_hedging_stats,
+    get_http_pool_stats,
+    get_import_stats,
+    get_response_cache_stats,
+    get_job,
+    get_limiter_stats,
+    get_output_store_stats,
+    get_process_memory,
+    get_structured_score_stats,
+    is_job_finished,
+    reopen_checkpoint,
+    strip_score_block,
+    submit_analysis_job,
+    summary_scores,
+    wait_for_job_update,
+)
 
 # ----------------------------- CONFIG -----------------------------
-TENANT_ID = "talos"
-AUTH_TOKEN = None
-HEADERS_BASE = {"Content-Type": "application/json"}
+JOB_POLL_SECONDS = 0.5        # Longest wait for a job update before the page sends a heartbeat - updates wake it at once
+ANSWER_MARKDOWN_CACHE_SIZE = 240  # Formatted question answers kept across reruns and sessions - 12 per analysis
+PAGE_FRAGMENT_CACHE_SIZE = 20     # Analyses whose page cards are kept built, shared by every session - each holds its output texts
+RENDER_TIMING_WINDOW = 50     # Recent render timings kept per region for the sidebar
+
+# Bundled stylesheet and logo - read once and inlined into the page
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+LOGO_FILE = "musigma_logo.svg"  # Sidebar logo under static/ - its type is taken from the extension
 
 # Customer-Industry Mapping
 CUSTOMER_INDUSTRY_MAP = {
@@ -111,410 +142,7 @@ CUSTOMER_INDUSTRY_MAP = {
 ACCOUNTS = ["Select Customer"] + list(CUSTOMER_INDUSTRY_MAP.keys())
 INDUSTRIES = ["Select Industry"] + list(set(CUSTOMER_INDUSTRY_MAP.values()))
 
-API_CONFIGS = [
-    {
-        "name": "vocabulary",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758548233201&level=1",
-        "multiround_convo": 3,
-        "description": "Extract Vocabulary",
-        "prompt": lambda problem, outputs: f"{problem}\n\nExtract the vocabulary from this problem statement."
-    },
-    {
-        "name": "current_system",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758549095254&level=1",
-        "multiround_convo": 2,
-        "description": "Describe Current System",
-        "prompt": lambda problem, outputs: f"Problem statement - {problem}\n\nContext from vocabulary:\n{outputs.get('vocabulary','')}\n\nDescribe the current system, inputs, outputs, and pain points."
-    },
-    {
-        "name": "Q1",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758555344231&level=1",
-        "multiround_convo": 2,
-        "description": "Q1. What is the frequency and pace of change in the key inputs driving the business?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q1. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "Q2",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758549615986&level=1",
-        "multiround_convo": 2,
-        "description": "Q2. To what extent are these changes cyclical and predictable versus sporadic and unpredictable?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q2. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "Q3",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758614550482&level=1",
-        "multiround_convo": 2,
-        "description": "Q3. How resilient is the current system in absorbing these changes without requiring significant rework or disruption?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q3. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "Q4",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758614809984&level=1",
-        "multiround_convo": 2,
-        "description": "Q4. To what extent do stakeholders share a common understanding of the key terms and concepts?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q4. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "Q5",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758615038050&level=1",
-        "multiround_convo": 2,
-        "description": "Q5. Are there any conflicting definitions or interpretations that could create confusion?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q5. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "Q6",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758615386880&level=1",
-        "multiround_convo": 2,
-        "description": "Q6. Are objectives, priorities, and constraints clearly communicated and well-defined?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q6. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "Q7",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758615778653&level=1",
-        "multiround_convo": 2,
-        "description": "Q7. To what extent are key inputs interdependent?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q7. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "Q8",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758616081630&level=1",
-        "multiround_convo": 2,
-        "description": "Q8. How well are the governing rules, functions, and relationships between inputs understood?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q8. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "Q9",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758616793510&level=1",
-        "multiround_convo": 2,
-        "description": "Q9. Are there any hidden or latent dependencies that could impact outcomes?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q9. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "Q10",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758617140479&level=1",
-        "multiround_convo": 2,
-        "description": "Q10. Are there hidden or latent dependencies that could affect outcomes?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q10. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "Q11",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758618137301&level=1",
-        "multiround_convo": 2,
-        "description": "Q11. Are feedback loops insufficient or missing, limiting our ability to adapt?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q11. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "Q12",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758619317968&level=1",
-        "multiround_convo": 2,
-        "description": "Q12. Do we lack established benchmarks or 'gold standards' to validate results?",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\nContext from Current System:\n{outputs.get('current_system','')}\n\n"
-            "Q12. Provide detailed analysis, score 0–5, and justification."
-        )
-    },
-    {
-        "name": "hardness_summary",
-        "url": "https://eoc.mu-sigma.com/talos-engine/agency/reasoning_api?society_id=1757657318406&agency_id=1758619658634&level=1",
-        "multiround_convo": 2,
-        "description": "Hardness Level, Summary & Key Takeaways",
-        "prompt": lambda problem, outputs: (
-            f"Problem statement - {problem}\n\n"
-            "Context from all previous analysis:\n"
-            f"Current System:\n{outputs.get('current_system','')}\n"
-            f"Q1:\n{outputs.get('Q1','')}\n"
-            f"Q2:\n{outputs.get('Q2','')}\n"
-            f"Q3:\n{outputs.get('Q3','')}\n"
-            f"Q4:\n{outputs.get('Q4','')}\n"
-            f"Q5:\n{outputs.get('Q5','')}\n"
-            f"Q6:\n{outputs.get('Q6','')}\n"
-            f"Q7:\n{outputs.get('Q7','')}\n"
-            f"Q8:\n{outputs.get('Q8','')}\n"
-            f"Q9:\n{outputs.get('Q9','')}\n"
-            f"Q10:\n{outputs.get('Q10','')}\n"
-            f"Q11:\n{outputs.get('Q11','')}\n"
-            f"Q12:\n{outputs.get('Q12','')}\n\n"
-            "Provide Hardness Score, Level, Summary & Key Takeaways."
-        )
-    }
-]
-
-# VUIA Dimension to Questions Mapping
-VUIA_MAPPING = {
-    "Volatility": ["Q1", "Q2", "Q3"],
-    "Ambiguity": ["Q4", "Q5", "Q6"],
-    "Interconnectedness": ["Q7", "Q8", "Q9"],
-    "Uncertainty": ["Q10", "Q11", "Q12"]
-}
-
 # ----------------------------- UTILITY FUNCTIONS -----------------------------
-def json_to_text(data):
-    """Convert JSON response to readable text"""
-    if data is None: 
-        return ""
-    if isinstance(data, str): 
-        return data
-    if isinstance(data, dict):
-        for key in ("result", "output", "content", "text"):
-            if key in data and data[key]:
-                return json_to_text(data[key])
-        if "data" in data: 
-            return json_to_text(data["data"])
-        return "\n".join(f"{k}: {json_to_text(v)}" for k, v in data.items() if v)
-    if isinstance(data, list): 
-        return "\n".join(json_to_text(x) for x in data if x)
-    return str(data)
-
-def clean_output(text):
-    """
-    Remove Markdown headers like ###, ##, # and leading/trailing whitespace
-    """
-    if not text:
-        return ""
-    text = re.sub(r"^#{1,6}\s*", "", text, flags=re.MULTILINE)
-    return text.strip()
-
-def call_api(api_cfg, problem_text, outputs, tenant_id=TENANT_ID, auth_token=AUTH_TOKEN, tries=3):
-    """Calls the API with retry logic - CORRECTED VERSION"""
-    prompt = api_cfg["prompt"](problem_text, outputs)
-    
-    headers_list = []
-    base = HEADERS_BASE.copy()
-    if tenant_id:
-        headers_list = [
-            dict(base, **{"Tenant-ID": tenant_id}), 
-            dict(base, **{"X-Tenant-ID": tenant_id})
-        ]
-    else:
-        headers_list = [base]
-    if auth_token:
-        headers_list = [dict(h, **{"Authorization": f"Bearer {auth_token}"}) for h in headers_list]
-
-    last_err = None
-    for attempt in range(1, tries + 1):
-        for headers in headers_list:
-            try:
-                # CORRECT PAYLOAD STRUCTURE
-                payload = {
-                    "agency_goal": prompt,  # This is the key fix!
-                    "multiround_convo": api_cfg.get("multiround_convo", 1),
-                    "user_id": "talos-rest-endpoint"
-                }
-                
-                resp = requests.post(api_cfg["url"], headers=headers, json=payload, timeout=60)
-                
-                if resp.status_code == 200:
-                    res = json_to_text(resp.json())
-                    # Handle multiround conversation if needed
-                    for r in range(1, api_cfg.get("multiround_convo", 1)):
-                        # For subsequent rounds, use the previous response as the prompt
-                        next_payload = {
-                            "agency_goal": res,
-                            "multiround_convo": 1,
-                            "user_id": "talos-rest-endpoint"
-                        }
-                        resp2 = requests.post(api_cfg["url"], headers=headers, json=next_payload, timeout=60)
-                        if resp2.status_code == 200:
-                            res = json_to_text(resp2.json())
-                    return res
-                else:
-                    last_err = f"{resp.status_code}-{resp.text}"
-            except Exception as e:
-                last_err = str(e)
-        time.sleep(1 + attempt * 0.5)
-    return f"API failed after {tries} attempts. Last error: {last_err}"
-
-def extract_difficulty_score(text):
-    """Extract overall difficulty score from text (0-5 scale) - prioritize calculated score"""
-    # First, try to find the calculated overall score from the comprehensive summary
-    calculated_patterns = [
-        r"Overall Difficulty Score\s*=\s*[\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\s*\/\s*4\s*=\s*(\d+\.\d+)",
-        r"Overall.*?Score.*?=\s*\([\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\)\s*\/\s*4\s*=\s*(\d+\.\d+)",
-        r"Overall Difficulty Score.*?=\s*(\d+\.\d+)",
-        r"≈\s*(\d+\.\d+)",  # The approximate symbol in "≈ 3.67"
-        r"Overall.*?Score.*?(\d+\.\d+)\s*\(.*?\)",  # "3.67 (Moderate)"
-    ]
-    
-    for pattern in calculated_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            try:
-                score = float(match.group(1))
-                return min(5, max(0, score))
-            except ValueError:
-                continue
-    
-    # Fallback to other patterns if calculated score not found
-    patterns = [
-        r"Overall Difficulty Score.*?=.*?(\d+\.\d+)",
-        r"Overall.*?Difficulty.*?Score.*?(\d+\.\d+)",
-        r"difficulty score.*?(\d+\.\d+)",
-        r"Score.*?(\d+\.\d+)\s*\/\s*5",
-        r"(\d+\.\d+)\s*out of\s*5",
-        r"Hardness[:\s]*(\d+(?:\.\d+)?)",
-        r"Overall.*?Score.*?(\d+\.\d+)",
-        r"Difficulty[:\s]*(\d+\.\d+)",
-        r"Final Score[:\s]*(\d+\.\d+)"
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            try:
-                score = float(match.group(1))
-                return min(5, max(0, score))
-            except ValueError:
-                continue
-    
-    # If no score found, calculate from dimension scores
-    dimension_scores = extract_dimension_scores(text)
-    if any(score > 0 for score in dimension_scores.values()):
-        overall_score = sum(dimension_scores.values()) / len(dimension_scores)
-        return min(5, max(0, overall_score))
-    
-    return 0.0
-
-def extract_dimension_scores(text):
-    """Extract VUIA dimension scores from the analysis text with decimal support"""
-    scores = {
-        "Volatility": 0.0,
-        "Ambiguity": 0.0, 
-        "Interconnectedness": 0.0,
-        "Uncertainty": 0.0
-    }
-    
-    # First try to extract calculated averages
-    avg_patterns = {
-        "Volatility": [
-            r"Avg Volatility\s*=\s*\([\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\)\s*\/\s*3\s*=\s*(\d+\.\d+)",
-            r"Avg.*?Volatility.*?=\s*(\d+\.\d+)",
-            r"Volatility.*?average.*?(\d+\.\d+)"
-        ],
-        "Ambiguity": [
-            r"Avg Ambiguity\s*=\s*\([\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\)\s*\/\s*3\s*=\s*(\d+\.\d+)",
-            r"Avg.*?Ambiguity.*?=\s*(\d+\.\d+)",
-            r"Ambiguity.*?average.*?(\d+\.\d+)"
-        ],
-        "Interconnectedness": [
-            r"Avg Interconnectedness\s*=\s*\([\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\)\s*\/\s*3\s*=\s*(\d+\.\d+)",
-            r"Avg.*?Interconnectedness.*?=\s*(\d+\.\d+)",
-            r"Interconnectedness.*?average.*?(\d+\.\d+)"
-        ],
-        "Uncertainty": [
-            r"Avg Uncertainty\s*=\s*\([\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\)\s*\/\s*3\s*=\s*(\d+\.\d+)",
-            r"Avg.*?Uncertainty.*?=\s*(\d+\.\d+)",
-            r"Uncertainty.*?average.*?(\d+\.\d+)"
-        ]
-    }
-    
-    # Try to get calculated averages first
-    for dimension, pattern_list in avg_patterns.items():
-        for pattern in pattern_list:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    score = float(match.group(1))
-                    scores[dimension] = score
-                    break
-                except ValueError:
-                    continue
-    
-    # If we didn't get all averages, fall back to individual dimension patterns
-    if not all(scores.values()):
-        individual_patterns = {
-            "Volatility": [
-                r"Volatility\s*\(V\):\s*(\d+\.\d+)",
-                r"Volatility.*?[Vv]:\s*(\d+\.\d+)",
-                r"Volatility.*?(\d+\.\d+)",
-                r"V:\s*(\d+\.\d+)"
-            ],
-            "Ambiguity": [
-                r"Ambiguity\s*\(A\):\s*(\d+\.\d+)",
-                r"Ambiguity.*?[Aa]:\s*(\d+\.\d+)",
-                r"Ambiguity.*?(\d+\.\d+)",
-                r"A:\s*(\d+\.\d+)"
-            ],
-            "Interconnectedness": [
-                r"Interconnectedness\s*\(I\):\s*(\d+\.\d+)",
-                r"Interconnectedness.*?[Ii]:\s*(\d+\.\d+)",
-                r"Interconnectedness.*?(\d+\.\d+)",
-                r"I:\s*(\d+\.\d+)"
-            ],
-            "Uncertainty": [
-                r"Uncertainty\s*\(U\):\s*(\d+\.\d+)",
-                r"Uncertainty.*?[Uu]:\s*(\d+\.\d+)",
-                r"Uncertainty.*?(\d+\.\d+)",
-                r"U:\s*(\d+\.\d+)"
-            ]
-        }
-        
-        for dimension, pattern_list in individual_patterns.items():
-            if scores[dimension] == 0.0:  # Only if we didn't get it from averages
-                for pattern in pattern_list:
-                    match = re.search(pattern, text, re.IGNORECASE)
-                    if match:
-                        try:
-                            score = float(match.group(1))
-                            scores[dimension] = score
-                            break
-                        except ValueError:
-                            continue
-    
-    return scores
-
-def extract_individual_scores(text):
-    """Extract individual question scores from the analysis text"""
-    scores = {}
-    for i in range(1, 13):
-        patterns = [
-            rf"Q{i}.*?[Ss]core.*?(\d+\.\d+)",
-            rf"Question {i}.*?[Ss]core.*?(\d+\.\d+)",
-            rf"Score.*?Q{i}.*?(\d+\.\d+)",
-            rf"Q{i}.*?(\d+\.\d+)\s*\/\s*5",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    scores[f"Q{i}"] = float(match.group(1))  # Return exact decimal without rounding
-                    break
-                except ValueError:
-                    continue
-    return scores
-
 def get_difficulty_level(score):
     """Get difficulty level based on the new ranges"""
     if score <= 3.0:
@@ -524,18 +152,24 @@ def get_difficulty_level(score):
     else:
         return "Hard", "#F44336", "🔴"
 
+def difficulty_card_html(score):
+    """Build the Overall Difficulty Score card"""
+    difficulty_level, level_color, level_emoji = get_difficulty_level(score)
+    return f"""
+    <div class="difficulty-card">
+        <h2 style="margin: 0; font-size: 4rem; font-weight: 800; text-shadow: 0 4px 8px rgba(0,0,0,0.2);">{score:.2f}<span style="font-size: 2rem; opacity: 0.8;">/5</span></h2>
+        <p style="margin: 15px 0; font-size: 1.3rem; font-weight: 600;">Overall Difficulty Score</p>
+        <div style="margin: 25px 0;">
+            <span style="font-size: 1.4rem; font-weight: bold; color: {level_color}; padding: 12px 24px; background: rgba(255,255,255,0.2); border-radius: 25px; backdrop-filter: blur(10px); border: 2px solid rgba(255,255,255,0.3);">
+                {level_emoji} {difficulty_level}
+            </span>
+        </div>
+    </div>
+    """
+
 def reset_application():
     """Reset all session state variables to their initial values"""
-    st.session_state.outputs = {}
-    st.session_state.analysis_complete = False
-    st.session_state.difficulty_score = 0.0
-    st.session_state.dimension_scores = {
-        "Volatility": 0.0,
-        "Ambiguity": 0.0,
-        "Interconnectedness": 0.0,
-        "Uncertainty": 0.0
-    }
-    st.session_state.individual_scores = {}
+    st.session_state.result = None
     st.session_state.current_page = "Page 1: Input"
     st.session_state.problem_statement = ""
     st.session_state.customer = "Select Customer"
@@ -546,6 +180,7 @@ def reset_application():
     st.session_state.show_vocabulary = False
     st.session_state.last_customer = ""
     st.session_state.last_problem = ""
+    cancel_analysis_job()
     
     # Also clear any input-specific session states
     if 'page1_customer' in st.session_state:
@@ -555,28 +190,32 @@ def reset_application():
     if 'page1_problem' in st.session_state:
         del st.session_state.page1_problem
 
-# ----------------------------- PAGE CONFIG -----------------------------
-# Create a unique favicon (brain with network connections)
-favicon_svg = """
-<svg width="32" height="32" viewBox="0 0 32 32" xmlns="http://www.w3.org/2000/svg">
-    <defs>
-        <linearGradient id="brainGradient" x1="0%" y1="0%" x2="100%" y2="100%">
-            <stop offset="0%" stop-color="#667eea"/>
-            <stop offset="100%" stop-color="#764ba2"/>
-        </linearGradient>
-    </defs>
-    <circle cx="16" cy="16" r="14" fill="url(#brainGradient)" opacity="0.9"/>
-    <path d="M11 12 C11 10, 13 8, 16 8 C19 8, 21 10, 21 12 C21 14, 19 16, 16 16 C13 16, 11 14, 11 12" fill="white" opacity="0.8"/>
-    <path d="M11 20 C11 18, 13 16, 16 16 C19 16, 21 18, 21 20 C21 22, 19 24, 16 24 C13 24, 11 22, 11 20" fill="white" opacity="0.8"/>
-    <circle cx="14" cy="12" r="1" fill="#667eea"/>
-    <circle cx="18" cy="12" r="1" fill="#667eea"/>
-    <path d="M8 10 L6 8 M8 14 L6 16 M8 18 L6 20 M8 22 L6 24" stroke="white" stroke-width="1.5" opacity="0.7"/>
-    <path d="M24 10 L26 8 M24 14 L26 16 M24 18 L26 20 M24 22 L26 24" stroke="white" stroke-width="1.5" opacity="0.7"/>
-</svg>
-"""
+def cancel_analysis_job():
+    """Cancel the job this session is following, so it stops calling agencies and frees its job slot"""
+    cancel_job(st.session_state.get('analysis_job_id'))
+    st.session_state.analysis_job_id = None
+
+def go_to_page(page_key):
+    """Navigation button callback - runs before the rerun, so only the page being opened is rendered"""
+    st.session_state.current_page = page_key
+
+def view_detailed_analysis():
+    go_to_page("Page 2: Analysis")
+    st.session_state.show_results_button = False
+
+def record_render_time(region, started):
+    """Add how long a region took to render since started, a time.perf_counter() value, to its recent timings"""
+    timings = st.session_state.render_timings.setdefault(region, collections.deque(maxlen=RENDER_TIMING_WINDOW))
+    timings.append(time.perf_counter() - started)
+
+def record_click_to_render(region):
+    """Record the time from the click callback that started this rerun to the end of the region's render"""
+    clicked = st.session_state.pop("clicked_at", None)
+    if clicked is not None:
+        record_render_time(region, clicked)
 
-# Convert SVG to base64 for favicon
-favicon_b64 = base64.b64encode(favicon_svg.encode('utf-8')).decode()
+# ----------------------------- PAGE CONFIG -----------------------------
+RUN_STARTED = time.perf_counter()  # Start of this script run - full reruns are timed against fragment reruns
 
 st.set_page_config(
     page_title="Business Problem Analyzer", 
@@ -585,23 +224,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# The VUIA cards and vocabulary toggle rerun as st.fragment, which needs Streamlit 1.37 or later
+if not hasattr(st, "fragment"):
+    st.error(f"This app needs Streamlit 1.37 or later, but {st.__version__} is installed - "
+             "run pip install --upgrade \"streamlit>=1.37\".")
+    st.stop()
+
 # ----------------------------- SESSION STATE -----------------------------
 # Initialize all session state variables with proper default values
-if 'outputs' not in st.session_state:
-    st.session_state.outputs = {}
-if 'analysis_complete' not in st.session_state:
-    st.session_state.analysis_complete = False
-if 'difficulty_score' not in st.session_state:
-    st.session_state.difficulty_score = 0.0
-if 'dimension_scores' not in st.session_state:
-    st.session_state.dimension_scores = {
-        "Volatility": 0.0,
-        "Ambiguity": 0.0,
-        "Interconnectedness": 0.0,
-        "Uncertainty": 0.0
-    }
-if 'individual_scores' not in st.session_state:
-    st.session_state.individual_scores = {}
+if 'result' not in st.session_state:
+    st.session_state.result = None  # AnalysisResult of the finished analysis - None until one completes
+if 'render_timings' not in st.session_state:
+    st.session_state.render_timings = {}
 if 'current_page' not in st.session_state:
     st.session_state.current_page = "Page 1: Input"
 if 'problem_statement' not in st.session_state:
@@ -618,479 +252,258 @@ if 'show_results_button' not in st.session_state:
     st.session_state.show_results_button = False
 if 'show_vocabulary' not in st.session_state:
     st.session_state.show_vocabulary = False
+if 'stream_results' not in st.session_state:
+    st.session_state.stream_results = True
+if 'use_response_cache' not in st.session_state:
+    st.session_state.use_response_cache = True
+if 'analysis_job_id' not in st.session_state:
+    st.session_state.analysis_job_id = None
 if 'last_customer' not in st.session_state:
     st.session_state.last_customer = ""
 if 'last_problem' not in st.session_state:
     st.session_state.last_problem = ""
+if 'outputs_checked' not in st.session_state:
+    st.session_state.outputs_checked = None  # The result whose stored outputs were last checked
+if 'missing_stages' not in st.session_state:
+    st.session_state.missing_stages = []
+
+# ----------------------------- STATIC ASSETS -----------------------------
+@st.cache_resource(show_spinner=False)
+def stylesheet_html():
+    """
+    The bundled stylesheet as one minified <style> tag, read and built once per process - Streamlit's
+    cache outlives the rerun, where an lru_cache would be rebuilt with the script each time.
+    Streamlit only serves images and fonts from static/ with their real content type, so the
+    CSS cannot be linked - it is still sent with each run, but as a fixed, smaller string.
+    """
+    with open(os.path.join(STATIC_DIR, "app.css"), encoding="utf-8") as f:
+        css = f.read()
+    fingerprint = hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};])\s*", r"\1", css).strip()
+    return f'<style id="app-css-{fingerprint}">{css}</style>'
+
+@st.cache_resource(show_spinner=False)
+def logo_data_uri():
+    """
+    The bundled sidebar logo as a base64 data URI, read once per process - the page needs no
+    request to an outside host to show it.
+    """
+    with open(os.path.join(STATIC_DIR, LOGO_FILE), "rb") as f:
+        data = base64.b64encode(f.read()).decode("ascii")
+    mime_type = mimetypes.guess_type(LOGO_FILE)[0] or "application/octet-stream"
+    return f"data:{mime_type};base64,{data}"
+
+st.markdown(stylesheet_html(), unsafe_allow_html=True)
+
+# ----------------------------- RENDER CACHE -----------------------------
+# Subtitles of the Page 1 VUIA score cards
+DIMENSION_CARD_SUBTITLES = {
+    "Volatility": "Change frequency & pace",
+    "Uncertainty": "Predictability & patterns",
+    "Interconnectedness": "System dependencies",
+    "Ambiguity": "Clarity & definitions"
+}
+
+def dimension_card_html(dimension, score):
+    """Build a Page 1 VUIA score card"""
+    level, color, emoji = get_difficulty_level(score)
+    css_name = dimension.lower()
+    return f"""
+            <div class="dimension-card {css_name}-card" style="text-align: center; padding: 25px; margin: 10px 0;">
+                <div class="score-circle {css_name}-score">{score:.2f}</div>
+                <h3 style="margin: 15px 0 10px 0; color: #333;">{get_dimension_icon(dimension)} {dimension}</h3>
+                <p style="margin: 5px 0; color: #666; font-size: 0.9rem;">{DIMENSION_CARD_SUBTITLES[dimension]}</p>
+                <div style="margin-top: 10px;">
+                    <span style="color: {color}; font-weight: 600; font-size: 1.1rem;">
+                        {emoji} {level}
+                    </span>
+                </div>
+            </div>
+            """
+
+def summary_cards_html(score, dimension_scores):
+    """Build the Page 4 Overall Score and Primary Challenge cards"""
+    difficulty_level, level_color, level_emoji = get_difficulty_level(score)
+    highest_dimension = max(dimension_scores, key=dimension_scores.get)
+    highest_score = dimension_scores[highest_dimension]
+    highest_level, highest_color, highest_emoji = get_difficulty_level(highest_score)
+    overall = f"""
+        <div class="summary-card executive-summary">
+            <h4 style="color: #667eea; margin-bottom: 15px;">🏆 Overall Score</h4>
+            <div style="text-align: center;">
+                <div style="font-size: 3rem; font-weight: 800; color: {level_color}; margin: 10px 0;">{score:.2f}<span style="font-size: 1.5rem; opacity: 0.8;">/5</span></div>
+                <div style="font-size: 1.2rem; color: {level_color}; font-weight: 600;">{difficulty_level}</div>
+            </div>
+        </div>
+        """
+    primary = f"""
+        <div class="summary-card executive-summary">
+            <h4 style="color: #667eea; margin-bottom: 15px;">📈 Primary Challenge</h4>
+            <div style="text-align: center;">
+                <div style="font-size: 2rem; font-weight: 800; color: #333; margin: 10px 0;">{highest_dimension}</div>
+                <div style="font-size: 1.5rem; color: {highest_color}; font-weight: 600;">{highest_score:.2f}<span style="font-size: 1rem; opacity: 0.8;">/5</span></div>
+                <div style="font-size: 1rem; color: #666;">{highest_level}</div>
+            </div>
+        </div>
+        """
+    return overall, primary
+
+def dimension_bars_html(dimension_scores):
+    """Build the Page 4 dimension score bars"""
+    dimensions = ["Volatility", "Uncertainty", "Interconnectedness", "Ambiguity"]
+    colors = ["#ff6b6b", "#96ceb4", "#45b7d1", "#4ecdc4"]
+    icons = ["🌪️", "❓", "🕸️", "🎭"]
+    
+    bars = []
+    for dimension, color, icon in zip(dimensions, colors, icons):
+        score = dimension_scores[dimension]
+        percentage = (score / 5) * 100
+        level, level_color, level_emoji = get_difficulty_level(score)
+        
+        bars.append(f"""
+            <div style="margin: 20px 0;">
+                <div style="display: flex; justify-content: between; align-items: center; margin-bottom: 8px;">
+                    <span style="font-weight: 600; color: #333; font-size: 1.1rem;">
+                        {icon} {dimension}
+                    </span>
+                    <span style="font-weight: 700; color: {color}; font-size: 1.2rem;">
+                        {score:.2f}<span style="font-size: 0.9rem; opacity: 0.8;">/5</span>
+                    </span>
+                </div>
+                <div style="font-size: 0.9rem; color: #666; margin-bottom: 5px;">{level}</div>
+                <div class="progress-container">
+                    <div class="progress-bar" style="width: {percentage}%; background: {color};"></div>
+                </div>
+            </div>
+            """)
+    return bars
+
+def complexity_insights_html(score, dimension_scores):
+    """Build the Page 4 Complexity Insights and Strategic Insight cards"""
+    if score <= 3.0:
+        recommendation = "This problem can be addressed with standard solutions and minimal organizational changes."
+    elif score <= 4.0:
+        recommendation = "This problem requires careful planning and may involve cross-functional coordination."
+    else:
+        recommendation = "This problem demands significant organizational changes and strategic intervention."
+    
+    avg_score = sum(dimension_scores.values()) / len(dimension_scores)
+    insights = f"""
+        <div class="summary-card executive-summary">
+            <h5 style="color: #667eea; margin-bottom: 15px;">📊 Complexity Insights</h5>
+            <div style="margin: 15px 0;">
+                <div style="display: flex; justify-content: space-between; margin: 10px 0;">
+                    <span>Average Dimension Score:</span>
+                    <span style="font-weight: 700; color: #667eea;">{avg_score:.2f}<span style="font-size: 0.8rem; opacity: 0.8;">/5</span></span>
+                </div>
+                <div style="display: flex; justify-content: space-between; margin: 10px 0;">
+                    <span>Highest Dimension:</span>
+                    <span style="font-weight: 700; color: #ff6b6b;">{max(dimension_scores, key=dimension_scores.get)}</span>
+                </div>
+                <div style="display: flex; justify-content: space-between; margin: 10px 0;">
+                    <span>Lowest Dimension:</span>
+                    <span style="font-weight: 700; color: #4ecdc4;">{min(dimension_scores, key=dimension_scores.get)}</span>
+                </div>
+            </div>
+        </div>
+        """
+    strategic = f"""
+        <div class="summary-card executive-summary">
+            <h5 style="color: #667eea; margin-bottom: 15px;">💡 Strategic Insight</h5>
+            <div style="color: #666; line-height: 1.6; font-size: 0.95rem;">
+                {recommendation}
+            </div>
+        </div>
+        """
+    return insights, strategic
+
+def recommendations_html(score, dimension_scores):
+    """Build the Page 4 overall recommendation and Priority Focus Area cards"""
+    if score <= 3.0:
+        recommendation = """
+            <div class="analysis-card" style="border-left-color: #4CAF50;">
+                <h4 style="color: #4CAF50;">🟢 Low Complexity Recommendation</h4>
+                <p>This problem can be addressed with standard solutions and minimal organizational changes. Focus on:</p>
+                <ul>
+                    <li>Implementing best practices</li>
+                    <li>Leveraging existing frameworks</li>
+                    <li>Minimal process adjustments</li>
+                </ul>
+            </div>
+            """
+    elif score <= 4.0:
+        recommendation = """
+            <div class="analysis-card" style="border-left-color: #FF9800;">
+                <h4 style="color: #FF9800;">🟡 Moderate Complexity Recommendation</h4>
+                <p>This problem requires careful planning and may involve cross-functional coordination. Consider:</p>
+                <ul>
+                    <li>Structured project management</li>
+                    <li>Cross-departmental collaboration</li>
+                    <li>Phased implementation approach</li>
+                </ul>
+            </div>
+            """
+    else:
+        recommendation = """
+            <div class="analysis-card" style="border-left-color: #F44336;">
+                <h4 style="color: #F44336;">🔴 High Complexity Recommendation</h4>
+                <p>This problem demands significant organizational changes and strategic intervention. Essential actions:</p>
+                <ul>
+                    <li>Executive sponsorship and oversight</li>
+                    <li>Comprehensive change management</li>
+                    <li>Significant resource allocation</li>
+                    <li>Long-term strategic planning</li>
+                </ul>
+            </div>
+            """
+    
+    # Dimension-specific recommendations
+    highest_dimension = max(dimension_scores, key=dimension_scores.get)
+    highest_score = dimension_scores[highest_dimension]
+    priority = f"""
+        <div class="analysis-card">
+            <h4>🎯 Priority Focus Area</h4>
+            <p>Your primary challenge is in <strong>{highest_dimension}</strong> with a score of {highest_score:.2f}/5.</p>
+            <p><strong>Recommended focus:</strong> {get_dimension_focus_recommendation(highest_dimension, highest_score)}</p>
+        </div>
+        """
+    return recommendation, priority
+
+@st.cache_resource(max_entries=PAGE_FRAGMENT_CACHE_SIZE, show_spinner=False)
+def build_page_fragments(fingerprint, _result):
+    """
+    Build the HTML of every page's analysis cards - none of it changes once the analysis is done.
+    Kept by Streamlit rather than an lru_cache, which the script would rebuild on every rerun, and
+    keyed by the result's fingerprint. The cards hold loaded output texts, so only a few analyses
+    are kept. The returned dict is shared by every session and must not be changed.
+    """
+    outputs, difficulty_score, dimension_scores = _result.outputs, _result.difficulty_score, _result.dimension_scores
+    summary_overall, summary_primary = summary_cards_html(difficulty_score, dimension_scores)
+    complexity_insights, strategic_insight = complexity_insights_html(difficulty_score, dimension_scores)
+    recommendation, priority_focus = recommendations_html(difficulty_score, dimension_scores)
+    return {
+        "difficulty_card": difficulty_card_html(difficulty_score),
+        "dimension_cards": {dimension: dimension_card_html(dimension, score)
+                            for dimension, score in dimension_scores.items()},
+        "current_system": f'<div class="analysis-card">{outputs["current_system"]}</div>'
+                          if outputs.get("current_system") else "",
+        "hardness_summary": f'<div class="analysis-card">{strip_score_block(outputs["hardness_summary"])}</div>'
+                            if outputs.get("hardness_summary") else "",
+        "summary_overall": summary_overall,
+        "summary_primary": summary_primary,
+        "dimension_bars": dimension_bars_html(dimension_scores),
+        "complexity_insights": complexity_insights,
+        "strategic_insight": strategic_insight,
+        "recommendation": recommendation,
+        "priority_focus": priority_focus
+    }
 
-# ----------------------------- CUSTOM CSS -----------------------------
-st.markdown(f"""
-<style>
-    /* Favicon */
-    link[rel="icon"] {{
-        type: image/svg+xml,
-        href: "data:image/svg+xml;base64,{favicon_b64}"
-    }}
-    
-    .main {{
-        background-color: #f8f9fa;
-        font-family: 'Inter', sans-serif;
-    }}
-    
-    /* Enhanced Cards with better shadows and transitions */
-    .analysis-card {{
-        background: white;
-        padding: 25px;
-        border-radius: 15px;
-        box-shadow: 0 6px 25px rgba(0,0,0,0.1);
-        margin-bottom: 25px;
-        border-left: 5px solid #667eea;
-        transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        border: 1px solid rgba(102, 126, 234, 0.1);
-        backdrop-filter: blur(10px);
-    }}
-    
-    .analysis-card:hover {{
-        transform: translateY(-8px);
-        box-shadow: 0 12px 40px rgba(102, 126, 234, 0.25);
-        border-left: 5px solid #764ba2;
-    }}
-    
-    .question-card {{
-        background: white;
-        padding: 20px;
-        border-radius: 12px;
-        box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-        margin-bottom: 15px;
-        border-left: 4px solid;
-        transition: all 0.3s ease;
-        border: 1px solid rgba(0,0,0,0.05);
-        position: relative;
-        overflow: hidden;
-    }}
-    
-    .question-card::before {{
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(102, 126, 234, 0.1), transparent);
-        transition: left 0.5s ease;
-    }}
-    
-    .question-card:hover::before {{
-        left: 100%;
-    }}
-    
-    .question-card:hover {{
-        transform: translateY(-5px) scale(1.02);
-        box-shadow: 0 8px 30px rgba(0,0,0,0.15);
-    }}
-    
-    .score-badge {{
-        background: linear-gradient(135deg, #667eea, #764ba2);
-        color: white;
-        padding: 8px 16px;
-        border-radius: 25px;
-        font-weight: bold;
-        font-size: 0.9rem;
-        display: inline-block;
-        margin-left: 10px;
-        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-        transition: all 0.3s ease;
-    }}
-    
-    .score-badge:hover {{
-        transform: scale(1.05);
-        box-shadow: 0 6px 20px rgba(102, 126, 234, 0.4);
-    }}
-    
-    /* Problem Display Card */
-    .problem-display-card {{
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 25px;
-        border-radius: 20px;
-        margin: 20px 0;
-        box-shadow: 0 12px 35px rgba(102, 126, 234, 0.4);
-        border: 2px solid rgba(255,255,255,0.3);
-        transition: all 0.4s ease;
-        position: relative;
-        overflow: hidden;
-    }}
-    
-    .problem-display-card::before {{
-        content: '';
-        position: absolute;
-        top: -50%;
-        left: -50%;
-        width: 200%;
-        height: 200%;
-        background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
-        transform: rotate(30deg);
-        transition: all 0.6s ease;
-    }}
-    
-    .problem-display-card:hover::before {{
-        transform: rotate(45deg) scale(1.1);
-    }}
-    
-    .problem-display-card:hover {{
-        transform: translateY(-5px);
-        box-shadow: 0 15px 45px rgba(102, 126, 234, 0.5);
-    }}
-    
-    /* Enhanced Dimension Cards */
-    .dimension-card {{
-        background: white;
-        padding: 30px;
-        border-radius: 20px;
-        box-shadow: 0 8px 30px rgba(0,0,0,0.12);
-        margin: 15px;
-        text-align: center;
-        transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        border-top: 5px solid;
-        cursor: pointer;
-        border: 1px solid rgba(0,0,0,0.05);
-        position: relative;
-        overflow: hidden;
-    }}
-    
-    .dimension-card::after {{
-        content: '';
-        position: absolute;
-        bottom: 0;
-        left: 0;
-        width: 100%;
-        height: 0;
-        background: linear-gradient(transparent, rgba(0,0,0,0.03));
-        transition: height 0.3s ease;
-    }}
-    
-    .dimension-card:hover::after {{
-        height: 100%;
-    }}
-    
-    .dimension-card:hover {{
-        transform: translateY(-12px) scale(1.03);
-        box-shadow: 0 15px 45px rgba(0,0,0,0.2);
-    }}
-    
-    .dimension-card.selected {{
-        transform: scale(1.05);
-        box-shadow: 0 12px 40px rgba(0,0,0,0.25);
-        border: 3px solid;
-        animation: pulse-glow 2s infinite;
-    }}
-    
-    @keyframes pulse-glow {{
-        0% {{ box-shadow: 0 0 20px rgba(102, 126, 234, 0.3); }}
-        50% {{ box-shadow: 0 0 30px rgba(102, 126, 234, 0.6); }}
-        100% {{ box-shadow: 0 0 20px rgba(102, 126, 234, 0.3); }}
-    }}
-    
-    .volatility-card {{ 
-        border-color: #ff6b6b;
-        background: linear-gradient(135deg, #fff, #fff5f5);
-    }}
-    .ambiguity-card {{ 
-        border-color: #4ecdc4;
-        background: linear-gradient(135deg, #fff, #f0fffd);
-    }}
-    .interconnectedness-card {{ 
-        border-color: #45b7d1;
-        background: linear-gradient(135deg, #fff, #f0f9ff);
-    }}
-    .uncertainty-card {{ 
-        border-color: #96ceb4;
-        background: linear-gradient(135deg, #fff, #f7fff9);
-    }}
-    
-    /* Enhanced Score Circles */
-    .score-circle {{
-        width: 90px;
-        height: 90px;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        margin: 0 auto 15px;
-        font-size: 2rem;
-        font-weight: bold;
-        color: white;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-        transition: all 0.4s ease;
-        position: relative;
-        overflow: hidden;
-    }}
-    
-    .score-circle::before {{
-        content: '';
-        position: absolute;
-        top: -10px;
-        left: -10px;
-        right: -10px;
-        bottom: -10px;
-        background: inherit;
-        filter: blur(15px);
-        opacity: 0.6;
-        z-index: -1;
-    }}
-    
-    .score-circle:hover {{
-        transform: scale(1.1) rotate(5deg);
-        box-shadow: 0 12px 35px rgba(0,0,0,0.3);
-    }}
-    
-    .volatility-score {{ 
-        background: linear-gradient(135deg, #ff6b6b, #ff8e8e);
-    }}
-    .ambiguity-score {{ 
-        background: linear-gradient(135deg, #4ecdc4, #6de0d7);
-    }}
-    .interconnectedness-score {{ 
-        background: linear-gradient(135deg, #45b7d1, #67c9e0);
-    }}
-    .uncertainty-score {{ 
-        background: linear-gradient(135deg, #96ceb4, #b4e0c8);
-    }}
-    
-    /* Enhanced Difficulty Card */
-    .difficulty-card {{
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 40px;
-        border-radius: 25px;
-        text-align: center;
-        margin: 20px 0;
-        box-shadow: 0 15px 40px rgba(102, 126, 234, 0.4);
-        border: 3px solid rgba(255,255,255,0.2);
-        transition: all 0.5s ease;
-        position: relative;
-        overflow: hidden;
-    }}
-    
-    .difficulty-card::before {{
-        content: '';
-        position: absolute;
-        top: -50%;
-        left: -50%;
-        width: 200%;
-        height: 200%;
-        background: linear-gradient(45deg, transparent, rgba(255,255,255,0.1), transparent);
-        transform: rotate(45deg);
-        transition: all 0.6s ease;
-    }}
-    
-    .difficulty-card:hover::before {{
-        transform: rotate(45deg) translate(20px, 20px);
-    }}
-    
-    .difficulty-card:hover {{
-        transform: translateY(-8px);
-        box-shadow: 0 20px 50px rgba(102, 126, 234, 0.6);
-    }}
-    
-    /* Enhanced Progress Bars */
-    .progress-container {{
-        background: #f1f3f4;
-        border-radius: 15px;
-        height: 15px;
-        margin: 15px 0;
-        overflow: hidden;
-        box-shadow: inset 0 2px 8px rgba(0,0,0,0.1);
-    }}
-    
-    .progress-bar {{
-        height: 100%;
-        border-radius: 15px;
-        transition: width 0.8s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        background: linear-gradient(90deg, #667eea, #764ba2);
-        position: relative;
-        overflow: hidden;
-    }}
-    
-    .progress-bar::after {{
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.4), transparent);
-        animation: shimmer 2s infinite;
-    }}
-    
-    @keyframes shimmer {{
-        0% {{ left: -100%; }}
-        100% {{ left: 100%; }}
-    }}
-    
-    /* Enhanced Navigation Buttons */
-    .nav-button {{
-        background: linear-gradient(135deg, #667eea, #764ba2);
-        color: white;
-        border: none;
-        padding: 14px 28px;
-        border-radius: 15px;
-        cursor: pointer;
-        margin: 12px 8px;
-        font-weight: 600;
-        transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        box-shadow: 0 6px 20px rgba(102, 126, 234, 0.3);
-        position: relative;
-        overflow: hidden;
-        font-size: 1rem;
-    }}
-    
-    .nav-button::before {{
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-        transition: left 0.5s ease;
-    }}
-    
-    .nav-button:hover::before {{
-        left: 100%;
-    }}
-    
-    .nav-button:hover {{
-        transform: translateY(-5px) scale(1.05);
-        box-shadow: 0 10px 30px rgba(102, 126, 234, 0.5);
-    }}
-    
-    .nav-button:active {{
-        transform: translateY(-2px) scale(1.02);
-    }}
-    
-    /* Enhanced Feature Cards */
-    .feature-card {{
-        background: white;
-        padding: 30px;
-        border-radius: 20px;
-        box-shadow: 0 8px 30px rgba(0,0,0,0.1);
-        margin: 15px 0;
-        transition: all 0.4s ease;
-        border: 1px solid rgba(102, 126, 234, 0.1);
-        text-align: center;
-        position: relative;
-        overflow: hidden;
-    }}
-    
-    .feature-card::before {{
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 4px;
-        background: linear-gradient(90deg, #667eea, #764ba2);
-        transform: scaleX(0);
-        transition: transform 0.4s ease;
-    }}
-    
-    .feature-card:hover::before {{
-        transform: scaleX(1);
-    }}
-    
-    .feature-card:hover {{
-        transform: translateY(-10px);
-        box-shadow: 0 15px 45px rgba(102, 126, 234, 0.2);
-    }}
-    
-    /* Summary Cards */
-    .summary-card {{
-        background: white;
-        padding: 30px;
-        border-radius: 20px;
-        box-shadow: 0 8px 30px rgba(0,0,0,0.1);
-        margin: 20px 0;
-        transition: all 0.4s ease;
-        border-left: 5px solid;
-        border-top: 1px solid rgba(0,0,0,0.05);
-    }}
-    
-    .summary-card:hover {{
-        transform: translateY(-5px);
-        box-shadow: 0 12px 40px rgba(0,0,0,0.15);
-    }}
-    
-    .executive-summary {{ border-left-color: #667eea; }}
-    
-    /* Enhanced Select Boxes */
-    .stSelectbox > div > div {{
-        transition: all 0.3s ease;
-        border-radius: 12px;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.08);
-    }}
-    
-    .stSelectbox > div > div:hover {{
-        box-shadow: 0 6px 20px rgba(102, 126, 234, 0.15);
-        transform: translateY(-2px);
-    }}
-    
-    /* Enhanced Text Areas */
-    .stTextArea > div > div {{
-        transition: all 0.3s ease;
-        border-radius: 15px;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.08);
-    }}
-    
-    .stTextArea > div > div:hover {{
-        box-shadow: 0 6px 20px rgba(102, 126, 234, 0.15);
-        transform: translateY(-2px);
-    }}
-    
-    /* Enhanced Metrics */
-    .stMetric {{
-        background: white;
-        padding: 20px;
-        border-radius: 15px;
-        box-shadow: 0 6px 20px rgba(0,0,0,0.08);
-        transition: all 0.3s ease;
-        border-left: 4px solid #667eea;
-    }}
-    
-    .stMetric:hover {{
-        transform: translateY(-5px);
-        box-shadow: 0 10px 30px rgba(102, 126, 234, 0.15);
-    }}
-    
-    /* Sidebar Enhancements */
-    .css-1d391kg {{
-        background: linear-gradient(135deg, #2c3e50, #34495e);
-    }}
-    
-    .sidebar .sidebar-content {{
-        background: linear-gradient(135deg, #2c3e50, #34495e);
-    }}
-    
-    /* Custom scrollbar */
-    ::-webkit-scrollbar {{
-        width: 8px;
-    }}
-    
-    ::-webkit-scrollbar-track {{
-        background: #f1f1f1;
-        border-radius: 10px;
-    }}
-    
-    ::-webkit-scrollbar-thumb {{
-        background: linear-gradient(135deg, #667eea, #764ba2);
-        border-radius: 10px;
-    }}
-    
-    ::-webkit-scrollbar-thumb:hover {{
-        background: linear-gradient(135deg, #764ba2, #667eea);
-    }}
-</style>
-""", unsafe_allow_html=True)
+def get_page_fragments():
+    """This session's analysis cards - built once per result, and shared by every session showing the same one"""
+    result = st.session_state.result
+    return build_page_fragments(result.fingerprint, result)
 
 # ----------------------------- PAGE 1: INPUT -----------------------------
 def render_page_1():
@@ -1175,10 +588,13 @@ def render_page_1():
     
     if (current_customer != st.session_state.last_customer or 
         current_problem != st.session_state.last_problem):
-        st.session_state.analysis_complete = False
-        st.session_state.outputs = {}
+        st.session_state.result = None
         st.session_state.show_vocabulary = False
         st.session_state.show_results_button = False
+        if current_customer != st.session_state.last_customer:
+            # The problem check lags a run behind the text area, so only a customer change cancels here -
+            # a problem change already cancelled the job when the text changed
+            cancel_analysis_job()
         st.session_state.last_customer = current_customer
         st.session_state.last_problem = current_problem
     
@@ -1194,12 +610,19 @@ def render_page_1():
     # Update problem statement in session state
     if problem != st.session_state.problem_statement:
         st.session_state.problem_statement = problem
+        # A running job analyses the old text - stop it rather than show its result under the new one
+        cancel_analysis_job()
         # Trigger re-run to update the reset logic
-        if st.session_state.analysis_complete:
+        if st.session_state.result is not None:
             st.rerun()
     
     st.markdown('</div>', unsafe_allow_html=True)
     
+    st.toggle("⚡ Stream results as they arrive", key="stream_results",
+              help="Show each stage's output and score as soon as it completes")
+    st.toggle("♻️ Reuse cached responses", key="use_response_cache",
+              help="Answer stages from the response cache when the same problem was analyzed before")
+    
     # Enhanced Analyze Button
     if st.button("🚀 Analyze Business Problem", use_container_width=True, type="primary"):
         if customer == "Select Customer" or not problem.strip():
@@ -1214,144 +637,101 @@ def render_page_1():
             # Show results button instead of auto-redirecting
             st.session_state.show_results_button = True
             st.rerun()
+    elif st.session_state.analysis_job_id:
+        # An analysis is still running in the background - pick it back up after a rerun
+        if follow_analysis_job():
+            st.session_state.show_results_button = True
+        st.rerun()
+    
+    # Offer to resume an analysis of this problem that failed part-way or was interrupted by a restart
+    resumable = None
+    if problem.strip() and not st.session_state.analysis_job_id:
+        resumable = find_resumable_analysis(problem)
+    if resumable:
+        saved_stages = len(resumable["completed_stages"])
+        if st.button(f"🔁 Resume Analysis ({saved_stages} of {len(API_CONFIGS)} stages saved)",
+                     use_container_width=True, key="resume_analysis_btn",
+                     help="Rerun only the stages that are missing or failed"):
+            if customer == "Select Customer":
+                st.warning("⚠️ Please select a customer and enter a detailed problem statement.")
+            else:
+                st.session_state.customer = customer
+                st.session_state.industry = st.session_state.current_industry
+                st.session_state.problem = problem
+                
+                run_analysis(problem, analysis_id=resumable["analysis_id"])
+                
+                st.session_state.show_results_button = True
+                st.rerun()
     
     # Show View Results button if analysis is complete and we're on page 1
-    if st.session_state.analysis_complete and st.session_state.show_results_button:
+    if st.session_state.result is not None and st.session_state.show_results_button:
         st.markdown("---")
         st.markdown("### 📊 Analysis Complete!")
         st.success("✅ Your business problem has been analyzed successfully!")
         
         # Display Overall Difficulty Score and VUIA Scores in 2x2 grid
-        score = st.session_state.difficulty_score
-        difficulty_level, level_color, level_emoji = get_difficulty_level(score)
-        
-        # Overall Difficulty Score Card
-        st.markdown(f"""
-        <div class="difficulty-card">
-            <h2 style="margin: 0; font-size: 4rem; font-weight: 800; text-shadow: 0 4px 8px rgba(0,0,0,0.2);">{score:.2f}<span style="font-size: 2rem; opacity: 0.8;">/5</span></h2>
-            <p style="margin: 15px 0; font-size: 1.3rem; font-weight: 600;">Overall Difficulty Score</p>
-            <div style="margin: 25px 0;">
-                <span style="font-size: 1.4rem; font-weight: bold; color: {level_color}; padding: 12px 24px; background: rgba(255,255,255,0.2); border-radius: 25px; backdrop-filter: blur(10px); border: 2px solid rgba(255,255,255,0.3);">
-                    {level_emoji} {difficulty_level}
-                </span>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Rest of your VUIA cards and buttons...
-        # [Your existing VUIA cards code here]
+        fragments = get_page_fragments()
+        st.markdown(fragments["difficulty_card"], unsafe_allow_html=True)
         
         # 🎯 VUIA Scores in 2x2 Grid - UNDER THE OVERALL SCORE
         st.markdown("### 🎯 VUIA Dimension Scores")
         
         # Create 2x2 grid for VUIA scores
         col1, col2 = st.columns(2)
-        
         with col1:
-            # Volatility Score
-            volatility_score = st.session_state.dimension_scores["Volatility"]
-            volatility_level, volatility_color, volatility_emoji = get_difficulty_level(volatility_score)
-            st.markdown(f"""
-            <div class="dimension-card volatility-card" style="text-align: center; padding: 25px; margin: 10px 0;">
-                <div class="score-circle volatility-score">{volatility_score:.2f}</div>
-                <h3 style="margin: 15px 0 10px 0; color: #333;">🌪️ Volatility</h3>
-                <p style="margin: 5px 0; color: #666; font-size: 0.9rem;">Change frequency & pace</p>
-                <div style="margin-top: 10px;">
-                    <span style="color: {volatility_color}; font-weight: 600; font-size: 1.1rem;">
-                        {volatility_emoji} {volatility_level}
-                    </span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Uncertainty Score
-            uncertainty_score = st.session_state.dimension_scores["Uncertainty"]
-            uncertainty_level, uncertainty_color, uncertainty_emoji = get_difficulty_level(uncertainty_score)
-            st.markdown(f"""
-            <div class="dimension-card uncertainty-card" style="text-align: center; padding: 25px; margin: 10px 0;">
-                <div class="score-circle uncertainty-score">{uncertainty_score:.2f}</div>
-                <h3 style="margin: 15px 0 10px 0; color: #333;">❓ Uncertainty</h3>
-                <p style="margin: 5px 0; color: #666; font-size: 0.9rem;">Predictability & patterns</p>
-                <div style="margin-top: 10px;">
-                    <span style="color: {uncertainty_color}; font-weight: 600; font-size: 1.1rem;">
-                        {uncertainty_emoji} {uncertainty_level}
-                    </span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
+            st.markdown(fragments["dimension_cards"]["Volatility"], unsafe_allow_html=True)
+            st.markdown(fragments["dimension_cards"]["Uncertainty"], unsafe_allow_html=True)
         with col2:
-            # Interconnectedness Score
-            interconnectedness_score = st.session_state.dimension_scores["Interconnectedness"]
-            interconnectedness_level, interconnectedness_color, interconnectedness_emoji = get_difficulty_level(interconnectedness_score)
-            st.markdown(f"""
-            <div class="dimension-card interconnectedness-card" style="text-align: center; padding: 25px; margin: 10px 0;">
-                <div class="score-circle interconnectedness-score">{interconnectedness_score:.2f}</div>
-                <h3 style="margin: 15px 0 10px 0; color: #333;">🕸️ Interconnectedness</h3>
-                <p style="margin: 5px 0; color: #666; font-size: 0.9rem;">System dependencies</p>
-                <div style="margin-top: 10px;">
-                    <span style="color: {interconnectedness_color}; font-weight: 600; font-size: 1.1rem;">
-                        {interconnectedness_emoji} {interconnectedness_level}
-                    </span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Ambiguity Score
-            ambiguity_score = st.session_state.dimension_scores["Ambiguity"]
-            ambiguity_level, ambiguity_color, ambiguity_emoji = get_difficulty_level(ambiguity_score)
-            st.markdown(f"""
-            <div class="dimension-card ambiguity-card" style="text-align: center; padding: 25px; margin: 10px 0;">
-                <div class="score-circle ambiguity-score">{ambiguity_score:.2f}</div>
-                <h3 style="margin: 15px 0 10px 0; color: #333;">🎭 Ambiguity</h3>
-                <p style="margin: 5px 0; color: #666; font-size: 0.9rem;">Clarity & definitions</p>
-                <div style="margin-top: 10px;">
-                    <span style="color: {ambiguity_color}; font-weight: 600; font-size: 1.1rem;">
-                        {ambiguity_emoji} {ambiguity_level}
-                    </span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Vocabulary Button - Toggle functionality
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            # Show different button text based on current state
-            if st.session_state.show_vocabulary:
-                button_text = "🔒 Hide Vocabulary"
-                button_help = "Hide the extracted vocabulary"
-            else:
-                button_text = "📚 Show Vocabulary"
-                button_help = "View the extracted vocabulary from your problem statement"
-            
-            if st.button(button_text, key="toggle_vocab_btn", use_container_width=True, 
-                        disabled=not st.session_state.analysis_complete,
-                        help=button_help):
-                # Toggle the vocabulary display state
-                st.session_state.show_vocabulary = not st.session_state.show_vocabulary
-                st.rerun()
+            st.markdown(fragments["dimension_cards"]["Interconnectedness"], unsafe_allow_html=True)
+            st.markdown(fragments["dimension_cards"]["Ambiguity"], unsafe_allow_html=True)
         
-        # Show vocabulary section if toggled and analysis is complete
-        if st.session_state.show_vocabulary and st.session_state.outputs.get("vocabulary"):
-            st.markdown("### 📚 Extracted Vocabulary")
-            st.markdown(f"""
-            <div class="analysis-card" style="background: linear-gradient(135deg, #f8f9fa, #e9ecef); border-left: 5px solid #667eea; animation: fadeIn 0.5s ease-in;">
-                <div style="color: #555; line-height: 1.6; font-size: 15px;">
-                    {st.session_state.outputs["vocabulary"]}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        render_vocabulary_toggle()
         
         # View Results Button
-        if st.button("📊 View Detailed Analysis", use_container_width=True, type="secondary"):
-            st.session_state.current_page = "Page 2: Analysis"
-            st.session_state.show_results_button = False
-            st.rerun()
+        st.button("📊 View Detailed Analysis", use_container_width=True, type="secondary",
+                  on_click=view_detailed_analysis)
+
+def toggle_vocabulary():
+    st.session_state.show_vocabulary = not st.session_state.show_vocabulary
+    st.session_state.clicked_at = time.perf_counter()
+
+@st.fragment
+def render_vocabulary_toggle():
+    """The vocabulary toggle and section - a click reruns only this fragment, not the whole page"""
+    # Vocabulary Button - Toggle functionality
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        # Show different button text based on current state
+        if st.session_state.show_vocabulary:
+            button_text = "🔒 Hide Vocabulary"
+            button_help = "Hide the extracted vocabulary"
+        else:
+            button_text = "📚 Show Vocabulary"
+            button_help = "View the extracted vocabulary from your problem statement"
+        
+        st.button(button_text, key="toggle_vocab_btn", use_container_width=True,
+                  disabled=st.session_state.result is None,
+                  help=button_help, on_click=toggle_vocabulary)
+    
+    # Show vocabulary section if toggled and analysis is complete
+    result = st.session_state.result
+    if st.session_state.show_vocabulary and result is not None and result.outputs.get("vocabulary"):
+        st.markdown("### 📚 Extracted Vocabulary")
+        st.markdown(f"""
+        <div class="analysis-card" style="background: linear-gradient(135deg, #f8f9fa, #e9ecef); border-left: 5px solid #667eea; animation: fadeIn 0.5s ease-in;">
+            <div style="color: #555; line-height: 1.6; font-size: 15px;">
+                {result.outputs["vocabulary"]}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+    record_click_to_render("Vocabulary toggle")
+
 # ----------------------------- PAGE 2: ANALYSIS -----------------------------
 def render_page_2():
     st.title("📊 Analysis Results")
     
-    if not st.session_state.analysis_complete:
+    if st.session_state.result is None:
         st.warning("No analysis completed yet. Please go to Page 1 to start an analysis.")
         return
     
@@ -1368,20 +748,8 @@ def render_page_2():
         """, unsafe_allow_html=True)
     
     # Enhanced Overall Difficulty Score Card
-    score = st.session_state.difficulty_score
-    difficulty_level, level_color, level_emoji = get_difficulty_level(score)
-
-    st.markdown(f"""
-    <div class="difficulty-card">
-        <h2 style="margin: 0; font-size: 4rem; font-weight: 800; text-shadow: 0 4px 8px rgba(0,0,0,0.2);">{score:.2f}<span style="font-size: 2rem; opacity: 0.8;">/5</span></h2>
-        <p style="margin: 15px 0; font-size: 1.3rem; font-weight: 600;">Overall Difficulty Score</p>
-        <div style="margin: 25px 0;">
-            <span style="font-size: 1.4rem; font-weight: bold; color: {level_color}; padding: 12px 24px; background: rgba(255,255,255,0.2); border-radius: 25px; backdrop-filter: blur(10px); border: 2px solid rgba(255,255,255,0.3);">
-                {level_emoji} {difficulty_level}
-            </span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    fragments = get_page_fragments()
+    st.markdown(fragments["difficulty_card"], unsafe_allow_html=True)
     
     # Enhanced Problem Context
     col1, col2 = st.columns(2)
@@ -1391,25 +759,22 @@ def render_page_2():
         st.metric("🏭 Industry", st.session_state.industry)
     
     # Current System Analysis only - WITH BOLDED HEADING
-    if st.session_state.outputs.get("current_system"):
+    if st.session_state.result.outputs.get("current_system"):
         st.markdown("### 🔄 **Current System Analysis**")  # Added bold formatting
-        st.markdown(f'<div class="analysis-card">{st.session_state.outputs["current_system"]}</div>', unsafe_allow_html=True)
+        st.markdown(fragments["current_system"], unsafe_allow_html=True)
     
     # Enhanced Navigation - WITH UNIQUE KEYS
     st.markdown("---")
     col1, col2, col3 = st.columns(3)
     with col1:
-        if st.button("⬅️ Back to Input", use_container_width=True, key="page2_back_to_input"):
-            st.session_state.current_page = "Page 1: Input"
-            st.rerun()
+        st.button("⬅️ Back to Input", use_container_width=True, key="page2_back_to_input",
+                  on_click=go_to_page, args=("Page 1: Input",))
     with col2:
-        if st.button("🔍 View VUIA Dimensions", use_container_width=True, type="secondary", key="page2_view_vuia"):
-            st.session_state.current_page = "Page 3: VUIA Dimensions"
-            st.rerun()
+        st.button("🔍 View VUIA Dimensions", use_container_width=True, type="secondary", key="page2_view_vuia",
+                  on_click=go_to_page, args=("Page 3: VUIA Dimensions",))
     with col3:
-        if st.button("📋 View Summary ➡️", use_container_width=True, type="primary", key="page2_view_summary"):
-            st.session_state.current_page = "Page 4: Summary"
-            st.rerun()
+        st.button("📋 View Summary ➡️", use_container_width=True, type="primary", key="page2_view_summary",
+                  on_click=go_to_page, args=("Page 4: Summary",))
 
 def get_dimension_icon(dimension):
     """Get icon for VUIA dimension"""
@@ -1421,9 +786,86 @@ def get_dimension_icon(dimension):
     }
     return icons.get(dimension, "📊")
 
+# Score lines and mentions removed from answers, keeping the explanations around them
+ANSWER_SCORE_PATTERNS = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in [
+    # Standalone score lines
+    r'^Score:\s*\d+(?:\.\d+)?\s*\/\s*5\s*$',
+    r'^Score\s*\(?0–5\)?\s*:\s*\d+(?:\.\d+)?\s*$',
+    r'^Overall Score:\s*\d+(?:\.\d+)?\s*$',
+    r'^Rating:\s*\d+(?:\.\d+)?\s*$',
+    r'^\d+(?:\.\d+)?\s*out of\s*5\s*$',
+    r'^\d+(?:\.\d+)?\s*\/\s*5\s*$',
+    
+    # Score mentions at the end of paragraphs
+    r'\s*Score:\s*\d+(?:\.\d+)?\s*\/\s*5\s*$',
+    r'\s*Score\s*\(?0–5\)?\s*:\s*\d+(?:\.\d+)?\s*$',
+    r'\s*Overall Score:\s*\d+(?:\.\d+)?\s*$',
+    
+    # Parenthetical scores
+    r'\(\s*Score:\s*\d+(?:\.\d+)?\s*\/\s*5\s*\)',
+    r'\(\s*\d+(?:\.\d+)?\s*\/\s*5\s*\)',
+    r'\[\s*\d+(?:\.\d+)?\s*\/\s*5\s*\]',
+]]
+
+# "Justification" sections that only contain score information - justifications with actual content are kept
+SCORE_JUSTIFICATION_PATTERNS = [re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in [
+    r'Justification:\s*(?:The\s+)?score\s+(?:of\s+)?\d+(?:\.\d+)?.*?(?=\n\n|\n[A-Z]|$)',
+    r'Justification:\s*(?:This\s+)?(?:results?\s+in\s+a\s+)?score\s+of\s+\d+(?:\.\d+)?.*?(?=\n\n|\n[A-Z]|$)',
+    r'Justification:\s*\d+(?:\.\d+)?.*?(?=\n\n|\n[A-Z]|$)',
+]]
+
+ANSWER_SECTION_HEADERS = [
+    'Explanation', 'Analysis', 'Key Findings', 'Summary',
+    'Conclusion', 'Recommendation', 'Justification', 'Rationale'
+]
+ANSWER_SECTION_PATTERNS = [re.compile(rf'({header}:.*?)(?=\n\n|\n[A-Z]|$)', re.IGNORECASE | re.DOTALL)
+                           for header in ANSWER_SECTION_HEADERS]
+ANSWER_HEADER_PATTERNS = [re.compile(rf'({header}:)', re.IGNORECASE) for header in ANSWER_SECTION_HEADERS]
+
+@st.cache_data(max_entries=ANSWER_MARKDOWN_CACHE_SIZE, show_spinner=False)
+def format_answer_markdown(question_key, answer_text):
+    """
+    An answer's markdown with its scores removed and explanation sections bolded. The answer never
+    changes once the analysis is done, so each (question, answer) is formatted once and reused on reruns.
+    Streamlit's cache outlives the rerun - an lru_cache here would be rebuilt with the script each time.
+    """
+    answer_text = strip_score_block(answer_text)
+    
+    # Remove ONLY the specific score lines and score mentions, but keep the explanations
+    for pattern in ANSWER_SCORE_PATTERNS:
+        answer_text = pattern.sub('', answer_text)
+    for pattern in SCORE_JUSTIFICATION_PATTERNS:
+        answer_text = pattern.sub('', answer_text)
+    
+    # Clean up any resulting double newlines or empty lines
+    answer_text = re.sub(r'\n\s*\n', '\n\n', answer_text)
+    answer_text = answer_text.strip()
+    
+    # If the answer text became empty after removing scores, show a message
+    if not answer_text.strip():
+        answer_text = "No detailed explanation available beyond the score assessment."
+    
+    # Apply bolding to explanation sections
+    for pattern in ANSWER_SECTION_PATTERNS:
+        matches = list(pattern.finditer(answer_text))
+        for match in reversed(matches):  # Process in reverse to avoid position issues
+            start, end = match.span()
+            section_text = match.group(1)
+            # Only bold if the section has meaningful content beyond just score mentions
+            if len(section_text.strip()) > 20:  # Minimum content length
+                bolded_section = f"**{section_text}**"
+                answer_text = answer_text[:start] + bolded_section + answer_text[end:]
+    
+    # Also bold common section headers
+    for pattern in ANSWER_HEADER_PATTERNS:
+        answer_text = pattern.sub(r'**\1**', answer_text)
+    
+    return answer_text
+
 def display_question_details(question_key):
     """Display detailed question information without scores for ALL questions"""
-    if st.session_state.outputs.get(question_key):
+    outputs = st.session_state.result.outputs
+    if outputs.get(question_key):
         # Get question description from API_CONFIGS
         q_description = ""
         for api in API_CONFIGS:
@@ -1431,90 +873,7 @@ def display_question_details(question_key):
                 q_description = api['description']
                 break
         
-        # Get the answer text
-        answer_text = st.session_state.outputs[question_key]
-        
-        # Remove ONLY the specific score lines and score mentions, but keep the explanations
-        # More targeted score removal patterns
-        score_patterns = [
-            # Remove standalone score lines
-            r'^Score:\s*\d+(?:\.\d+)?\s*\/\s*5\s*$',
-            r'^Score\s*\(?0–5\)?\s*:\s*\d+(?:\.\d+)?\s*$',
-            r'^Overall Score:\s*\d+(?:\.\d+)?\s*$',
-            r'^Rating:\s*\d+(?:\.\d+)?\s*$',
-            r'^\d+(?:\.\d+)?\s*out of\s*5\s*$',
-            r'^\d+(?:\.\d+)?\s*\/\s*5\s*$',
-            
-            # Remove score mentions at the end of paragraphs but preserve content before them
-            r'\s*Score:\s*\d+(?:\.\d+)?\s*\/\s*5\s*$',
-            r'\s*Score\s*\(?0–5\)?\s*:\s*\d+(?:\.\d+)?\s*$',
-            r'\s*Overall Score:\s*\d+(?:\.\d+)?\s*$',
-            
-            # Remove parenthetical scores
-            r'\(\s*Score:\s*\d+(?:\.\d+)?\s*\/\s*5\s*\)',
-            r'\(\s*\d+(?:\.\d+)?\s*\/\s*5\s*\)',
-            r'\[\s*\d+(?:\.\d+)?\s*\/\s*5\s*\]',
-        ]
-        
-        # Apply score removal patterns
-        for pattern in score_patterns:
-            answer_text = re.sub(pattern, '', answer_text, flags=re.IGNORECASE | re.MULTILINE)
-        
-        # Remove "Justification" sections that only contain score information
-        # But keep justifications that have actual content
-        justification_patterns = [
-            r'Justification:\s*(?:The\s+)?score\s+(?:of\s+)?\d+(?:\.\d+)?.*?(?=\n\n|\n[A-Z]|$)',
-            r'Justification:\s*(?:This\s+)?(?:results?\s+in\s+a\s+)?score\s+of\s+\d+(?:\.\d+)?.*?(?=\n\n|\n[A-Z]|$)',
-            r'Justification:\s*\d+(?:\.\d+)?.*?(?=\n\n|\n[A-Z]|$)',
-        ]
-        
-        for pattern in justification_patterns:
-            answer_text = re.sub(pattern, '', answer_text, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Clean up any resulting double newlines or empty lines
-        answer_text = re.sub(r'\n\s*\n', '\n\n', answer_text)
-        answer_text = answer_text.strip()
-        
-        # If the answer text became empty after removing scores, show a message
-        if not answer_text.strip():
-            answer_text = "No detailed explanation available beyond the score assessment."
-        
-        # Process the answer to make explanations bold (for all questions)
-        patterns_to_bold = [
-            r'(Explanation:.*?)(?=\n\n|\n[A-Z]|$)',
-            r'(Analysis:.*?)(?=\n\n|\n[A-Z]|$)',
-            r'(Key Findings:.*?)(?=\n\n|\n[A-Z]|$)',
-            r'(Summary:.*?)(?=\n\n|\n[A-Z]|$)',
-            r'(Conclusion:.*?)(?=\n\n|\n[A-Z]|$)',
-            r'(Recommendation:.*?)(?=\n\n|\n[A-Z]|$)',
-            r'(Justification:.*?)(?=\n\n|\n[A-Z]|$)',
-            r'(Rationale:.*?)(?=\n\n|\n[A-Z]|$)',
-        ]
-        
-        # Apply bolding to explanation sections
-        for pattern in patterns_to_bold:
-            matches = list(re.finditer(pattern, answer_text, re.IGNORECASE | re.DOTALL))
-            for match in reversed(matches):  # Process in reverse to avoid position issues
-                start, end = match.span()
-                section_text = match.group(1)
-                # Only bold if the section has meaningful content beyond just score mentions
-                if len(section_text.strip()) > 20:  # Minimum content length
-                    bolded_section = f"**{section_text}**"
-                    answer_text = answer_text[:start] + bolded_section + answer_text[end:]
-        
-        # Also bold common section headers
-        section_headers = [
-            'Explanation', 'Analysis', 'Key Findings', 'Summary', 
-            'Conclusion', 'Recommendation', 'Justification', 'Rationale'
-        ]
-        
-        for header in section_headers:
-            answer_text = re.sub(
-                rf'({header}:)',
-                r'**\1**',
-                answer_text,
-                flags=re.IGNORECASE
-            )
+        answer_text = format_answer_markdown(question_key, outputs[question_key])
         
         st.markdown(f"""
         <div class="question-card">
@@ -1530,58 +889,11 @@ def display_question_details(question_key):
         </div>
         """, unsafe_allow_html=True)
 
-def extract_score_from_answer_text(text):
-    """Extract score specifically from the answer text using targeted patterns"""
-    # More specific patterns to find scores in answer explanations
-    patterns = [
-        r'Score\s*\(?0–5\)?\s*:\s*(\d+(?:\.\d+)?)',  # "Score (0–5): 4"
-        r'Score:\s*(\d+(?:\.\d+)?)',                 # "Score: 4"
-        r'Score\s*=\s*(\d+(?:\.\d+)?)',              # "Score = 4"
-        r'Overall Score:\s*(\d+(?:\.\d+)?)',         # "Overall Score: 4"
-        r'Rating:\s*(\d+(?:\.\d+)?)',                # "Rating: 4"
-        r'(\d+(?:\.\d+)?)\s*out of\s*5',             # "4 out of 5"
-        r'(\d+(?:\.\d+)?)\s*\/\s*5',                 # "4/5"
-        r'Score.*?(\d+(?:\.\d+)?)\s*\/\s*5',         # "Score 4/5"
-        r'Justification.*?score of\s*(\d+(?:\.\d+)?)', # "Justification: The score of 4"
-        r'score of\s*(\d+(?:\.\d+)?)',               # "score of 4"
-        r'Score.*?(\d+)',                            # "Score 4"
-        r'rating of\s*(\d+(?:\.\d+)?)',              # "rating of 4"
-    ]
-    
-    # Look for all score mentions and take the most relevant one
-    all_scores = []
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            try:
-                score = float(match)
-                if 0 <= score <= 5:
-                    all_scores.append(score)
-            except ValueError:
-                continue
-    
-    # If we found multiple scores, use some logic to pick the right one
-    if all_scores:
-        # Prefer scores that appear later in the text (usually the final score)
-        return f"{all_scores[-1]:.1f}"
-    
-    return "N/A"
-
-def update_individual_scores_from_answers():
-    """Update individual scores from the actual answer texts to ensure consistency"""
-    for i in range(1, 13):
-        question_key = f"Q{i}"
-        if st.session_state.outputs.get(question_key):
-            answer_text = st.session_state.outputs[question_key]
-            extracted_score = extract_score_from_answer_text(answer_text)
-            if extracted_score != "N/A":
-                st.session_state.individual_scores[question_key] = float(extracted_score)
-
 # ----------------------------- PAGE 3: VUIA DIMENSIONS -----------------------------
 def render_page_3():
     st.title("🔍 VUIA Dimension Analysis")
     
-    if not st.session_state.analysis_complete:
+    if st.session_state.result is None:
         st.warning("No analysis completed yet. Please go to Page 1 to start an analysis.")
         return
     
@@ -1600,54 +912,38 @@ def render_page_3():
     st.markdown("### 📊 Four Dimensions of Problem Complexity")
     st.markdown("Click on any dimension card to view its detailed questions and analysis")
     
-    # Enhanced VUIA Cards in 2x2 grid
-    col1, col2 = st.columns(2)
+    render_vuia_selector()
     
+    # Enhanced Navigation - WITH UNIQUE KEYS
+    st.markdown("---")
+    col1, col2, col3 = st.columns(3)
     with col1:
-        # Volatility Card
-        volatility_score = st.session_state.dimension_scores["Volatility"]
-        volatility_level, volatility_color, volatility_emoji = get_difficulty_level(volatility_score)
-        
-        if st.button(f"**🌪️ Volatility**\n\n**Score: {volatility_score:.2f}/5**\n\n*{volatility_level}*", 
-                    key="volatility_btn_page3",
-                    use_container_width=True,
-                    help="Click to view Volatility questions (Q1-Q3)"):
-            st.session_state.selected_vuia_dimension = "Volatility"
-            st.rerun()
-        
-        # Ambiguity Card
-        ambiguity_score = st.session_state.dimension_scores["Ambiguity"]
-        ambiguity_level, ambiguity_color, ambiguity_emoji = get_difficulty_level(ambiguity_score)
-        
-        if st.button(f"**🎭 Ambiguity**\n\n**Score: {ambiguity_score:.2f}/5**\n\n*{ambiguity_level}*", 
-                    key="ambiguity_btn_page3",
-                    use_container_width=True,
-                    help="Click to view Ambiguity questions (Q4-Q6)"):
-            st.session_state.selected_vuia_dimension = "Ambiguity"
-            st.rerun()
-    
-    with col2:
-        # Interconnectedness Card
-        interconnectedness_score = st.session_state.dimension_scores["Interconnectedness"]
-        interconnectedness_level, interconnectedness_color, interconnectedness_emoji = get_difficulty_level(interconnectedness_score)
-        
-        if st.button(f"**🕸️ Interconnectedness**\n\n**Score: {interconnectedness_score:.2f}/5**\n\n*{interconnectedness_level}*", 
-                    key="interconnectedness_btn_page3",
-                    use_container_width=True,
-                    help="Click to view Interconnectedness questions (Q7-Q9)"):
-            st.session_state.selected_vuia_dimension = "Interconnectedness"
-            st.rerun()
-        
-        # Uncertainty Card
-        uncertainty_score = st.session_state.dimension_scores["Uncertainty"]
-        uncertainty_level, uncertainty_color, uncertainty_emoji = get_difficulty_level(uncertainty_score)
-        
-        if st.button(f"**❓ Uncertainty**\n\n**Score: {uncertainty_score:.2f}/5**\n\n*{uncertainty_level}*", 
-                    key="uncertainty_btn_page3",
-                    use_container_width=True,
-                    help="Click to view Uncertainty questions (Q10-Q12)"):
-            st.session_state.selected_vuia_dimension = "Uncertainty"
-            st.rerun()
+        st.button("⬅️ Back to Analysis", use_container_width=True, key="page3_back_to_analysis",
+                  on_click=go_to_page, args=("Page 2: Analysis",))
+    with col3:
+        st.button("📋 View Summary ➡️", use_container_width=True, type="primary", key="page3_view_summary",
+                  on_click=go_to_page, args=("Page 4: Summary",))
+
+def select_vuia_dimension(dimension):
+    st.session_state.selected_vuia_dimension = dimension
+    st.session_state.clicked_at = time.perf_counter()
+
+@st.fragment
+def render_vuia_selector():
+    """The VUIA cards and the selected dimension's questions - a card click reruns only this fragment"""
+    # Enhanced VUIA Cards in 2x2 grid
+    col1, col2 = st.columns(2)
+    for col, dimensions in ((col1, ["Volatility", "Ambiguity"]), (col2, ["Interconnectedness", "Uncertainty"])):
+        with col:
+            for dimension in dimensions:
+                score = st.session_state.result.dimension_scores[dimension]
+                level, color, emoji = get_difficulty_level(score)
+                questions = VUIA_MAPPING[dimension]
+                st.button(f"**{get_dimension_icon(dimension)} {dimension}**\n\n**Score: {score:.2f}/5**\n\n*{level}*",
+                          key=f"{dimension.lower()}_btn_page3",
+                          use_container_width=True,
+                          help=f"Click to view {dimension} questions ({questions[0]}-{questions[-1]})",
+                          on_click=select_vuia_dimension, args=(dimension,))
     
     # Display selected dimension's questions
     if st.session_state.selected_vuia_dimension:
@@ -1658,18 +954,7 @@ def render_page_3():
         questions = VUIA_MAPPING[st.session_state.selected_vuia_dimension]
         for q in questions:
             display_question_details(q)
-    
-    # Enhanced Navigation - WITH UNIQUE KEYS
-    st.markdown("---")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        if st.button("⬅️ Back to Analysis", use_container_width=True, key="page3_back_to_analysis"):
-            st.session_state.current_page = "Page 2: Analysis"
-            st.rerun()
-    with col3:
-        if st.button("📋 View Summary ➡️", use_container_width=True, type="primary", key="page3_view_summary"):
-            st.session_state.current_page = "Page 4: Summary"
-            st.rerun()
+    record_click_to_render("VUIA card selection")
 
 def get_dimension_description(dimension):
     """Get description for VUIA dimension"""
@@ -1685,7 +970,7 @@ def get_dimension_description(dimension):
 def render_page_4():
     st.title("📋 Executive Summary")
     
-    if not st.session_state.analysis_complete:
+    if st.session_state.result is None:
         st.warning("No analysis completed yet. Please go to Page 1 to start an analysis.")
         return
     
@@ -1711,59 +996,24 @@ def render_page_4():
     st.markdown("---")
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("⬅️ Back to VUIA Analysis", use_container_width=True, key="page4_back_to_vuia"):
-            st.session_state.current_page = "Page 3: VUIA Dimensions"
-            st.rerun()
+        st.button("⬅️ Back to VUIA Analysis", use_container_width=True, key="page4_back_to_vuia",
+                  on_click=go_to_page, args=("Page 3: VUIA Dimensions",))
     with col2:
-        if st.button("🔄 New Analysis", use_container_width=True, type="primary", key="page4_new_analysis"):
-            reset_application()
-            st.rerun()
+        st.button("🔄 New Analysis", use_container_width=True, type="primary", key="page4_new_analysis",
+                  on_click=reset_application)
 
 def render_executive_summary():
     """Render executive summary with visual scorecards and dimension breakdowns"""
     st.markdown("### 📊 Executive Summary")
-    
-    # Overall Score Card
-    score = st.session_state.difficulty_score
-    difficulty_level, level_color, level_emoji = get_difficulty_level(score)
-    
-    if score <= 3.0:
-        recommendation = "This problem can be addressed with standard solutions and minimal organizational changes."
-    elif score <= 4.0:
-        recommendation = "This problem requires careful planning and may involve cross-functional coordination."
-    else:
-        recommendation = "This problem demands significant organizational changes and strategic intervention."
+    fragments = get_page_fragments()
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown(f"""
-        <div class="summary-card executive-summary">
-            <h4 style="color: #667eea; margin-bottom: 15px;">🏆 Overall Score</h4>
-            <div style="text-align: center;">
-                <div style="font-size: 3rem; font-weight: 800; color: {level_color}; margin: 10px 0;">{score:.2f}<span style="font-size: 1.5rem; opacity: 0.8;">/5</span></div>
-                <div style="font-size: 1.2rem; color: {level_color}; font-weight: 600;">{difficulty_level}</div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(fragments["summary_overall"], unsafe_allow_html=True)
     
     with col2:
-        # Highest Dimension
-        dimension_scores = st.session_state.dimension_scores
-        highest_dimension = max(dimension_scores, key=dimension_scores.get)
-        highest_score = dimension_scores[highest_dimension]
-        highest_level, highest_color, highest_emoji = get_difficulty_level(highest_score)
-        
-        st.markdown(f"""
-        <div class="summary-card executive-summary">
-            <h4 style="color: #667eea; margin-bottom: 15px;">📈 Primary Challenge</h4>
-            <div style="text-align: center;">
-                <div style="font-size: 2rem; font-weight: 800; color: #333; margin: 10px 0;">{highest_dimension}</div>
-                <div style="font-size: 1.5rem; color: {highest_color}; font-weight: 600;">{highest_score:.2f}<span style="font-size: 1rem; opacity: 0.8;">/5</span></div>
-                <div style="font-size: 1rem; color: #666;">{highest_level}</div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(fragments["summary_primary"], unsafe_allow_html=True)
     
     with col3:
         # Industry Context
@@ -1787,73 +1037,16 @@ def render_executive_summary():
     with col1:
         # Dimension Scores with Progress Bars
         st.markdown("#### 📈 Dimension Scores")
-        dimensions = ["Volatility", "Uncertainty", "Interconnectedness", "Ambiguity"]
-        colors = ["#ff6b6b", "#96ceb4", "#45b7d1", "#4ecdc4"]
-        icons = ["🌪️", "❓", "🕸️", "🎭"]
-        
-        for dimension, color, icon in zip(dimensions, colors, icons):
-            score = st.session_state.dimension_scores[dimension]
-            percentage = (score / 5) * 100
-            level, level_color, level_emoji = get_difficulty_level(score)
-            
-            st.markdown(f"""
-            <div style="margin: 20px 0;">
-                <div style="display: flex; justify-content: between; align-items: center; margin-bottom: 8px;">
-                    <span style="font-weight: 600; color: #333; font-size: 1.1rem;">
-                        {icon} {dimension}
-                    </span>
-                    <span style="font-weight: 700; color: {color}; font-size: 1.2rem;">
-                        {score:.2f}<span style="font-size: 0.9rem; opacity: 0.8;">/5</span>
-                    </span>
-                </div>
-                <div style="font-size: 0.9rem; color: #666; margin-bottom: 5px;">{level}</div>
-                <div class="progress-container">
-                    <div class="progress-bar" style="width: {percentage}%; background: {color};"></div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        for bar in fragments["dimension_bars"]:
+            st.markdown(bar, unsafe_allow_html=True)
     
     with col2:
         # Dimension Comparison Radar Chart (Visual Representation)
         st.markdown("#### 🎯 Complexity Assessment")
-        
-        # Create a simple radar chart representation using metrics
-        dimension_scores = st.session_state.dimension_scores
-        
-        # Calculate overall complexity insights
-        avg_score = sum(dimension_scores.values()) / len(dimension_scores)
-        max_score = max(dimension_scores.values())
-        min_score = min(dimension_scores.values())
-        
-        st.markdown(f"""
-        <div class="summary-card executive-summary">
-            <h5 style="color: #667eea; margin-bottom: 15px;">📊 Complexity Insights</h5>
-            <div style="margin: 15px 0;">
-                <div style="display: flex; justify-content: space-between; margin: 10px 0;">
-                    <span>Average Dimension Score:</span>
-                    <span style="font-weight: 700; color: #667eea;">{avg_score:.2f}<span style="font-size: 0.8rem; opacity: 0.8;">/5</span></span>
-                </div>
-                <div style="display: flex; justify-content: space-between; margin: 10px 0;">
-                    <span>Highest Dimension:</span>
-                    <span style="font-weight: 700; color: #ff6b6b;">{max(dimension_scores, key=dimension_scores.get)}</span>
-                </div>
-                <div style="display: flex; justify-content: space-between; margin: 10px 0;">
-                    <span>Lowest Dimension:</span>
-                    <span style="font-weight: 700; color: #4ecdc4;">{min(dimension_scores, key=dimension_scores.get)}</span>
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(fragments["complexity_insights"], unsafe_allow_html=True)
         
         # Recommendation based on scores
-        st.markdown(f"""
-        <div class="summary-card executive-summary">
-            <h5 style="color: #667eea; margin-bottom: 15px;">💡 Strategic Insight</h5>
-            <div style="color: #666; line-height: 1.6; font-size: 0.95rem;">
-                {recommendation}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(fragments["strategic_insight"], unsafe_allow_html=True)
 
 def render_detailed_analysis_summary():
     """Render detailed analysis summary from all APIs"""
@@ -1863,65 +1056,16 @@ def render_detailed_analysis_summary():
     tab4 = st.tabs(["🎯 Recommendations"])[0]
     
     with tab4:        
+        fragments = get_page_fragments()
+        
         # Overall hardness summary
-        if st.session_state.outputs.get("hardness_summary"):
+        if fragments["hardness_summary"]:
             st.markdown("#### 📋 Comprehensive Summary")
-            st.markdown(f'<div class="analysis-card">{st.session_state.outputs["hardness_summary"]}</div>', unsafe_allow_html=True)
-        
-        # Generate strategic recommendations based on scores
-        overall_score = st.session_state.difficulty_score
-        dimension_scores = st.session_state.dimension_scores
-        
-        # Overall recommendation based on total score
-        if overall_score <= 3.0:
-            st.markdown("""
-            <div class="analysis-card" style="border-left-color: #4CAF50;">
-                <h4 style="color: #4CAF50;">🟢 Low Complexity Recommendation</h4>
-                <p>This problem can be addressed with standard solutions and minimal organizational changes. Focus on:</p>
-                <ul>
-                    <li>Implementing best practices</li>
-                    <li>Leveraging existing frameworks</li>
-                    <li>Minimal process adjustments</li>
-                </ul>
-            </div>
-            """, unsafe_allow_html=True)
-        elif overall_score <= 4.0:
-            st.markdown("""
-            <div class="analysis-card" style="border-left-color: #FF9800;">
-                <h4 style="color: #FF9800;">🟡 Moderate Complexity Recommendation</h4>
-                <p>This problem requires careful planning and may involve cross-functional coordination. Consider:</p>
-                <ul>
-                    <li>Structured project management</li>
-                    <li>Cross-departmental collaboration</li>
-                    <li>Phased implementation approach</li>
-                </ul>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown("""
-            <div class="analysis-card" style="border-left-color: #F44336;">
-                <h4 style="color: #F44336;">🔴 High Complexity Recommendation</h4>
-                <p>This problem demands significant organizational changes and strategic intervention. Essential actions:</p>
-                <ul>
-                    <li>Executive sponsorship and oversight</li>
-                    <li>Comprehensive change management</li>
-                    <li>Significant resource allocation</li>
-                    <li>Long-term strategic planning</li>
-                </ul>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(fragments["hardness_summary"], unsafe_allow_html=True)
         
-        # Dimension-specific recommendations
-        highest_dimension = max(dimension_scores, key=dimension_scores.get)
-        highest_score = dimension_scores[highest_dimension]
-        
-        st.markdown(f"""
-        <div class="analysis-card">
-            <h4>🎯 Priority Focus Area</h4>
-            <p>Your primary challenge is in <strong>{highest_dimension}</strong> with a score of {highest_score:.2f}/5.</p>
-            <p><strong>Recommended focus:</strong> {get_dimension_focus_recommendation(highest_dimension, highest_score)}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        # Strategic recommendations based on the overall score, then the dimension-specific focus
+        st.markdown(fragments["recommendation"], unsafe_allow_html=True)
+        st.markdown(fragments["priority_focus"], unsafe_allow_html=True)
 
 def get_dimension_focus_recommendation(dimension, score):
     """Get specific recommendations for each dimension"""
@@ -1962,133 +1106,135 @@ def get_dimension_color(dimension):
     return colors.get(dimension, "#667eea")
 
 # ----------------------------- ANALYSIS FUNCTION -----------------------------
+def create_stream_slots():
+    """Lay out empty slots that each stage's result is streamed into as it completes"""
+    st.markdown("### ⚡ Live Results")
+    slots = {
+        "hardness_summary": st.empty(),
+        "vocabulary": st.empty(),
+        "current_system": st.empty()
+    }
+    
+    # Question cards fill in under their VUIA dimension
+    cols = st.columns(len(VUIA_MAPPING))
+    for col, (dimension, questions) in zip(cols, VUIA_MAPPING.items()):
+        with col:
+            st.markdown(f"#### {get_dimension_icon(dimension)} {dimension}")
+            for question_key in questions:
+                slots[question_key] = st.empty()
+    return slots
 
-def show_magic_wand_loader():
-    """Magical transformation loader"""
-    magic_frames = [
-        "✨ Gathering business insights...",
-        "🔮 Analyzing patterns...",
-        "🌟 Revealing opportunities...",
-        "💫 Crafting solutions...",
-        "🎯 Focusing recommendations..."
-    ]
+def render_streamed_stage(slots, api, result):
+    """Render one completed stage's cleaned output and score into its slot"""
+    name = api["name"]
+    if name not in slots:
+        return
     
-    placeholder = st.empty()
-    for i in range(12):
-        frame = magic_frames[i % len(magic_frames)]
-        
-        placeholder.markdown(f"""
-        <div style="text-align: center; padding: 40px;">
-            <div style="font-size: 2.5rem; margin-bottom: 30px;">
-                                {frame}
-            </div>
-            <div style="display: flex; justify-content: center; gap: 10px; margin: 30px 0;">
-                <div style="width: 15px; height: 15px; background: #667eea; border-radius: 50%; animation: bounce 0.6s infinite alternate; animation-delay: 0s"></div>
-                <div style="width: 15px; height: 15px; background: #667eea; border-radius: 50%; animation: bounce 0.6s infinite alternate; animation-delay: 0.2s"></div>
-                <div style="width: 15px; height: 15px; background: #667eea; border-radius: 50%; animation: bounce 0.6s infinite alternate; animation-delay: 0.4s"></div>
-                <div style="width: 15px; height: 15px; background: #667eea; border-radius: 50%; animation: bounce 0.6s infinite alternate; animation-delay: 0.6s"></div>
-                <div style="width: 15px; height: 15px; background: #667eea; border-radius: 50%; animation: bounce 0.6s infinite alternate; animation-delay: 0.8s"></div>
-            </div>
-            <div style="font-size: 1.1rem; color: #666; font-style: italic;">
-                Working magic on your problem statement...
+    with slots[name].container():
+        if name == "hardness_summary":
+            st.markdown(difficulty_card_html(summary_scores(result)["difficulty_score"]), unsafe_allow_html=True)
+        elif name == "vocabulary":
+            with st.expander("📚 Extracted Vocabulary", expanded=True):
+                st.markdown(result)
+        elif name == "current_system":
+            with st.expander("🔄 Current System Analysis", expanded=True):
+                st.markdown(result)
+        else:
+            score = answer_score(result)
+            st.markdown(f"""
+            <div class="question-card">
+                <span style="font-weight: 700; color: #333;">{name}</span>
+                <span class="score-badge">{score}/5</span>
             </div>
-        </div>
-        <style>
-        @keyframes sparkle {{
-            0%, 100% {{ opacity: 1; transform: scale(1); }}
-            50% {{ opacity: 0.5; transform: scale(1.2); }}
-        }}
-        @keyframes bounce {{
-            0% {{ transform: translateY(0px); opacity: 0.3; }}
-            100% {{ transform: translateY(-15px); opacity: 1; }}
-        }}
-        </style>
-        """, unsafe_allow_html=True)
-        time.sleep(0.5)
-
-
-
-def show_creative_loader():
-    """Randomly select and show one of the creative loaders"""
-    loaders = [
-        show_magic_wand_loader
-    ]
-    
-    # Select a random loader
-    selected_loader = random.choice(loaders)
-    selected_loader()
+            """, unsafe_allow_html=True)
+            with st.expander(api["description"]):
+                st.markdown(strip_score_block(result))
 
-# Then modify the run_analysis function to use the creative loader:
+def run_analysis(problem, analysis_id=None):
+    """Submit the analysis as a background job and follow it until it finishes - pass analysis_id to resume one"""
+    st.session_state.result = None
+    st.session_state.selected_vuia_dimension = None
+    st.session_state.show_vocabulary = False
+    cancel_analysis_job()
+    st.session_state.analysis_job_id = submit_analysis_job(
+        problem, use_cache=st.session_state.use_response_cache, analysis_id=analysis_id
+    )
+    
+    return follow_analysis_job()
 
-def run_analysis(problem):
-    """Run the complete analysis and store results in session state"""
-    placeholder = st.empty()
+def follow_analysis_job():
+    """
+    Show live progress for this session's analysis job and store its results in session state
+    once it finishes. The job keeps running if the page is rerun, so this can be called again
+    on the next run to pick it back up. Returns True if the analysis completed.
+    """
+    job = get_job(st.session_state.analysis_job_id)
+    if job is None:
+        st.session_state.analysis_job_id = None
+        return False
     
-    try:
-        # Show initial loader
-        with placeholder.container():
-            show_creative_loader()
-        
-        outputs = {}
-        st.session_state.outputs = {}
-        st.session_state.difficulty_score = 0.0
-        st.session_state.dimension_scores = {
-            "Volatility": 0.0,
-            "Ambiguity": 0.0,
-            "Interconnectedness": 0.0,
-            "Uncertainty": 0.0
-        }
-        st.session_state.individual_scores = {}
-        st.session_state.selected_vuia_dimension = None
-        st.session_state.show_vocabulary = False
-        
-        total_apis = len(API_CONFIGS)
+    configs = {api['name']: api for api in API_CONFIGS}
+    placeholder = st.empty()
+    heartbeat = st.empty()
+    stream_slots = create_stream_slots() if st.session_state.stream_results else {}
+    rendered = 0
+    
+    # Follow the job's stage events, rendering stages as they complete - the loader only changes
+    # when a stage starts or finishes, and the browser animates it in between. Streamlit only stops
+    # or reruns a script when it sends an element, so a wait that times out sends an empty one.
+    shown_version = None
+    while True:
+        version = job["version"]
+        finished = is_job_finished(job)
+        completed = list(job["completed_stages"])
+        for name in completed[rendered:]:
+            render_streamed_stage(stream_slots, configs[name], job["outputs"][name])
+        rendered = len(completed)
+        if finished:
+            break
         
-        # Process APIs one by one
-        for i, api in enumerate(API_CONFIGS):
-            # Update progress in loader
+        if version != shown_version:
+            shown_version = version
+            running = [configs[name]['description'] for name in list(job["running_stages"])]
+            if not running:
+                current_task = "Waiting for a free worker..." if job["status"] == "queued" else "Starting stages..."
+            elif len(running) == 1:
+                current_task = running[0]
+            else:
+                current_task = f"{len(running)} stages in parallel"
             with placeholder.container():
-                show_progress_loader(i, total_apis, api['description'])
-            
-            result = call_api(api, problem, outputs)
-            result_clean = clean_output(result)
-            outputs[api['name']] = result_clean
-        
-        st.session_state.outputs = outputs
-        
-        # Update individual scores from the actual answer texts
-        update_individual_scores_from_answers()
-        
-        # Extract scores from hardness_summary API
-        if outputs.get('hardness_summary'):
-            st.session_state.difficulty_score = extract_difficulty_score(outputs['hardness_summary'])
-            st.session_state.dimension_scores = extract_dimension_scores(outputs['hardness_summary'])
-        
-        st.session_state.analysis_complete = True
-        
-        # Clear the loader
-        placeholder.empty()
-        st.success("✅ Analysis Complete!")
-        
-    except Exception as e:
-        # Clear the loader on error too
-        placeholder.empty()
-        st.error(f"❌ An error occurred during analysis: {str(e)}")
-        st.session_state.analysis_complete = False
+                show_progress_loader(len(completed), job["total_stages"], current_task)
+        if wait_for_job_update(job, version, JOB_POLL_SECONDS) == version:
+            heartbeat.empty()
+    
+    # Clear the loader
+    placeholder.empty()
+    st.session_state.analysis_job_id = None
+    
+    if job["status"] != "done":
+        st.error(f"❌ An error occurred during analysis: {job['error'] or job['status']}")
+        st.session_state.result = None
+        return False
+    
+    result = job["result"]
+    st.session_state.result = result
+    st.success("✅ Analysis Complete!")
+    
+    if result.failed_stages:
+        st.warning(f"⚠️ {len(result.failed_stages)} stages failed ({', '.join(result.failed_stages)}). "
+                   "Use Resume Analysis to rerun only those stages.")
+    return True
 
 def show_progress_loader(current, total, current_task):
-    """Show progress loader with current task"""
+    """Show progress loader with current task - the dots and bar shimmer are CSS animations, so it needs no redraws"""
     progress = (current) / total
-    loader_frames = ["⏳", "⏳", "⏳", "⌛", "⌛", "⌛"]
-    current_frame = loader_frames[current % len(loader_frames)]
     
     st.markdown(f"""
     <div style="text-align: center; padding: 40px;">
-        <div style="font-size: 3rem; margin-bottom: 20px;">{current_frame}</div>
         <h3 style="color: #333; margin-bottom: 20px;">Analyzing Your Business Problem</h3>
-        <div style="width: 100%; background: #f0f0f0; border-radius: 10px; height: 20px; margin: 20px auto;">
-            <div style="width: {progress * 100}%; height: 100%; background: linear-gradient(90deg, #667eea, #764ba2); 
-                     border-radius: 10px; transition: width 0.3s ease;"></div>
+        <div class="loader-dots"><span></span><span></span><span></span><span></span><span></span></div>
+        <div class="progress-container">
+            <div class="progress-bar" style="width: {progress * 100}%;"></div>
         </div>
         <div style="margin-top: 10px; font-size: 1.1rem; color: #666;">
             {int(progress * 100)}% Complete
@@ -2101,9 +1247,8 @@ def show_progress_loader(current, total, current_task):
         </div>
     </div>
     """, unsafe_allow_html=True)
-    time.sleep(0.1)  
 
-# Small delay to show the update# ----------------------------- SIDEBAR NAVIGATION -----------------------------
+# ----------------------------- SIDEBAR NAVIGATION -----------------------------
 # In the sidebar section, update the New Analysis button:
 with st.sidebar:
 
@@ -2112,7 +1257,7 @@ with st.sidebar:
     <div style="text-align: center; margin-bottom: 20px;">
         <a href="#" class="musigma-logo-link">
             <div class="musigma-logo">
-                <img src="https://upload.wikimedia.org/wikipedia/en/0/0c/Mu_Sigma_Logo.jpg" width="120" height="100" style="border-radius: 8px;">
+                <img src="{logo_data_uri()}" alt="Mu Sigma" width="120" height="100" style="border-radius: 8px;">
             </div>
         </a>
     </div>
@@ -2127,34 +1272,33 @@ with st.sidebar:
     }
     
     for page_key, page_name in pages.items():
-        if st.button(page_name, 
-                    use_container_width=True, 
-                    type="primary" if st.session_state.current_page == page_key else "secondary",
-                    key=f"sidebar_{page_key.replace(' ', '_').replace(':', '')}"):
-            st.session_state.current_page = page_key
-            st.rerun()
+        st.button(page_name, 
+                  use_container_width=True, 
+                  type="primary" if st.session_state.current_page == page_key else "secondary",
+                  key=f"sidebar_{page_key.replace(' ', '_').replace(':', '')}",
+                  on_click=go_to_page, args=(page_key,))
     
     # Add New Analysis button in the navigation section
     st.markdown("---")
-    if st.button("🔄 New Analysis", use_container_width=True, type="secondary", key="sidebar_new_analysis"):
-        reset_application()
-        st.rerun()  # Force a rerun to reflect the reset
+    st.button("🔄 New Analysis", use_container_width=True, type="secondary", key="sidebar_new_analysis",
+              on_click=reset_application)
     
     # Rest of your sidebar code...
     
     st.markdown("---")
     
-    if st.session_state.analysis_complete:
+    result = st.session_state.result
+    if result is not None:
         st.markdown("### 📈 Analysis Status")
         st.success("✅ Analysis Complete")
         
-        score = st.session_state.difficulty_score
+        score = result.difficulty_score
         level, color, emoji = get_difficulty_level(score)
         st.metric("Overall Difficulty Score", f"{score:.2f}")
         
         st.markdown("### 🎯 VUIA Scores")
         cols = st.columns(2)
-        dimension_scores = st.session_state.dimension_scores
+        dimension_scores = result.dimension_scores
         with cols[0]:
             st.metric("Volatility", f"{dimension_scores['Volatility']:.2f}")
             st.metric("Ambiguity", f"{dimension_scores['Ambiguity']:.2f}")
@@ -2162,15 +1306,154 @@ with st.sidebar:
             st.metric("Interconnectedness", f"{dimension_scores['Interconnectedness']:.2f}")
             st.metric("Uncertainty", f"{dimension_scores['Uncertainty']:.2f}")
         
+        traffic = result.traffic
+        if traffic:
+            st.caption(f"📦 Sent {traffic['bytes_sent'] / 1024:.1f} KB and received {traffic['bytes_received'] / 1024:.1f} KB "
+                       f"in {traffic['requests']} requests")
+        if "total" in result.timings:
+            resumed = len(result.provenance.get("resumed_stages", []))
+            st.caption(f"⏱️ Took {result.timings['total']:.1f}s" + (f" · {resumed} stages resumed" if resumed else ""))
+        
         if st.session_state.problem_statement:
             problem_preview = st.session_state.problem_statement[:100] + "..." if len(st.session_state.problem_statement) > 100 else st.session_state.problem_statement
             st.markdown("### 📝 Problem Preview")
             st.info(f"{st.session_state.customer}: {problem_preview}")
+    elif get_job(st.session_state.analysis_job_id):
+        job = get_job(st.session_state.analysis_job_id)
+        st.markdown("### 📈 Analysis Status")
+        st.info(f"⏳ Analysis running in the background - {len(job['completed_stages'])} of {job['total_stages']} stages done")
     else:
         st.warning("⏳ No analysis completed")
+    
+    with st.expander("🔌 Connection Pool"):
+        pool_stats = get_http_pool_stats()
+        st.caption(f"Pool size {pool_stats['pool_size']} · {pool_stats['per_host_limit']} per host")
+        cols = st.columns(2)
+        with cols[0]:
+            st.metric("Reused", pool_stats["hits"])
+        with cols[1]:
+            st.metric("Opened", pool_stats["misses"])
+        st.caption(f"Hit rate: {pool_stats['hit_rate']:.0%}")
+        header_stats = get_header_negotiation_stats()
+        for endpoint, variant in header_stats["variants"].items():
+            st.caption(f"Headers for {endpoint}: {variant}")
+        st.caption(f"Header probes: {header_stats['probe_successes']} accepted · "
+                   f"{header_stats['probe_failures']} rejected · {header_stats['reprobes']} re-probes")
+    
+    with st.expander("🚦 Agency Concurrency"):
+        limiter_stats = get_limiter_stats()
+        process_stats = limiter_stats["process"]
+        cols = st.columns(2)
+        with cols[0]:
+            st.metric("Limit", process_stats["limit"])
+            st.metric("Queued", process_stats["queue_depth"])
+        with cols[1]:
+            st.metric("In Flight", process_stats["in_flight"])
+            st.metric("Avg Wait", f"{process_stats['avg_wait'] * 1000:.0f} ms")
+        for agency_id, agency_stats in limiter_stats["agencies"].items():
+            st.caption(f"Agency {agency_id}: limit {agency_stats['limit']} · {agency_stats['in_flight']} in flight · "
+                       f"{agency_stats['queue_depth']} queued · max wait {agency_stats['max_wait']:.1f}s")
+        circuit_stats = get_circuit_stats()
+        for endpoint, circuit in circuit_stats["endpoints"].items():
+            if circuit["state"] != "closed":
+                st.warning(f"Endpoint {endpoint} circuit {circuit['state'].replace('_', '-')} - "
+                           f"{circuit['rejected']} calls failed fast")
+        for agency_id, circuit in circuit_stats["agencies"].items():
+            if circuit["state"] != "closed":
+                st.warning(f"Agency {agency_id} circuit {circuit['state'].replace('_', '-')} - "
+                           f"{circuit['rejected']} calls failed fast")
+    
+    with st.expander("⏱️ Render Timings"):
+        # Server-side time from a click to the end of the rerun it triggered - the browser's paint comes after
+        if not st.session_state.render_timings:
+            st.caption("No reruns timed yet")
+        for region, timings in st.session_state.render_timings.items():
+            ordered = sorted(timings)
+            st.caption(f"{region}: median {ordered[len(ordered) // 2] * 1000:.0f} ms · "
+                       f"worst {ordered[-1] * 1000:.0f} ms over {len(ordered)} runs")
+    
+    with st.expander("📦 Engine Imports"):
+        # Each engine module loads on first use - aiohttp only once the first stage is sent
+        import_stats = get_import_stats()
+        for module, milliseconds in import_stats["modules"].items():
+            st.caption(f"{module}: {milliseconds:.0f} ms")
+        st.caption("Loaded: " + ", ".join(name for name, loaded in import_stats["heavy_dependencies"].items() if loaded)
+                   if any(import_stats["heavy_dependencies"].values()) else "No heavy dependencies loaded yet")
+    
+    with st.expander("🪞 Hedged Requests"):
+        hedge_stats = get_hedging_stats()
+        if not hedge_stats["enabled"]:
+            st.caption("Hedging is off - set HEDGE_ENABLED in analysis_engine/config.py to turn it on")
+        cols = st.columns(2)
+        with cols[0]:
+            st.metric("Hedges Fired", hedge_stats["hedges_fired"])
+        with cols[1]:
+            st.metric("Hedges Won", hedge_stats["hedges_won"])
+        st.caption(f"{hedge_stats['hedge_rate']:.1%} of {hedge_stats['calls']} calls hedged · "
+                   f"win rate {hedge_stats['win_rate']:.0%} · {hedge_stats['over_budget']} skipped over budget")
+    
+    with st.expander("🧾 Structured Scores"):
+        structured_stats = get_structured_score_stats()
+        if not structured_stats["enabled"]:
+            st.caption("Structured scores are off - set STRUCTURED_SCORES_ENABLED in analysis_engine/config.py to turn them on")
+        cols = st.columns(2)
+        with cols[0]:
+            st.metric("JSON Blocks", structured_stats["structured"])
+        with cols[1]:
+            st.metric("Regex Fallbacks", structured_stats["fallback"])
+        st.caption(f"{structured_stats['structured_rate']:.0%} of scores read from JSON blocks")
+        fallback_stages = [stage for stage, counts in structured_stats["stages"].items() if counts["fallback"]]
+        if fallback_stages:
+            st.caption(f"Fell back on: {', '.join(fallback_stages)}")
+    
+    with st.expander("💾 Response Cache"):
+        cache_stats = get_response_cache_stats()
+        st.caption(f"{cache_stats['entries']} responses · {cache_stats['bytes'] / 1024 / 1024:.1f} of "
+                   f"{cache_stats['max_bytes'] / 1024 / 1024:.0f} MB")
+        cols = st.columns(2)
+        with cols[0]:
+            st.metric("Hits", cache_stats["hits"])
+        with cols[1]:
+            st.metric("Misses", cache_stats["misses"])
+        st.caption(f"Hit rate: {cache_stats['hit_rate']:.0%}")
+        if st.button("🗑️ Clear Cache", use_container_width=True, key="sidebar_clear_cache"):
+            clear_response_cache()
+            st.rerun()
+    
+    with st.expander("🧠 Memory"):
+        memory = get_process_memory()
+        store_stats = get_output_store_stats()
+        cols = st.columns(2)
+        with cols[0]:
+            st.metric("Resident", f"{memory['rss_bytes'] / 1024 / 1024:.0f} MB" if memory["rss_bytes"] else "N/A")
+        with cols[1]:
+            st.metric("Peak", f"{memory['peak_rss_bytes'] / 1024 / 1024:.0f} MB" if memory["peak_rss_bytes"] else "N/A")
+        if not store_stats["enabled"]:
+            st.caption("Output spilling is off - set OUTPUT_STORE_ENABLED in analysis_engine/config.py to turn it on")
+        st.caption(f"{store_stats['hot_entries']} hot outputs · {store_stats['hot_bytes'] / 1024 / 1024:.1f} of "
+                   f"{store_stats['max_hot_bytes'] / 1024 / 1024:.0f} MB in memory · hit rate {store_stats['hit_rate']:.0%}")
+        st.caption(f"{store_stats['written']} blobs written · compressed to {store_stats['compression_ratio']:.0%}"
+                   + (f" · {store_stats['missing']} missing" if store_stats["missing"] else ""))
+
+def check_stored_outputs():
+    """
+    Check once per result whether any of its stored outputs have expired. If so, the analysis
+    is reopened so Resume Analysis on the Home page restores them, and every page says so.
+    """
+    result = st.session_state.result
+    if result is not None and st.session_state.outputs_checked is not result:
+        st.session_state.outputs_checked = result
+        st.session_state.missing_stages = result.missing_stages
+        if st.session_state.missing_stages:
+            reopen_checkpoint(result.analysis_id, result.problem)
+    if result is not None and st.session_state.missing_stages:
+        st.warning(f"⚠️ The saved outputs of {len(st.session_state.missing_stages)} stages have expired "
+                   f"({', '.join(st.session_state.missing_stages)}). Use Resume Analysis on the Home page "
+                   "to restore them.")
 
 # ----------------------------- MAIN APP ROUTING -----------------------------
 def main():
+    check_stored_outputs()
     if st.session_state.current_page == "Page 1: Input":
         render_page_1()
     elif st.session_state.current_page == "Page 2: Analysis":
@@ -2182,3 +1465,4 @@ def main():
 
 if __name__ == "__main__":
     main()
+    record_render_time("Full rerun", RUN_STARTED)
@@ -0,0 +1,83 @@
+"""
+Business problem analysis pipeline - agency calls, stage scheduling, background jobs and score extraction.
+
+Names are imported from their submodule on first use, so a worker that only scores text loads
+the standard-library extractors and never pays for asyncio, sqlite3 or aiohttp. Tunables live in
+analysis_engine.config and are read at call time - set them there, not on this package.
+"""
+import importlib
+import sys
+import time
+
+_EXPORTS = {
+    "extraction": [
+        "ANSWER_SCORE_PATTERNS", "DIFFICULTY_CALCULATED_PATTERNS", "DIFFICULTY_FALLBACK_PATTERNS",
+        "DIMENSION_AVERAGE_PATTERNS", "DIMENSION_PATTERNS", "INDIVIDUAL_SCORE_PATTERNS",
+        "extract_difficulty_score", "extract_dimension_scores", "extract_individual_scores",
+        "extract_score_from_answer_text", "extract_summary_scores"
+    ],
+    "utils": ["API_FAILURE_PREFIX", "clean_output", "is_failed_response", "json_to_text"],
+    "prompts": [
+        "API_CONFIGS", "SCORE_BLOCK_REQUESTS", "SUMMARY_SECTIONS", "VUIA_MAPPING", "compact_question_context",
+        "compact_summary_context", "follow_up_goal", "full_summary_context", "question_context",
+        "score_block_request", "summary_context"
+    ],
+    "scoring": [
+        "answer_score", "get_structured_score_stats", "parse_answer_score_block", "parse_summary_score_block",
+        "read_score_block", "score_outputs", "strip_score_block", "summary_scores"
+    ],
+    "result": ["AnalysisResult"],
+    "store": [
+        "MISSING_OUTPUT_PREFIX", "StoredOutputs", "get_output_store_stats", "get_process_memory", "is_missing_output",
+        "load_output", "output_handle", "prune_output_store", "spill_output"
+    ],
+    "cache": [
+        "cache_get", "cache_put", "clear_response_cache", "find_resumable_analysis", "finish_checkpoint",
+        "get_response_cache_stats", "load_checkpoint", "reopen_checkpoint", "response_cache_key",
+        "save_stage_checkpoint", "start_checkpoint"
+    ],
+    "agency": [
+        "CircuitOpenError", "call_api", "call_api_async", "close_http_session", "get_agency_id",
+        "get_circuit_stats", "get_engine_loop", "get_header_negotiation_stats", "get_hedging_stats",
+        "get_http_pool_stats", "get_http_session", "get_limiter_stats", "run_sync", "run_sync_with_callbacks",
+        "shutdown_engine"
+    ],
+    "pipeline": [
+        "build_stage_graph", "cancel_job", "get_job", "get_job_runner", "get_stage_dependencies",
+        "is_job_finished", "run_analysis_async", "run_stages", "run_stages_async", "submit_analysis_job",
+        "wait_for_job_update"
+    ]
+}
+_SUBMODULES = ["config", *_EXPORTS]
+_EXPORT_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+_import_timings = {}  # Submodule -> milliseconds its first import took, including submodules it pulled in
+
+__all__ = sorted(_EXPORT_MODULES) + ["config", "get_import_stats"]
+
+def _load(module):
+    qualified = f"{__name__}.{module}"
+    if qualified not in sys.modules:
+        started = time.perf_counter()
+        importlib.import_module(qualified)
+        _import_timings[module] = (time.perf_counter() - started) * 1000
+    return sys.modules[qualified]
+
+def __getattr__(name):
+    if name in _EXPORT_MODULES:
+        value = getattr(_load(_EXPORT_MODULES[name]), name)
+        globals()[name] = value  # Later lookups skip __getattr__
+        return value
+    if name in _SUBMODULES:
+        return _load(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+def get_import_stats():
+    """Get how long each engine submodule took to import, and whether the heavy dependencies are loaded yet"""
+    return {
+        "modules": dict(_import_timings),
+        "loaded": [module for module in _SUBMODULES if f"{__name__}.{module}" in sys.modules],
+        "heavy_dependencies": {name: name in sys.modules for name in ("asyncio", "sqlite3", "aiohttp")}
+    }
@@ -0,0 +1,619 @@
+"""
+Agency calls on the shared engine loop - pooled HTTP session, adaptive concurrency limits,
+circuit breakers, header negotiation, hedging and retries.
+aiohttp is imported when the first session is opened, so importing this module stays cheap.
+"""
+import asyncio
+import collections
+import contextlib
+import contextvars
+import json
+import queue
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from . import config
+from .cache import cache_get, cache_put, response_cache_key
+from .prompts import follow_up_goal
+from .utils import API_FAILURE_PREFIX, is_failed_response, json_to_text
+
+# ----------------------------- ASYNC ENGINE -----------------------------
+_engine_loop = None
+_engine_loop_lock = threading.Lock()
+
+def get_engine_loop():
+    """Get the process-wide event loop that runs every agency request on one background thread"""
+    global _engine_loop
+    with _engine_loop_lock:
+        if _engine_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="analysis-engine-loop", daemon=True).start()
+            _engine_loop = loop
+    return _engine_loop
+
+def run_sync(coro):
+    """Run a coroutine on the engine loop and block the calling thread until it finishes"""
+    return asyncio.run_coroutine_threadsafe(coro, get_engine_loop()).result()
+
+def run_sync_with_callbacks(make_coro, **callbacks):
+    """
+    Run make_coro(**callbacks) on the engine loop, but invoke the callbacks on the
+    calling thread so they can safely update the Streamlit page
+    """
+    events = queue.Queue()
+    
+    def relay(callback):
+        if callback is None:
+            return None
+        return lambda *args: events.put((callback, args))
+    
+    future = asyncio.run_coroutine_threadsafe(
+        make_coro(**{name: relay(callback) for name, callback in callbacks.items()}),
+        get_engine_loop()
+    )
+    future.add_done_callback(lambda _: events.put(None))
+    
+    try:
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            callback, args = event
+            callback(*args)
+    except BaseException:
+        future.cancel()
+        raise
+    return future.result()
+
+_http_session = None
+_http_pool_counters = {"hits": 0, "misses": 0}  # Only ever incremented on the engine loop thread
+
+def _count_pool_event(event):
+    async def on_event(session, trace_ctx, params):
+        _http_pool_counters[event] += 1
+    return on_event
+
+def get_http_session():
+    """
+    Get the process-wide pooled keep-alive session shared by every stage and every Streamlit session.
+    Must be called from a coroutine running on the engine loop, which owns the session.
+    """
+    global _http_session
+    if _http_session is not None:
+        return _http_session
+    
+    import aiohttp  # Deferred - it is most of the engine's import time, and only needed once a stage runs
+    
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_reuseconn.append(_count_pool_event("hits"))
+    trace_config.on_connection_create_end.append(_count_pool_event("misses"))
+    
+    connector = aiohttp.TCPConnector(
+        limit=config.HTTP_POOL_SIZE,
+        limit_per_host=config.HTTP_POOL_PER_HOST,
+        keepalive_timeout=config.HTTP_KEEPALIVE_SECONDS
+    )
+    _http_session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+    return _http_session
+
+async def close_http_session():
+    """Close the shared session and its pooled connections - the next get_http_session() opens a new one"""
+    global _http_session
+    session, _http_session = _http_session, None
+    if session is not None:
+        await session.close()
+
+def shutdown_engine():
+    """
+    Close the shared session on the engine loop and stop the loop - call it before a script exits, so
+    its pooled connections are closed rather than left to garbage collection. A later call starts afresh.
+    """
+    global _engine_loop
+    with _engine_loop_lock:
+        loop, _engine_loop = _engine_loop, None
+    if loop is None:
+        return
+    asyncio.run_coroutine_threadsafe(close_http_session(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+
+def get_http_pool_stats():
+    """Get connection pool hit/miss counts - a hit reuses a kept-alive connection, a miss opens a new one"""
+    stats = dict(_http_pool_counters)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / total if total else 0.0
+    stats["pool_size"] = config.HTTP_POOL_SIZE
+    stats["per_host_limit"] = config.HTTP_POOL_PER_HOST
+    return stats
+
+# ----------------------------- CONCURRENCY LIMITS -----------------------------
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for agency requests - the limit grows by about one per window of
+    healthy responses and is cut by LIMIT_BACKOFF on a 429/5xx, an error or a slow response.
+    Only used from the engine loop.
+    """
+    def __init__(self, name, initial, max_limit):
+        self.name = name
+        self.limit = float(initial)
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.waiters = collections.deque()
+        self.avg_latency = None
+        self.stats = {"requests": 0, "waited": 0, "total_wait": 0.0, "max_wait": 0.0,
+                      "increases": 0, "decreases": 0}
+
+    async def acquire(self, deadline=None):
+        """Take a slot, queueing for one if needed - raises asyncio.TimeoutError if none frees up by deadline"""
+        started = time.monotonic()
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                if deadline is None:
+                    await waiter
+                else:
+                    await asyncio.wait_for(waiter, deadline - time.monotonic())
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                self.waiters.remove(waiter)
+                if waiter.done() and not waiter.cancelled():
+                    # Woken and then cancelled before it ran - pass the wakeup on or the free slot sits idle
+                    self._wake_waiters()
+                raise
+            self.waiters.remove(waiter)
+        self.in_flight += 1
+        
+        wait = time.monotonic() - started
+        self.stats["requests"] += 1
+        if wait > 0.001:
+            self.stats["waited"] += 1
+        self.stats["total_wait"] += wait
+        self.stats["max_wait"] = max(self.stats["max_wait"], wait)
+
+    def release(self, latency, overloaded):
+        self.in_flight -= 1
+        slow = self.avg_latency is not None and latency > config.LIMIT_SLOW_FACTOR * self.avg_latency
+        if overloaded or slow:
+            self.limit = max(config.LIMIT_MIN, self.limit * config.LIMIT_BACKOFF)
+            self.stats["decreases"] += 1
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.stats["increases"] += 1
+        if not overloaded:
+            self.avg_latency = latency if self.avg_latency is None else 0.8 * self.avg_latency + 0.2 * latency
+        self._wake_waiters()
+
+    def release_unused(self):
+        """Give back a slot that never sent a request, leaving the limit as it was"""
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        # Wake as many waiters as the limit has free slots for - woken ones that have not run yet hold one each
+        free = int(self.limit) - self.in_flight
+        for waiter in self.waiters:
+            if free <= 0:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+            free -= 1
+
+    def snapshot(self):
+        requests = self.stats["requests"]
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": len(self.waiters),
+            "avg_latency": self.avg_latency or 0.0,
+            "avg_wait": self.stats["total_wait"] / requests if requests else 0.0,
+            "max_wait": self.stats["max_wait"],
+            "requests": requests,
+            "waited": self.stats["waited"],
+            "increases": self.stats["increases"],
+            "decreases": self.stats["decreases"]
+        }
+
+_process_limiter = None  # Created on first use, so it picks up config set after import
+_agency_limiters = {}
+
+def get_agency_id(url):
+    """Get the agency_id an agency URL points at"""
+    return parse_qs(urlparse(url).query).get("agency_id", [url])[0]
+
+def get_endpoint(url):
+    """Get the endpoint an agency URL posts to - the URL without its agency query string"""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+
+def _get_process_limiter():
+    global _process_limiter
+    if _process_limiter is None:
+        _process_limiter = AdaptiveLimiter("process", config.PROCESS_LIMIT_INITIAL, config.PROCESS_LIMIT_MAX)
+    return _process_limiter
+
+def _get_agency_limiter(url):
+    agency_id = get_agency_id(url)
+    if agency_id not in _agency_limiters:
+        _agency_limiters[agency_id] = AdaptiveLimiter(agency_id, config.AGENCY_LIMIT_INITIAL, config.AGENCY_LIMIT_MAX)
+    return _agency_limiters[agency_id]
+
+@contextlib.asynccontextmanager
+async def limit_agency_request(url, deadline=None):
+    """
+    Hold a slot in the agency's and the process's concurrency limits for one request.
+    Set "overloaded" on the yielded dict for a 429/5xx - exceptions count as overloaded too.
+    Raises asyncio.TimeoutError if the slots are not free before deadline, a time.monotonic() value.
+    A request cancelled in flight, like a hedge loser, gives its slots back without a latency sample.
+    """
+    request = {"overloaded": False}
+    acquired = []
+    started = None
+    cancelled = False
+    try:
+        # Each slot is recorded as soon as it is taken, so a request cancelled while waiting for
+        # the next limiter still gives back the ones it holds
+        for limiter in (_get_agency_limiter(url), _get_process_limiter()):
+            await limiter.acquire(deadline)
+            acquired.append(limiter)
+        if deadline is not None and time.monotonic() >= deadline:
+            raise asyncio.TimeoutError("deadline exceeded")
+        started = time.monotonic()
+        yield request
+    except asyncio.CancelledError:
+        cancelled = True
+        raise
+    except Exception:
+        request["overloaded"] = True
+        raise
+    finally:
+        for limiter in reversed(acquired):
+            if started is None or cancelled:
+                limiter.release_unused()
+            else:
+                limiter.release(time.monotonic() - started, request["overloaded"])
+
+def get_limiter_stats():
+    """Get the current limit, in-flight count, queue depth and wait times for the process and each agency"""
+    return {
+        "process": _get_process_limiter().snapshot(),
+        "agencies": {agency_id: limiter.snapshot() for agency_id, limiter in _agency_limiters.items()}
+    }
+
+# ----------------------------- CIRCUIT BREAKERS -----------------------------
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to an agency URL whose circuit, or whose endpoint's circuit, is open"""
+
+# Each agency URL has a circuit, and so does the endpoint they all post to - consecutive failures across
+# its agencies open the endpoint's circuit, so a server that is down is not tried once per agency
+_circuits = {}
+_endpoint_circuits = {}
+
+def _get_circuit(circuits, key):
+    if key not in circuits:
+        circuits[key] = {"state": "closed", "failures": 0, "opened_at": 0.0, "probing": False,
+                         "opens": 0, "rejected": 0}
+    return circuits[key]
+
+def _check_circuit(circuit, target):
+    """Raise CircuitOpenError if a circuit turns the request away, else tell whether the request is its probe"""
+    if circuit["state"] == "open":
+        if time.monotonic() - circuit["opened_at"] < config.CIRCUIT_RESET_SECONDS:
+            circuit["rejected"] += 1
+            raise CircuitOpenError(f"Circuit open for {target} - failing fast")
+        circuit["state"] = "half_open"
+    if circuit["state"] == "half_open":
+        # Only one probe request at a time decides whether the agency has recovered
+        if circuit["probing"]:
+            circuit["rejected"] += 1
+            raise CircuitOpenError(f"Circuit half-open for {target} - probe in flight")
+        return True
+    return False
+
+def circuit_allow(url):
+    """Check an agency URL's circuits before a request - raises CircuitOpenError while either is open"""
+    circuits = [_get_circuit(_endpoint_circuits, get_endpoint(url)), _get_circuit(_circuits, url)]
+    # Both are checked before either is marked probing, so a request the second turns away holds no probe
+    probes = [_check_circuit(circuits[0], f"endpoint {get_endpoint(url)}"),
+              _check_circuit(circuits[1], f"agency {get_agency_id(url)}")]
+    for circuit, probe in zip(circuits, probes):
+        if probe:
+            circuit["probing"] = True
+
+def circuit_record(url, failed):
+    """
+    Record a request outcome on the URL's and its endpoint's circuits - a failed probe or too many
+    consecutive failures open a circuit. failed is None for a request that never reached the agency,
+    cancelled or timed out waiting for a slot, which says nothing about its health.
+    """
+    for circuit in (_get_circuit(_endpoint_circuits, get_endpoint(url)), _get_circuit(_circuits, url)):
+        _record_outcome(circuit, failed)
+
+def _record_outcome(circuit, failed):
+    was_probe = circuit["state"] == "half_open"
+    circuit["probing"] = False
+    if failed is None:
+        return
+    if not failed:
+        circuit.update(state="closed", failures=0)
+        return
+    circuit["failures"] += 1
+    if was_probe or circuit["failures"] >= config.CIRCUIT_FAILURE_THRESHOLD:
+        if circuit["state"] != "open":
+            circuit["opens"] += 1
+        circuit.update(state="open", opened_at=time.monotonic())
+
+def _circuit_snapshot(circuit):
+    return {
+        "state": circuit["state"],
+        "failures": circuit["failures"],
+        "opens": circuit["opens"],
+        "rejected": circuit["rejected"]
+    }
+
+def get_circuit_stats():
+    """Get the state, consecutive failures and fail-fast count of each endpoint's and each agency's circuit"""
+    return {
+        "endpoints": {endpoint: _circuit_snapshot(circuit) for endpoint, circuit in _endpoint_circuits.items()},
+        "agencies": {get_agency_id(url): _circuit_snapshot(circuit) for url, circuit in _circuits.items()}
+    }
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter before retry number attempt + 1"""
+    return random.uniform(0, min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+
+# ----------------------------- HEADER NEGOTIATION -----------------------------
+_header_negotiation = {
+    "variants": {},
+    "counters": {"probes": 0, "probe_successes": 0, "probe_failures": 0, "reprobes": 0, "negotiated_calls": 0}
+}
+
+def build_header_variants(tenant_id, auth_token):
+    """List the (variant name, headers) combinations a server might accept, in the order they are probed"""
+    base = config.HEADERS_BASE.copy()
+    if tenant_id:
+        variants = [
+            ("Tenant-ID", dict(base, **{"Tenant-ID": tenant_id})),
+            ("X-Tenant-ID", dict(base, **{"X-Tenant-ID": tenant_id}))
+        ]
+    else:
+        variants = [("no tenant", base)]
+    if auth_token:
+        variants = [(f"{name} + Bearer", dict(h, **{"Authorization": f"Bearer {auth_token}"}))
+                    for name, h in variants]
+    return variants
+
+def get_negotiated_variant(url):
+    """Get the header variant learned for an agency URL's endpoint, or None if it still has to be probed"""
+    return _header_negotiation["variants"].get(get_endpoint(url))
+
+def record_header_outcome(url, variant, status, probing):
+    """Learn the variant a server accepted, and forget it again when the server rejects it"""
+    endpoint = get_endpoint(url)
+    counters = _header_negotiation["counters"]
+    if probing:
+        counters["probes"] += 1
+        if status == 200:
+            counters["probe_successes"] += 1
+            _header_negotiation["variants"][endpoint] = variant
+        else:
+            counters["probe_failures"] += 1
+    else:
+        counters["negotiated_calls"] += 1
+        if status in config.AUTH_FAILURE_STATUSES and _header_negotiation["variants"].get(endpoint) == variant:
+            counters["reprobes"] += 1
+            del _header_negotiation["variants"][endpoint]
+
+def get_header_negotiation_stats():
+    """Get the header variant learned for each endpoint and the probe outcome counts"""
+    return dict(_header_negotiation["counters"], variants=dict(_header_negotiation["variants"]))
+
+# ----------------------------- HEDGED REQUESTS -----------------------------
+_hedging = {
+    "latencies": {},
+    "counters": {"calls": 0, "hedges_fired": 0, "hedges_won": 0, "over_budget": 0}
+}
+
+def _hedge_delay(latencies):
+    """Get how long to wait before hedging a call, or None if there are too few recent latencies"""
+    if not config.HEDGE_ENABLED or len(latencies) < config.HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(config.HEDGE_PERCENTILE * len(ordered)))]
+
+def _take_hedge_budget():
+    counters = _hedging["counters"]
+    if counters["hedges_fired"] + 1 > config.HEDGE_BUDGET_RATIO * counters["calls"]:
+        counters["over_budget"] += 1
+        return False
+    counters["hedges_fired"] += 1
+    return True
+
+async def _call_agency_hedged(api_cfg, prompt, tenant_id, auth_token, tries, session, deadline):
+    """
+    Run _call_agency, sending a duplicate call if the first is still running past the hedge percentile
+    of the agency's recent latency. The first successful answer wins and the other call is cancelled.
+    Returns the answer and whether every round of it succeeded, as _call_agency does.
+    """
+    latencies = _hedging["latencies"].setdefault(get_agency_id(api_cfg["url"]),
+                                                 collections.deque(maxlen=config.HEDGE_LATENCY_WINDOW))
+    _hedging["counters"]["calls"] += 1
+    started = time.monotonic()
+    
+    def start_call():
+        return asyncio.ensure_future(_call_agency(api_cfg, prompt, tenant_id, auth_token, tries, session, deadline))
+    
+    tasks = {start_call(): False}  # Task -> whether it is the hedge
+    try:
+        hedge_after = _hedge_delay(latencies)
+        if hedge_after is not None and started + hedge_after < deadline:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done and _take_hedge_budget():
+                tasks[start_call()] = True
+        
+        res, complete = None, False
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                is_hedge = tasks.pop(task)
+                res, complete = task.result()
+                if not is_failed_response(res):
+                    latencies.append(time.monotonic() - started)
+                    if is_hedge:
+                        _hedging["counters"]["hedges_won"] += 1
+                    return res, complete
+        return res, complete
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def get_hedging_stats():
+    """Get how many calls were made, how many were hedged and how often the hedge answered first"""
+    stats = dict(_hedging["counters"], enabled=config.HEDGE_ENABLED)
+    stats["hedge_rate"] = stats["hedges_fired"] / stats["calls"] if stats["calls"] else 0.0
+    stats["win_rate"] = stats["hedges_won"] / stats["hedges_fired"] if stats["hedges_fired"] else 0.0
+    stats["hedge_after"] = {agency_id: _hedge_delay(latencies)
+                            for agency_id, latencies in _hedging["latencies"].items()}
+    return stats
+
+# ----------------------------- TRAFFIC ACCOUNTING -----------------------------
+# The traffic counters of the analysis the current task belongs to - stage tasks inherit it
+_analysis_traffic = contextvars.ContextVar("analysis_traffic", default=None)
+
+def count_traffic(bytes_sent, bytes_received):
+    """Add one request to the running analysis's traffic counters, if there is one"""
+    traffic = _analysis_traffic.get()
+    if traffic is not None:
+        traffic["requests"] += 1
+        traffic["bytes_sent"] += bytes_sent
+        traffic["bytes_received"] += bytes_received
+
+# ----------------------------- AGENCY CALLS -----------------------------
+async def call_api_async(api_cfg, problem_text, outputs, tenant_id=None, auth_token=None, tries=3,
+                         session=None, use_cache=True, deadline=None):
+    """
+    Calls the API with retry logic without blocking the event loop, answering from the response cache when possible.
+    deadline is a time.monotonic() value the call must finish by - it is capped at STAGE_DEADLINE_SECONDS from now.
+    tenant_id and auth_token default to config's at call time - pass "" to send none.
+    """
+    tenant_id = config.TENANT_ID if tenant_id is None else tenant_id
+    auth_token = config.AUTH_TOKEN if auth_token is None else auth_token
+    prompt = api_cfg["prompt"](problem_text, outputs)
+    
+    cache_key = None
+    if use_cache and config.RESPONSE_CACHE_ENABLED:
+        cache_key = response_cache_key(api_cfg, prompt, tenant_id)
+        cached = await asyncio.to_thread(cache_get, cache_key)
+        if cached is not None:
+            return cached
+    
+    stage_deadline = time.monotonic() + config.STAGE_DEADLINE_SECONDS
+    if deadline is not None:
+        stage_deadline = min(stage_deadline, deadline)
+    res, complete = await _call_agency_hedged(api_cfg, prompt, tenant_id, auth_token, tries,
+                                              session or get_http_session(), stage_deadline)
+    # An answer whose follow-up round failed is still used, but a later call gets to try for the full one
+    if cache_key and complete:
+        await asyncio.to_thread(cache_put, cache_key, res)
+    return res
+
+async def _post_agency(session, url, headers, payload, deadline):
+    """POST one round to an agency within the concurrency limits - returns the status and the parsed JSON or error text"""
+    if deadline - time.monotonic() <= 0:
+        raise asyncio.TimeoutError("deadline exceeded")
+    import aiohttp
+    
+    circuit_allow(url)
+    data = json.dumps(payload).encode("utf-8")
+    failed = None
+    sent = False
+    try:
+        async with limit_agency_request(url, deadline) as request:
+            sent = True
+            # Time spent queued for a slot comes out of the deadline
+            remaining = deadline - time.monotonic()
+            timeout = aiohttp.ClientTimeout(total=min(config.REQUEST_TIMEOUT_SECONDS, remaining))
+            async with session.post(url, headers=headers, data=data, timeout=timeout) as resp:
+                request["overloaded"] = resp.status == 429 or resp.status >= 500
+                failed = resp.status >= 500
+                raw = await resp.read()
+                count_traffic(len(data), len(raw))
+                if resp.status == 200:
+                    return resp.status, json.loads(raw) if raw.strip() else None
+                return resp.status, raw.decode(resp.charset or "utf-8", errors="replace")
+    except Exception:
+        failed = True if sent else None
+        raise
+    finally:
+        circuit_record(url, failed)
+
+async def _call_agency(api_cfg, prompt, tenant_id, auth_token, tries, session, deadline):
+    """
+    Send every round of a stage's conversation to its agency, retrying the first round - returns the
+    answer and whether every round succeeded. A failed follow-up round leaves the previous round's answer.
+    """
+    url = api_cfg["url"]
+    variants = build_header_variants(tenant_id, auth_token)
+
+    last_err = None
+    attempt = 0
+    while attempt < tries:
+        attempt += 1
+        # Once an endpoint has accepted a variant only that one is sent - all of them are probed again
+        # if it is rejected with an auth failure
+        learned = get_negotiated_variant(url)
+        candidates = [v for v in variants if v[0] == learned] or variants
+        i = 0
+        while i < len(candidates):
+            name, headers = candidates[i]
+            i += 1
+            probing = len(candidates) > 1 or name != learned
+            try:
+                payload = {
+                    "agency_goal": prompt,
+                    "multiround_convo": api_cfg.get("multiround_convo", 1),
+                    "user_id": "talos-rest-endpoint"
+                }
+                
+                status, body = await _post_agency(session, url, headers, payload, deadline)
+                record_header_outcome(url, name, status, probing)
+                if status != 200:
+                    last_err = f"{status}-{body}"
+                    if not probing and status in config.AUTH_FAILURE_STATUSES:
+                        candidates += [v for v in variants if v[0] != name]
+                    continue
+                res = json_to_text(body)
+                complete = True
+                
+                # Handle multiround conversation if needed
+                for r in range(1, api_cfg.get("multiround_convo", 1)):
+                    # For subsequent rounds, use the previous response as the prompt
+                    next_payload = {
+                        "agency_goal": follow_up_goal(prompt, res),
+                        "multiround_convo": 1,
+                        "user_id": "talos-rest-endpoint"
+                    }
+                    status, body = await _post_agency(session, url, headers, next_payload, deadline)
+                    if status == 200:
+                        res = json_to_text(body)
+                    else:
+                        complete = False
+                return res, complete
+            except CircuitOpenError as e:
+                # The agency is known to be down - retrying before the circuit resets only adds load
+                return f"{API_FAILURE_PREFIX} {attempt} attempts. Last error: {e}", False
+            except Exception as e:
+                last_err = str(e) or type(e).__name__
+        
+        # Only back off if there is another attempt to make and time left to make it
+        delay = backoff_delay(attempt)
+        if attempt == tries or time.monotonic() + delay >= deadline:
+            break
+        await asyncio.sleep(delay)
+    if time.monotonic() >= deadline and last_err != "deadline exceeded":
+        last_err = f"deadline exceeded after {last_err}" if last_err else "deadline exceeded"
+    return f"{API_FAILURE_PREFIX} {attempt} attempts. Last error: {last_err}", False
+
+def call_api(api_cfg, problem_text, outputs, tenant_id=None, auth_token=None, tries=3, use_cache=True):
+    """Calls the API with retry logic - blocking wrapper around call_api_async"""
+    return run_sync(call_api_async(api_cfg, problem_text, outputs, tenant_id, auth_token, tries, use_cache=use_cache))
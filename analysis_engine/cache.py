@@ -0,0 +1,242 @@
+"""On-disk SQLite stores - the agency response cache and per-stage analysis checkpoints"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from . import config
+
+# ----------------------------- RESPONSE CACHE -----------------------------
+def _connect_sqlite(path, *schema):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    for statement in schema:
+        connection.execute(statement)
+    return connection
+
+_response_cache = {"connection": None, "lock": threading.Lock(), "hits": 0, "misses": 0}
+
+def _get_cache_connection():
+    if _response_cache["connection"] is None:
+        _response_cache["connection"] = _connect_sqlite(
+            config.RESPONSE_CACHE_PATH,
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+    return _response_cache["connection"]
+
+def response_cache_key(api_cfg, prompt, tenant_id):
+    """Content-addressed key for an agency call - same agency, prompt, rounds and tenant give the same answer"""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    key_fields = [api_cfg["url"], prompt_hash, api_cfg.get("multiround_convo", 1), tenant_id or ""]
+    return hashlib.sha256(json.dumps(key_fields).encode("utf-8")).hexdigest()
+
+def cache_get(key):
+    """Get a cached response, or None if it is missing or older than RESPONSE_CACHE_TTL_SECONDS"""
+    now = time.time()
+    with _response_cache["lock"]:
+        connection = _get_cache_connection()
+        row = connection.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row and row[1] >= now - config.RESPONSE_CACHE_TTL_SECONDS:
+            connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            connection.commit()
+            _response_cache["hits"] += 1
+            return row[0]
+        if row:
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            connection.commit()
+        _response_cache["misses"] += 1
+        return None
+
+def cache_put(key, response):
+    """Store a response, evicting expired and then least recently used entries to stay under RESPONSE_CACHE_MAX_BYTES"""
+    now = time.time()
+    size = len(response.encode("utf-8"))
+    with _response_cache["lock"]:
+        connection = _get_cache_connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO responses (key, response, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+            (key, response, size, now, now)
+        )
+        connection.execute("DELETE FROM responses WHERE created_at < ?", (now - config.RESPONSE_CACHE_TTL_SECONDS,))
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > config.RESPONSE_CACHE_MAX_BYTES:
+            evicted = 0
+            for old_key, old_size in connection.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+                if total - evicted <= config.RESPONSE_CACHE_MAX_BYTES:
+                    break
+                connection.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                evicted += old_size
+        connection.commit()
+
+def clear_response_cache():
+    """Delete every cached response"""
+    with _response_cache["lock"]:
+        connection = _get_cache_connection()
+        connection.execute("DELETE FROM responses")
+        connection.commit()
+
+def get_response_cache_stats():
+    """Get response cache hit/miss counts for this process and the size of the cache on disk"""
+    with _response_cache["lock"]:
+        entries, size = _get_cache_connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        hits, misses = _response_cache["hits"], _response_cache["misses"]
+    total = hits + misses
+    return {
+        "enabled": config.RESPONSE_CACHE_ENABLED,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else 0.0,
+        "entries": entries,
+        "bytes": size,
+        "max_bytes": config.RESPONSE_CACHE_MAX_BYTES
+    }
+
+# ----------------------------- CHECKPOINTS -----------------------------
+_checkpoints = {"connection": None, "lock": threading.Lock()}
+
+def _get_checkpoint_connection():
+    if _checkpoints["connection"] is None:
+        _checkpoints["connection"] = _connect_sqlite(
+            config.CHECKPOINT_PATH,
+            """
+            CREATE TABLE IF NOT EXISTS analyses (
+                analysis_id TEXT PRIMARY KEY,
+                problem_hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS stage_outputs (
+                analysis_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                output TEXT NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (analysis_id, stage)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS analyses_problem ON analyses (problem_hash, updated_at)"
+        )
+    return _checkpoints["connection"]
+
+def _problem_hash(problem_text):
+    return hashlib.sha256(problem_text.strip().encode("utf-8")).hexdigest()
+
+def start_checkpoint(analysis_id, problem_text):
+    """
+    Record that an analysis is running, and drop unfinished analyses too old to resume.
+    An ID last used for a different problem, or for an analysis that completed, starts over
+    with no saved stages.
+    """
+    now = time.time()
+    problem_hash = _problem_hash(problem_text)
+    with _checkpoints["lock"]:
+        connection = _get_checkpoint_connection()
+        row = connection.execute(
+            "SELECT problem_hash, status FROM analyses WHERE analysis_id = ?", (analysis_id,)
+        ).fetchone()
+        if row is None or row[0] != problem_hash or row[1] == "complete":
+            connection.execute("DELETE FROM stage_outputs WHERE analysis_id = ?", (analysis_id,))
+            connection.execute(
+                "INSERT OR REPLACE INTO analyses (analysis_id, problem_hash, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (analysis_id, problem_hash, "running", now, now)
+            )
+        else:
+            connection.execute("UPDATE analyses SET status = 'running', updated_at = ? WHERE analysis_id = ?",
+                               (now, analysis_id))
+        expired = "SELECT analysis_id FROM analyses WHERE updated_at < ?"
+        cutoff = now - config.CHECKPOINT_RETENTION_SECONDS
+        connection.execute(f"DELETE FROM stage_outputs WHERE analysis_id IN ({expired})", (cutoff,))
+        connection.execute("DELETE FROM analyses WHERE updated_at < ?", (cutoff,))
+        connection.commit()
+
+def save_stage_checkpoint(analysis_id, stage, output):
+    """Save one completed stage's output under its analysis"""
+    now = time.time()
+    with _checkpoints["lock"]:
+        connection = _get_checkpoint_connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO stage_outputs (analysis_id, stage, output, completed_at) VALUES (?, ?, ?, ?)",
+            (analysis_id, stage, output, now)
+        )
+        connection.execute("UPDATE analyses SET updated_at = ? WHERE analysis_id = ?", (now, analysis_id))
+        connection.commit()
+
+def finish_checkpoint(analysis_id, complete):
+    """Mark an analysis complete, or incomplete so that it can be resumed"""
+    with _checkpoints["lock"]:
+        connection = _get_checkpoint_connection()
+        connection.execute(
+            "UPDATE analyses SET status = ?, updated_at = ? WHERE analysis_id = ?",
+            ("complete" if complete else "incomplete", time.time(), analysis_id)
+        )
+        connection.commit()
+
+def reopen_checkpoint(analysis_id, problem_text):
+    """
+    Mark a finished analysis incomplete again, so it is offered for resuming - for when some of its
+    stored outputs have expired. Resuming restores the stages still saved here and reruns the rest.
+    An ID last used for a different problem is left alone.
+    """
+    now = time.time()
+    with _checkpoints["lock"]:
+        connection = _get_checkpoint_connection()
+        connection.execute(
+            "INSERT INTO analyses (analysis_id, problem_hash, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (analysis_id) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at "
+            "WHERE analyses.problem_hash = excluded.problem_hash",
+            (analysis_id, _problem_hash(problem_text), "incomplete", now, now)
+        )
+        connection.commit()
+
+def load_checkpoint(analysis_id, problem_text):
+    """
+    Get the saved outputs of an unfinished analysis's completed stages - none if the ID was
+    last used for a different problem or its analysis already completed
+    """
+    with _checkpoints["lock"]:
+        rows = _get_checkpoint_connection().execute(
+            "SELECT stage_outputs.stage, stage_outputs.output FROM stage_outputs "
+            "JOIN analyses ON analyses.analysis_id = stage_outputs.analysis_id "
+            "WHERE stage_outputs.analysis_id = ? AND analyses.problem_hash = ? AND analyses.status != 'complete'",
+            (analysis_id, _problem_hash(problem_text))
+        ).fetchall()
+    return dict(rows)
+
+def find_resumable_analysis(problem_text):
+    """
+    Find the latest unfinished analysis of a problem - one that failed part-way or was
+    interrupted by a restart. Returns its ID and completed stages, or None. An unfinished
+    analysis last touched before the problem was analysed in full is superseded and not offered.
+    """
+    problem_hash = _problem_hash(problem_text)
+    with _checkpoints["lock"]:
+        connection = _get_checkpoint_connection()
+        row = connection.execute(
+            "SELECT analysis_id FROM analyses WHERE problem_hash = ? AND status != 'complete' "
+            "AND updated_at >= ? AND updated_at > COALESCE((SELECT MAX(updated_at) FROM analyses "
+            "WHERE problem_hash = ? AND status = 'complete'), 0) ORDER BY updated_at DESC LIMIT 1",
+            (problem_hash, time.time() - config.CHECKPOINT_RETENTION_SECONDS, problem_hash)
+        ).fetchone()
+        if row is None:
+            return None
+        stages = [stage for (stage,) in connection.execute(
+            "SELECT stage FROM stage_outputs WHERE analysis_id = ?", (row[0],)
+        )]
+    return {"analysis_id": row[0], "completed_stages": stages}
@@ -0,0 +1,75 @@
+"""Tunables for the analysis pipeline - read at call time, so they can be changed at runtime"""
+import os
+
+# Repository root - the .cache directory lives next to the package
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ----------------------------- CONFIG -----------------------------
+TALOS_AGENCY_URL = os.environ.get("TALOS_AGENCY_URL", "https://eoc.mu-sigma.com/talos-engine/agency")
+TENANT_ID = "talos"
+AUTH_TOKEN = None
+HEADERS_BASE = {"Content-Type": "application/json"}
+MAX_CONCURRENT_STAGES = 12  # Q1-Q12 can all run at once
+
+# Shared HTTP connection pool
+HTTP_POOL_SIZE = 100          # Total open connections across all hosts
+HTTP_POOL_PER_HOST = 32       # Open connections per agency host
+HTTP_KEEPALIVE_SECONDS = 75   # How long an idle connection is kept for reuse
+
+# Adaptive (AIMD) limits on in-flight agency requests
+PROCESS_LIMIT_INITIAL = 24    # Starting limit across all agencies
+PROCESS_LIMIT_MAX = 96
+AGENCY_LIMIT_INITIAL = 8      # Starting limit for each agency_id
+AGENCY_LIMIT_MAX = 32
+LIMIT_MIN = 1
+LIMIT_BACKOFF = 0.5           # Multiplier applied to the limit on a 429/5xx, error or slow response
+LIMIT_SLOW_FACTOR = 3.0       # A response this many times slower than the running average counts as slow
+
+# Background analysis jobs
+MAX_CONCURRENT_JOBS = 8       # Analyses running at once across all sessions
+JOB_RETENTION_SECONDS = 3600  # How long finished jobs are kept for result retrieval
+
+# Persistent response cache
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_PATH = os.path.join(BASE_DIR, ".cache", "agency_responses.sqlite3")
+RESPONSE_CACHE_TTL_SECONDS = 7 * 24 * 3600     # Cached responses older than this are refetched
+RESPONSE_CACHE_MAX_BYTES = 256 * 1024 * 1024   # Least recently used responses are evicted past this size
+
+# Analysis checkpoints
+CHECKPOINT_PATH = os.path.join(BASE_DIR, ".cache", "analysis_checkpoints.sqlite3")
+CHECKPOINT_RETENTION_SECONDS = 7 * 24 * 3600   # Unfinished analyses older than this can no longer be resumed
+
+# Stage output store - finished analyses hold handles, and their full texts live in compressed blobs on disk
+OUTPUT_STORE_ENABLED = True
+OUTPUT_STORE_DIR = os.path.join(BASE_DIR, ".cache", "outputs")
+OUTPUT_CACHE_MAX_BYTES = 16 * 1024 * 1024        # Hot output texts kept in memory - least recently used are dropped past this
+OUTPUT_STORE_RETENTION_SECONDS = 7 * 24 * 3600   # Blobs not written or read for this long are deleted
+
+# Compaction of the hardness_summary prompt
+SUMMARY_COMPACTION_ENABLED = False    # Send score digests instead of the full stage outputs
+SUMMARY_CONTEXT_BUDGET_CHARS = 6000   # Character budget for the digests (roughly 4 characters per token)
+
+# Shared question context - the problem and current system sent with each of Q1-Q12
+QUESTION_CONTEXT_COMPACTION_ENABLED = False  # Send one canonical compact preamble instead of the full context
+QUESTION_CONTEXT_BUDGET_CHARS = 3000         # Character budget for the current system part of the preamble
+
+# Retries, deadlines and circuit breaking for agency calls
+REQUEST_TIMEOUT_SECONDS = 60      # Longest a single request round may take
+STAGE_DEADLINE_SECONDS = 180      # Time budget for one stage, across all of its retries and rounds
+ANALYSIS_DEADLINE_SECONDS = 600   # Time budget for a whole analysis
+RETRY_BASE_DELAY = 1.0            # Backoff before the second attempt - doubles each attempt, with full jitter
+RETRY_MAX_DELAY = 20.0
+CIRCUIT_FAILURE_THRESHOLD = 5     # Consecutive errors/5xx from an agency URL that open its circuit
+CIRCUIT_RESET_SECONDS = 30        # How long an open circuit fails fast before letting one probe request through
+
+# Hedged requests - a duplicate call for a stage that runs past its agency's usual latency
+HEDGE_ENABLED = False
+HEDGE_PERCENTILE = 0.95       # Hedge once a call runs longer than this percentile of recent calls to its agency
+HEDGE_MIN_SAMPLES = 20        # Recent latencies needed per agency before it is hedged
+HEDGE_LATENCY_WINDOW = 200    # Recent latencies kept per agency
+HEDGE_BUDGET_RATIO = 0.1      # Hedges may add at most this fraction of extra calls across the process
+
+AUTH_FAILURE_STATUSES = (401, 403)  # Responses that mean the negotiated tenant/auth headers were rejected
+
+# Structured scores - question and summary prompts ask for a JSON score block, read before the regex extractors
+STRUCTURED_SCORES_ENABLED = False
@@ -0,0 +1,286 @@
+"""Regex score extraction from question answers and hardness summaries - standard library only"""
+import bisect
+import re
+
+# ----------------------------- SCORE EXTRACTION -----------------------------
+# Patterns are tried in order and the first match wins, unless noted otherwise
+
+# The calculated overall score from the comprehensive summary
+DIFFICULTY_CALCULATED_PATTERNS = [
+    r"Overall Difficulty Score\s*=\s*[\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\s*\/\s*4\s*=\s*(\d+\.\d+)",
+    r"Overall.*?Score.*?=\s*\([\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\)\s*\/\s*4\s*=\s*(\d+\.\d+)",
+    r"Overall Difficulty Score.*?=\s*(\d+\.\d+)",
+    r"≈\s*(\d+\.\d+)",  # The approximate symbol in "≈ 3.67"
+    r"Overall.*?Score.*?(\d+\.\d+)\s*\(.*?\)",  # "3.67 (Moderate)"
+]
+
+# Other overall score mentions, used if no calculated score is found
+DIFFICULTY_FALLBACK_PATTERNS = [
+    r"Overall Difficulty Score.*?=.*?(\d+\.\d+)",
+    r"Overall.*?Difficulty.*?Score.*?(\d+\.\d+)",
+    r"difficulty score.*?(\d+\.\d+)",
+    r"Score.*?(\d+\.\d+)\s*\/\s*5",
+    r"(\d+\.\d+)\s*out of\s*5",
+    r"Hardness[:\s]*(\d+(?:\.\d+)?)",
+    r"Overall.*?Score.*?(\d+\.\d+)",
+    r"Difficulty[:\s]*(\d+\.\d+)",
+    r"Final Score[:\s]*(\d+\.\d+)"
+]
+
+# Calculated dimension averages
+DIMENSION_AVERAGE_PATTERNS = {
+    "Volatility": [
+        r"Avg Volatility\s*=\s*\([\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\)\s*\/\s*3\s*=\s*(\d+\.\d+)",
+        r"Avg.*?Volatility.*?=\s*(\d+\.\d+)",
+        r"Volatility.*?average.*?(\d+\.\d+)"
+    ],
+    "Ambiguity": [
+        r"Avg Ambiguity\s*=\s*\([\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\)\s*\/\s*3\s*=\s*(\d+\.\d+)",
+        r"Avg.*?Ambiguity.*?=\s*(\d+\.\d+)",
+        r"Ambiguity.*?average.*?(\d+\.\d+)"
+    ],
+    "Interconnectedness": [
+        r"Avg Interconnectedness\s*=\s*\([\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\)\s*\/\s*3\s*=\s*(\d+\.\d+)",
+        r"Avg.*?Interconnectedness.*?=\s*(\d+\.\d+)",
+        r"Interconnectedness.*?average.*?(\d+\.\d+)"
+    ],
+    "Uncertainty": [
+        r"Avg Uncertainty\s*=\s*\([\d\.]+\s*\+\s*[\d\.]+\s*\+\s*[\d\.]+\)\s*\/\s*3\s*=\s*(\d+\.\d+)",
+        r"Avg.*?Uncertainty.*?=\s*(\d+\.\d+)",
+        r"Uncertainty.*?average.*?(\d+\.\d+)"
+    ]
+}
+
+# Individual dimension scores, used for dimensions without a calculated average
+DIMENSION_PATTERNS = {
+    "Volatility": [
+        r"Volatility\s*\(V\):\s*(\d+\.\d+)",
+        r"Volatility.*?[Vv]:\s*(\d+\.\d+)",
+        r"Volatility.*?(\d+\.\d+)",
+        r"V:\s*(\d+\.\d+)"
+    ],
+    "Ambiguity": [
+        r"Ambiguity\s*\(A\):\s*(\d+\.\d+)",
+        r"Ambiguity.*?[Aa]:\s*(\d+\.\d+)",
+        r"Ambiguity.*?(\d+\.\d+)",
+        r"A:\s*(\d+\.\d+)"
+    ],
+    "Interconnectedness": [
+        r"Interconnectedness\s*\(I\):\s*(\d+\.\d+)",
+        r"Interconnectedness.*?[Ii]:\s*(\d+\.\d+)",
+        r"Interconnectedness.*?(\d+\.\d+)",
+        r"I:\s*(\d+\.\d+)"
+    ],
+    "Uncertainty": [
+        r"Uncertainty\s*\(U\):\s*(\d+\.\d+)",
+        r"Uncertainty.*?[Uu]:\s*(\d+\.\d+)",
+        r"Uncertainty.*?(\d+\.\d+)",
+        r"U:\s*(\d+\.\d+)"
+    ]
+}
+
+# Question scores in a summary - {i} is the question number
+INDIVIDUAL_SCORE_PATTERNS = [
+    r"Q{i}.*?[Ss]core.*?(\d+\.\d+)",
+    r"Question {i}.*?[Ss]core.*?(\d+\.\d+)",
+    r"Score.*?Q{i}.*?(\d+\.\d+)",
+    r"Q{i}.*?(\d+\.\d+)\s*\/\s*5",
+]
+
+# Scores in a question answer - every pattern is tried and the last score found wins
+ANSWER_SCORE_PATTERNS = [
+    r'Score\s*\(?0–5\)?\s*:\s*(\d+(?:\.\d+)?)',  # "Score (0–5): 4"
+    r'Score:\s*(\d+(?:\.\d+)?)',                 # "Score: 4"
+    r'Score\s*=\s*(\d+(?:\.\d+)?)',              # "Score = 4"
+    r'Overall Score:\s*(\d+(?:\.\d+)?)',         # "Overall Score: 4"
+    r'Rating:\s*(\d+(?:\.\d+)?)',                # "Rating: 4"
+    r'(\d+(?:\.\d+)?)\s*out of\s*5',             # "4 out of 5"
+    r'(\d+(?:\.\d+)?)\s*\/\s*5',                 # "4/5"
+    r'Score.*?(\d+(?:\.\d+)?)\s*\/\s*5',         # "Score 4/5"
+    r'Justification.*?score of\s*(\d+(?:\.\d+)?)', # "Justification: The score of 4"
+    r'score of\s*(\d+(?:\.\d+)?)',               # "score of 4"
+    r'Score.*?(\d+)',                            # "Score 4"
+    r'rating of\s*(\d+(?:\.\d+)?)',              # "rating of 4"
+]
+
+# The extractors compile every pattern once and split it on its lazy ".*?" gaps into a chain of
+# pieces. A gap cannot cross a newline, so when a chain fails from the first occurrence of its
+# first piece, no later start before the next newline can succeed either (and a fixed piece in the
+# middle likewise only needs its first occurrence). Each pattern therefore moves forward through
+# the text once, instead of re.search retrying every start position and going quadratic or worse
+# on long lines - while returning exactly what re.search and re.findall would.
+def _compile_chain(pattern):
+    pieces = pattern.split(".*?")
+    return {
+        "first": re.compile(pieces[0], re.IGNORECASE),
+        # Each later piece is matched together with the gap before it - group 1 is the piece itself
+        "rest": [re.compile(f".*?({piece})", re.IGNORECASE) for piece in pieces[1:]],
+        # Pieces whose match may span a newline need every candidate tried, not just the first
+        "spans": [r"\s" in piece or r"\n" in piece for piece in pieces[1:]],
+        "gapless": re.compile(pattern, re.IGNORECASE) if len(pieces) == 1 else None
+    }
+
+def _compile_chains(patterns):
+    return [_compile_chain(pattern) for pattern in patterns]
+
+_DIFFICULTY_CALCULATED_CHAINS = _compile_chains(DIFFICULTY_CALCULATED_PATTERNS)
+_DIFFICULTY_FALLBACK_CHAINS = _compile_chains(DIFFICULTY_FALLBACK_PATTERNS)
+_DIMENSION_AVERAGE_CHAINS = {dimension: _compile_chains(patterns) for dimension, patterns in DIMENSION_AVERAGE_PATTERNS.items()}
+_DIMENSION_CHAINS = {dimension: _compile_chains(patterns) for dimension, patterns in DIMENSION_PATTERNS.items()}
+_INDIVIDUAL_SCORE_CHAINS = {
+    f"Q{i}": _compile_chains([pattern.format(i=i) for pattern in INDIVIDUAL_SCORE_PATTERNS]) for i in range(1, 13)
+}
+_ANSWER_SCORE_CHAINS = _compile_chains(ANSWER_SCORE_PATTERNS)
+
+class _ScanText:
+    """Text being scanned, with its newline positions indexed once"""
+    def __init__(self, text):
+        self.text = text
+        self.newlines = [match.start() for match in re.finditer("\n", text)]
+
+    def line_end(self, pos):
+        """Position of the first newline at or after pos, or the end of the text"""
+        index = bisect.bisect_left(self.newlines, pos)
+        return self.newlines[index] if index < len(self.newlines) else len(self.text)
+
+def _continue_chain(chain, piece, scan, pos):
+    """Match the chain's remaining pieces from pos - returns (end, captured score) or None"""
+    if piece == len(chain["rest"]):
+        return pos, None
+    matcher = chain["rest"][piece]
+    captures = matcher.groups > 1
+    failed_end = None
+    start = pos
+    while True:
+        match = matcher.match(scan.text, start)
+        if not match:
+            return None
+        end = match.end()
+        # A candidate ending further along the same line as one that already failed cannot do better
+        if failed_end is None or end < failed_end or scan.line_end(end) != scan.line_end(failed_end):
+            rest = _continue_chain(chain, piece + 1, scan, end)
+            if rest is not None:
+                return rest[0], match.group(2) if captures else rest[1]
+            failed_end = end
+        # Later candidates for a piece that stays on one line are dominated the same way - otherwise
+        # the gap is stretched past this candidate, as long as that does not cross a newline
+        candidate = match.start(1)
+        if not chain["spans"][piece] or scan.text[candidate:candidate + 1] == "\n":
+            return None
+        start = candidate + 1
+
+def _search_chain(chain, scan, pos=0):
+    """re.search for a compiled chain from pos - returns (end, captured score) or None"""
+    if chain["gapless"]:
+        match = chain["gapless"].search(scan.text, pos)
+        return (match.end(), match.group(1)) if match else None
+    first = chain["first"]
+    while True:
+        match = first.search(scan.text, pos)
+        if not match:
+            return None
+        rest = _continue_chain(chain, 0, scan, match.end())
+        if rest is not None:
+            return rest[0], match.group(1) if first.groups else rest[1]
+        # Every later start on this line can only reach what this one could
+        pos = scan.line_end(match.end()) + 1
+        if pos > len(scan.text):
+            return None
+
+def _findall_chain(chain, scan):
+    """re.findall for a compiled chain - the captured score of every non-overlapping match"""
+    if chain["gapless"]:
+        return chain["gapless"].findall(scan.text)
+    found = []
+    pos = 0
+    while pos <= len(scan.text):
+        result = _search_chain(chain, scan, pos)
+        if result is None:
+            break
+        end, score = result
+        found.append(score)
+        pos = end if end > pos else pos + 1
+    return found
+
+def _first_chain_score(chains, scan):
+    """The score captured by the first chain that matches, as re.search would try them in order"""
+    for chain in chains:
+        result = _search_chain(chain, scan)
+        if result:
+            try:
+                return float(result[1])
+            except ValueError:
+                continue
+    return None
+
+def _difficulty_score(scan, dimension_scores):
+    for chains in (_DIFFICULTY_CALCULATED_CHAINS, _DIFFICULTY_FALLBACK_CHAINS):
+        score = _first_chain_score(chains, scan)
+        if score is not None:
+            return min(5, max(0, score))
+    
+    # If no score found, calculate from dimension scores
+    dimension_scores = dimension_scores or _dimension_scores(scan)
+    if any(score > 0 for score in dimension_scores.values()):
+        overall_score = sum(dimension_scores.values()) / len(dimension_scores)
+        return min(5, max(0, overall_score))
+    return 0.0
+
+def _dimension_scores(scan):
+    scores = {dimension: _first_chain_score(chains, scan) or 0.0 for dimension, chains in _DIMENSION_AVERAGE_CHAINS.items()}
+    # Dimensions without a calculated average fall back to individual dimension patterns
+    for dimension, chains in _DIMENSION_CHAINS.items():
+        if scores[dimension] == 0.0:
+            scores[dimension] = _first_chain_score(chains, scan) or 0.0
+    return scores
+
+def _individual_scores(scan):
+    scores = {}
+    for question, chains in _INDIVIDUAL_SCORE_CHAINS.items():
+        score = _first_chain_score(chains, scan)
+        if score is not None:
+            scores[question] = score  # Return exact decimal without rounding
+    return scores
+
+def extract_summary_scores(text):
+    """Extract the overall, dimension and question scores from a hardness summary in one scan"""
+    scan = _ScanText(text)
+    dimension_scores = _dimension_scores(scan)
+    return {
+        "difficulty_score": _difficulty_score(scan, dimension_scores),
+        "dimension_scores": dimension_scores,
+        "individual_scores": _individual_scores(scan)
+    }
+
+def extract_difficulty_score(text):
+    """Extract overall difficulty score from text (0-5 scale) - prioritize calculated score"""
+    return _difficulty_score(_ScanText(text), None)
+
+def extract_dimension_scores(text):
+    """Extract VUIA dimension scores from the analysis text with decimal support"""
+    return _dimension_scores(_ScanText(text))
+
+def extract_individual_scores(text):
+    """Extract individual question scores from the analysis text"""
+    return _individual_scores(_ScanText(text))
+
+def extract_score_from_answer_text(text):
+    """Extract score specifically from the answer text using targeted patterns"""
+    scan = _ScanText(text)
+    # Look for all score mentions and take the most relevant one
+    all_scores = []
+    for chain in _ANSWER_SCORE_CHAINS:
+        for match in _findall_chain(chain, scan):
+            try:
+                score = float(match)
+                if 0 <= score <= 5:
+                    all_scores.append(score)
+            except ValueError:
+                continue
+    
+    # If we found multiple scores, use some logic to pick the right one
+    if all_scores:
+        # Prefer scores that appear later in the text (usually the final score)
+        return f"{all_scores[-1]:.1f}"
+    
+    return "N/A"
@@ -0,0 +1,288 @@
+"""The analysis pipeline - stage scheduling, checkpointed analyses and background jobs"""
+import asyncio
+import threading
+import time
+import uuid
+
+from . import config
+from .agency import _analysis_traffic, call_api_async, get_engine_loop, run_sync_with_callbacks
+from .cache import finish_checkpoint, load_checkpoint, save_stage_checkpoint, start_checkpoint
+from .prompts import API_CONFIGS
+from .result import AnalysisResult
+from .scoring import score_outputs
+from .store import StoredOutputs
+from .utils import clean_output, is_failed_response
+
+# ----------------------------- STAGE SCHEDULER -----------------------------
+class _DependencyRecorder(dict):
+    """Empty outputs mapping that records which stage outputs a prompt reads"""
+    def __init__(self):
+        super().__init__()
+        self.keys_read = []
+
+    def get(self, key, default=None):
+        self.keys_read.append(key)
+        return default
+
+    def __getitem__(self, key):
+        self.keys_read.append(key)
+        return ""
+
+def get_stage_dependencies(api_cfg, stage_names):
+    """Get the stages an API config depends on - declared via 'depends_on' or inferred from its prompt"""
+    if "depends_on" in api_cfg:
+        return [name for name in api_cfg["depends_on"] if name in stage_names]
+    
+    recorder = _DependencyRecorder()
+    api_cfg["prompt"]("", recorder)
+    dependencies = []
+    for key in recorder.keys_read:
+        if key in stage_names and key != api_cfg["name"] and key not in dependencies:
+            dependencies.append(key)
+    return dependencies
+
+def build_stage_graph(api_configs):
+    """Map each stage name to the list of stage names it depends on"""
+    stage_names = {api["name"] for api in api_configs}
+    return {api["name"]: get_stage_dependencies(api, stage_names) for api in api_configs}
+
+async def run_stages_async(problem_text, api_configs=API_CONFIGS, max_concurrency=None,
+                           on_stage_start=None, on_stage_complete=None, use_cache=True, completed_outputs=None,
+                           deadline=None):
+    """
+    Run every stage as soon as its dependencies have finished, at most max_concurrency at a time
+    (config.MAX_CONCURRENT_STAGES unless given).
+    Stages in completed_outputs are not rerun - their saved outputs satisfy later stages instead.
+    Stage calls still running at deadline (a time.monotonic() value) give up and return a failure.
+    """
+    graph = build_stage_graph(api_configs)
+    configs = {api["name"]: api for api in api_configs}
+    outputs = {name: output for name, output in (completed_outputs or {}).items() if name in configs}
+    pending = {name: deps for name, deps in graph.items() if name not in outputs}
+    running = {}
+    semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_STAGES if max_concurrency is None else max_concurrency)
+    
+    if on_stage_complete:
+        for name in outputs:
+            on_stage_complete(configs[name], outputs[name])
+    
+    async def run_stage(api, stage_outputs):
+        async with semaphore:
+            return await call_api_async(api, problem_text, stage_outputs, use_cache=use_cache, deadline=deadline)
+    
+    try:
+        while pending or running:
+            # Start every stage whose dependencies are satisfied, in API_CONFIGS order
+            ready = [name for name, deps in pending.items() if all(dep in outputs for dep in deps)]
+            for name in ready:
+                del pending[name]
+                if on_stage_start:
+                    on_stage_start(configs[name])
+                task = asyncio.ensure_future(run_stage(configs[name], dict(outputs)))
+                running[task] = name
+            
+            if not running:
+                raise ValueError(f"Unsatisfiable stage dependencies: {', '.join(pending)}")
+            
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                outputs[name] = clean_output(task.result())
+                if on_stage_complete:
+                    on_stage_complete(configs[name], outputs[name])
+    finally:
+        for task in running:
+            task.cancel()
+    
+    return {api["name"]: outputs[api["name"]] for api in api_configs}
+
+def run_stages(problem_text, api_configs=API_CONFIGS, max_concurrency=None,
+               on_stage_start=None, on_stage_complete=None, use_cache=True, completed_outputs=None, deadline=None):
+    """Blocking wrapper around run_stages_async - callbacks run on the calling thread"""
+    return run_sync_with_callbacks(
+        lambda **callbacks: run_stages_async(problem_text, api_configs, max_concurrency, use_cache=use_cache,
+                                             completed_outputs=completed_outputs, deadline=deadline, **callbacks),
+        on_stage_start=on_stage_start,
+        on_stage_complete=on_stage_complete
+    )
+
+async def run_analysis_async(problem_text, on_stage_start=None, on_stage_complete=None, use_cache=True,
+                             analysis_id=None, deadline_seconds=None):
+    """
+    Run the complete analysis pipeline and return its AnalysisResult.
+    Each successful stage is checkpointed under analysis_id as it finishes; passing the ID
+    of an earlier unfinished analysis resumes it, rerunning only its missing or failed stages.
+    Stages still running after deadline_seconds (config.ANALYSIS_DEADLINE_SECONDS unless given) fail,
+    and can be rerun later by resuming.
+    The result's traffic counts the requests and bytes this analysis sent and received.
+    """
+    started_at = time.time()
+    started = time.monotonic()
+    deadline = started + (config.ANALYSIS_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds)
+    analysis_id = analysis_id or uuid.uuid4().hex
+    traffic = {"requests": 0, "bytes_sent": 0, "bytes_received": 0}
+    traffic_token = _analysis_traffic.set(traffic)
+    completed_outputs = await asyncio.to_thread(load_checkpoint, analysis_id, problem_text)
+    await asyncio.to_thread(start_checkpoint, analysis_id, problem_text)
+    
+    graph = build_stage_graph(API_CONFIGS)
+    loop = asyncio.get_running_loop()
+    saves = []
+    untrusted = set()
+    stage_started = {}
+    timings = {}
+    
+    def on_start(api):
+        stage_started[api["name"]] = time.monotonic()
+        if on_stage_start:
+            on_stage_start(api)
+    
+    def on_complete(api, result):
+        # A stage built on a failed stage's output must rerun too, so it is not checkpointed
+        name = api["name"]
+        if name in stage_started:
+            timings[name] = time.monotonic() - stage_started[name]
+        if is_failed_response(result) or any(dep in untrusted for dep in graph[name]):
+            untrusted.add(name)
+        elif name not in completed_outputs:
+            saves.append(loop.run_in_executor(None, save_stage_checkpoint, analysis_id, name, result))
+        if on_stage_complete:
+            on_stage_complete(api, result)
+    
+    complete = False
+    try:
+        outputs = await run_stages_async(problem_text, API_CONFIGS, on_stage_start=on_start,
+                                         on_stage_complete=on_complete, use_cache=use_cache,
+                                         completed_outputs=completed_outputs, deadline=deadline)
+        complete = not any(is_failed_response(output) for output in outputs.values())
+    finally:
+        await asyncio.gather(*saves, return_exceptions=True)
+        await asyncio.to_thread(finish_checkpoint, analysis_id, complete)
+        _analysis_traffic.reset(traffic_token)
+    timings["total"] = time.monotonic() - started
+    provenance = {
+        "started_at": started_at,
+        "finished_at": time.time(),
+        "resumed_stages": [name for name in outputs if name in completed_outputs],
+        "use_cache": use_cache,
+        "traffic": traffic,
+        "settings": {
+            "structured_scores": config.STRUCTURED_SCORES_ENABLED,
+            "question_context_compaction": config.QUESTION_CONTEXT_COMPACTION_ENABLED,
+            "summary_compaction": config.SUMMARY_COMPACTION_ENABLED
+        }
+    }
+    scores = score_outputs(outputs)
+    if config.OUTPUT_STORE_ENABLED:
+        # The result keeps only handles - sessions holding it no longer hold the texts
+        outputs = await asyncio.to_thread(StoredOutputs.spill, outputs)
+    return AnalysisResult(analysis_id=analysis_id, problem=problem_text, outputs=outputs, timings=timings,
+                          provenance=provenance, **scores)
+
+# ----------------------------- BACKGROUND JOBS -----------------------------
+_job_runner = {
+    "jobs": {},
+    "semaphore": None,  # Created on the engine loop by the first job, so it picks up config set after import
+    "lock": threading.Lock()
+}
+
+def get_job_runner():
+    """Get the process-wide job registry - jobs run on the engine loop and outlive any single script run"""
+    return _job_runner
+
+def _prune_finished_jobs(jobs):
+    cutoff = time.time() - config.JOB_RETENTION_SECONDS
+    for job_id in [job_id for job_id, job in jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]:
+        del jobs[job_id]
+
+def submit_analysis_job(problem_text, use_cache=True, analysis_id=None):
+    """Submit an analysis to run in the background and return its job ID - pass analysis_id to resume one"""
+    runner = get_job_runner()
+    job = {
+        "id": uuid.uuid4().hex,
+        "status": "queued",
+        "problem": problem_text,
+        "analysis_id": analysis_id or uuid.uuid4().hex,
+        "current_stage": None,
+        "running_stages": [],
+        "completed_stages": [],
+        "outputs": {},
+        "total_stages": len(API_CONFIGS),
+        "result": None,
+        "error": None,
+        "submitted_at": time.time(),
+        "finished_at": None,
+        "future": None,
+        "version": 0,                      # Bumped on every stage start, stage completion and status change
+        "updated": threading.Condition()   # Notified with each version bump
+    }
+    
+    def on_stage_start(api):
+        job["current_stage"] = api["name"]
+        job["running_stages"].append(api["name"])
+        _notify_job_update(job)
+    
+    def on_stage_complete(api, result):
+        job["outputs"][api["name"]] = result
+        job["completed_stages"].append(api["name"])
+        if api["name"] in job["running_stages"]:
+            job["running_stages"].remove(api["name"])
+        _notify_job_update(job)
+    
+    async def run_job():
+        try:
+            if runner["semaphore"] is None:
+                runner["semaphore"] = asyncio.Semaphore(config.MAX_CONCURRENT_JOBS)
+            async with runner["semaphore"]:
+                job["status"] = "running"
+                _notify_job_update(job)
+                job["result"] = await run_analysis_async(problem_text, on_stage_start=on_stage_start,
+                                                         on_stage_complete=on_stage_complete,
+                                                         use_cache=use_cache, analysis_id=job["analysis_id"])
+                job["outputs"] = job["result"].outputs  # Finished jobs are kept for an hour - hold handles, not texts
+                job["status"] = "done"
+        except asyncio.CancelledError:
+            job["status"] = "cancelled"
+            raise
+        except Exception as e:
+            job["error"] = str(e)
+            job["status"] = "failed"
+        finally:
+            job["finished_at"] = time.time()
+            _notify_job_update(job)
+    
+    with runner["lock"]:
+        _prune_finished_jobs(runner["jobs"])
+        runner["jobs"][job["id"]] = job
+    job["future"] = asyncio.run_coroutine_threadsafe(run_job(), get_engine_loop())
+    return job["id"]
+
+def get_job(job_id):
+    """Get a job by ID, or None if it does not exist or has expired"""
+    if not job_id:
+        return None
+    return get_job_runner()["jobs"].get(job_id)
+
+def _notify_job_update(job):
+    with job["updated"]:
+        job["version"] += 1
+        job["updated"].notify_all()
+
+def wait_for_job_update(job, seen_version, timeout):
+    """
+    Block until the job has changed since seen_version - a stage started or finished, or its status
+    changed - or until timeout seconds pass. Returns the job's current version.
+    """
+    with job["updated"]:
+        job["updated"].wait_for(lambda: job["version"] != seen_version, timeout)
+        return job["version"]
+
+def is_job_finished(job):
+    """Check whether a job has stopped running"""
+    return job["status"] in ("done", "failed", "cancelled")
+
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    job = get_job(job_id)
+    if job and job["future"] and not is_job_finished(job):
+        job["future"].cancel()
@@ -0,0 +1,281 @@
+"""Stage configs and prompt building - the agencies each stage calls and the context sent to them"""
+import functools
+import re
+
+from . import config
+from .extraction import extract_score_from_answer_text
+
+# ----------------------------- STAGES -----------------------------
+API_CONFIGS = [
+    {
+        "name": "vocabulary",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758548233201&level=1",
+        "multiround_convo": 3,
+        "description": "Extract Vocabulary",
+        "prompt": lambda problem, outputs: f"{problem}\n\nExtract the vocabulary from this problem statement."
+    },
+    {
+        "name": "current_system",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758549095254&level=1",
+        "multiround_convo": 2,
+        "description": "Describe Current System",
+        "prompt": lambda problem, outputs: f"Problem statement - {problem}\n\nContext from vocabulary:\n{outputs.get('vocabulary','')}\n\nDescribe the current system, inputs, outputs, and pain points."
+    },
+    {
+        "name": "Q1",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758555344231&level=1",
+        "multiround_convo": 2,
+        "description": "Q1. What is the frequency and pace of change in the key inputs driving the business?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q1. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "Q2",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758549615986&level=1",
+        "multiround_convo": 2,
+        "description": "Q2. To what extent are these changes cyclical and predictable versus sporadic and unpredictable?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q2. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "Q3",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758614550482&level=1",
+        "multiround_convo": 2,
+        "description": "Q3. How resilient is the current system in absorbing these changes without requiring significant rework or disruption?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q3. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "Q4",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758614809984&level=1",
+        "multiround_convo": 2,
+        "description": "Q4. To what extent do stakeholders share a common understanding of the key terms and concepts?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q4. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "Q5",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758615038050&level=1",
+        "multiround_convo": 2,
+        "description": "Q5. Are there any conflicting definitions or interpretations that could create confusion?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q5. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "Q6",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758615386880&level=1",
+        "multiround_convo": 2,
+        "description": "Q6. Are objectives, priorities, and constraints clearly communicated and well-defined?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q6. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "Q7",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758615778653&level=1",
+        "multiround_convo": 2,
+        "description": "Q7. To what extent are key inputs interdependent?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q7. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "Q8",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758616081630&level=1",
+        "multiround_convo": 2,
+        "description": "Q8. How well are the governing rules, functions, and relationships between inputs understood?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q8. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "Q9",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758616793510&level=1",
+        "multiround_convo": 2,
+        "description": "Q9. Are there any hidden or latent dependencies that could impact outcomes?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q9. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "Q10",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758617140479&level=1",
+        "multiround_convo": 2,
+        "description": "Q10. Are there hidden or latent dependencies that could affect outcomes?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q10. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "Q11",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758618137301&level=1",
+        "multiround_convo": 2,
+        "description": "Q11. Are feedback loops insufficient or missing, limiting our ability to adapt?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q11. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "Q12",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758619317968&level=1",
+        "multiround_convo": 2,
+        "description": "Q12. Do we lack established benchmarks or 'gold standards' to validate results?",
+        "prompt": lambda problem, outputs: (
+            f"{question_context(problem, outputs)}"
+            "Q12. Provide detailed analysis, score 0–5, and justification."
+            f"{score_block_request('question')}"
+        )
+    },
+    {
+        "name": "hardness_summary",
+        "url": f"{config.TALOS_AGENCY_URL}/reasoning_api?society_id=1757657318406&agency_id=1758619658634&level=1",
+        "multiround_convo": 2,
+        "description": "Hardness Level, Summary & Key Takeaways",
+        "prompt": lambda problem, outputs: (
+            f"Problem statement - {problem}\n\n"
+            "Context from all previous analysis:\n"
+            f"{summary_context(outputs)}\n"
+            "Provide Hardness Score, Level, Summary & Key Takeaways."
+            f"{score_block_request('summary')}"
+        )
+    }
+]
+
+# VUIA Dimension to Questions Mapping
+VUIA_MAPPING = {
+    "Volatility": ["Q1", "Q2", "Q3"],
+    "Ambiguity": ["Q4", "Q5", "Q6"],
+    "Interconnectedness": ["Q7", "Q8", "Q9"],
+    "Uncertainty": ["Q10", "Q11", "Q12"]
+}
+
+# ----------------------------- PROMPT COMPACTION -----------------------------
+def question_context(problem, outputs, compact=None):
+    """Problem and current system context shared by the Q1-Q12 prompts - full, or a compact canonical preamble"""
+    current_system = outputs.get("current_system", "")
+    if config.QUESTION_CONTEXT_COMPACTION_ENABLED if compact is None else compact:
+        return compact_question_context(problem, current_system, config.QUESTION_CONTEXT_BUDGET_CHARS)
+    return f"Problem statement - {problem}\n\nContext from Current System:\n{current_system}\n\n"
+
+def canonical_text(text):
+    """Text with Markdown emphasis, blank lines and repeated whitespace removed - same input, same bytes"""
+    text = re.sub(r"[*`#>|]+", "", text or "")
+    lines = (re.sub(r"[ \t]+", " ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line and not re.fullmatch(r"[-=_ ]+", line))
+
+@functools.lru_cache(maxsize=64)
+def compact_question_context(problem, current_system, budget_chars):
+    """
+    The shared preamble built once per analysis and reused byte-for-byte by all twelve questions.
+    The agency API has no conversation or context handle to send it through once, so the
+    context is kept small instead - the current system is canonicalised and cut to budget_chars.
+    """
+    system = canonical_text(current_system)
+    if len(system) > budget_chars:
+        cut = system[:budget_chars]
+        end = max(cut.rfind("\n"), cut.rfind(". "))
+        system = cut[:end + 1].rstrip() if end > budget_chars // 2 else cut.rstrip() + "…"
+    return f"Problem statement - {canonical_text(problem)}\n\nCurrent System (condensed):\n{system}\n\n"
+
+SUMMARY_SECTIONS = ["current_system"] + [f"Q{i}" for i in range(1, 13)]
+SCORE_PHRASE_PATTERN = re.compile(
+    r"(?:overall\s+)?(?:score|rating)\s*(?:\(?0[–-]5\)?)?\s*[:=]?\s*(?:of\s*)?\d+(?:\.\d+)?(?:\s*(?:/|out of)\s*5)?"
+    r"|\d+(?:\.\d+)?\s*(?:/|out of)\s*5",
+    re.IGNORECASE
+)
+
+def summary_context(outputs, compact=None):
+    """Context block for the hardness_summary prompt - full stage outputs, or score digests when compacting"""
+    if config.SUMMARY_COMPACTION_ENABLED if compact is None else compact:
+        return compact_summary_context(outputs)
+    return full_summary_context(outputs)
+
+def full_summary_context(outputs):
+    """Every previous stage output in full"""
+    context = f"Current System:\n{outputs.get('current_system','')}\n"
+    for i in range(1, 13):
+        context += f"Q{i}:\n{outputs.get(f'Q{i}','')}\n"
+    return context
+
+def digest_text(text, max_chars):
+    """Flatten text to one paragraph of at most max_chars, cutting at a sentence boundary where possible"""
+    text = re.sub(r"[*`#>|]+", "", text or "")
+    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 0:
+        return ""
+    cut = text[:max_chars - 1]
+    end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    if end > max_chars // 2:
+        return cut[:end + 1]
+    return cut.rstrip() + "…"
+
+def compact_summary_context(outputs, budget_chars=None):
+    """
+    Each question's extracted score and a digest of its justification, plus a digest of the current
+    system, sharing budget_chars (SUMMARY_CONTEXT_BUDGET_CHARS by default) between them.
+    """
+    dimensions = {q: dimension for dimension, questions in VUIA_MAPPING.items() for q in questions}
+    headings = {"current_system": "Current System (digest):"}
+    bodies = {"current_system": outputs.get("current_system", "")}
+    for i in range(1, 13):
+        answer = outputs.get(f"Q{i}", "")
+        score = extract_score_from_answer_text(answer) if answer else "N/A"
+        headings[f"Q{i}"] = f"Q{i} ({dimensions.get(f'Q{i}', '')}) - Score: {score}/5"
+        # The score is stated in the heading, so score phrases are left out of the justification digest
+        bodies[f"Q{i}"] = SCORE_PHRASE_PATTERN.sub("", answer)
+    
+    # Headings always fit - the digests share whatever budget is left
+    budget = (budget_chars or config.SUMMARY_CONTEXT_BUDGET_CHARS) - sum(len(h) + 2 for h in headings.values())
+    per_section = max(0, budget // len(SUMMARY_SECTIONS))
+    return "".join(f"{headings[name]}\n{digest_text(bodies[name], per_section)}\n" for name in SUMMARY_SECTIONS)
+
+# ----------------------------- SCORE BLOCK REQUESTS -----------------------------
+SCORE_BLOCK_REQUESTS = {
+    "question": (
+        '\n\nEnd your answer with a ```json block containing {"score": <number 0-5>, '
+        '"justification": "<one sentence>"}.'
+    ),
+    "summary": (
+        '\n\nEnd your answer with a ```json block containing {"difficulty_score": <number 0-5>, '
+        '"dimension_scores": {"Volatility": <0-5>, "Ambiguity": <0-5>, "Interconnectedness": <0-5>, '
+        '"Uncertainty": <0-5>}, "question_scores": {"Q1": <0-5>, ..., "Q12": <0-5>}}.'
+    )
+}
+
+def score_block_request(kind):
+    """The instruction appended to a question or summary prompt in structured mode - empty otherwise"""
+    return SCORE_BLOCK_REQUESTS[kind] if config.STRUCTURED_SCORES_ENABLED else ""
+
+def follow_up_goal(prompt, previous):
+    """The goal for a follow-up round - the previous answer, asked again for its score block if the prompt was"""
+    requests = [request for request in SCORE_BLOCK_REQUESTS.values() if request and prompt.endswith(request)]
+    return previous + requests[0] if config.STRUCTURED_SCORES_ENABLED and requests else previous
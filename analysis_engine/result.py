@@ -0,0 +1,65 @@
+"""The result of one analysis - the single unit the pipeline, caches, stores and renderers pass around"""
+import dataclasses
+import hashlib
+import json
+
+from .store import is_missing_output, output_digests
+from .utils import is_failed_response
+
+@dataclasses.dataclass(frozen=True, slots=True, eq=False)
+class AnalysisResult:
+    """
+    Stage outputs and scores of a finished analysis, with how long each stage took and where the
+    result came from. Treat the dicts as read-only - the fingerprint is computed from them once.
+    Two results are equal, and hash equal, when their problem, outputs and scores are the same,
+    whichever run or resume produced them.
+    """
+    analysis_id: str
+    problem: str
+    outputs: dict             # Stage name -> cleaned output text, in API_CONFIGS order - a StoredOutputs once spilled
+    individual_scores: dict   # "Q1".."Q12" -> score read from each answer
+    dimension_scores: dict    # VUIA dimension -> score from the hardness summary
+    difficulty_score: float
+    timings: dict             # Stage name -> seconds it ran for, plus "total" - resumed stages have none
+    provenance: dict          # Run details - when it ran, resumed stages, traffic and the settings it ran with
+    fingerprint: str = dataclasses.field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Outputs are hashed by their handles, so a spilled result is fingerprinted without loading its texts
+        content = json.dumps([self.problem, output_digests(self.outputs), self.individual_scores, self.dimension_scores,
+                              self.difficulty_score], sort_keys=True, ensure_ascii=False)
+        object.__setattr__(self, "fingerprint", hashlib.sha256(content.encode("utf-8")).hexdigest())
+
+    def __eq__(self, other):
+        if not isinstance(other, AnalysisResult):
+            return NotImplemented
+        return self.fingerprint == other.fingerprint
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    @property
+    def traffic(self):
+        """Requests and bytes this analysis sent and received"""
+        return self.provenance.get("traffic", {})
+
+    @property
+    def failed_stages(self):
+        """Stages whose agency calls gave up - resuming the analysis reruns them"""
+        return [name for name, output in self.outputs.items() if is_failed_response(output)]
+
+    @property
+    def missing_stages(self):
+        """Stages whose stored output has expired - reopen_checkpoint() lets a resume restore them"""
+        return [name for name, output in self.outputs.items() if is_missing_output(output)]
+
+    def to_dict(self):
+        """Plain JSON-ready dict of the result, with its output texts and without the derived fingerprint"""
+        data = {field.name: getattr(self, field.name) for field in dataclasses.fields(self) if field.init}
+        data["outputs"] = dict(self.outputs)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a result from to_dict() output, ignoring keys it does not know"""
+        return cls(**{field.name: data[field.name] for field in dataclasses.fields(cls) if field.init})
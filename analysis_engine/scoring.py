@@ -0,0 +1,144 @@
+"""Scores of a finished analysis - structured score blocks first, the regex extractors as fallback"""
+import json
+import re
+
+from . import config
+from .extraction import extract_individual_scores, extract_score_from_answer_text, extract_summary_scores
+from .prompts import SUMMARY_SECTIONS, VUIA_MAPPING
+
+# ----------------------------- STRUCTURED SCORES -----------------------------
+# Where a score block can start - the decoder reads on from the brace and stops at the end of the object
+SCORE_BLOCK_START_PATTERN = re.compile(r'\{\s*"(?:score|justification|difficulty_score|dimension_scores|question_scores)"')
+SCORE_BLOCK_PATTERN = re.compile(r"\n*```json\s*\{.*?\}\s*```[ \t]*", re.DOTALL)
+
+_score_block_decoder = json.JSONDecoder()
+_structured_scores = {"stages": {}}
+
+def read_score_block(text):
+    """
+    Decode the last JSON score block in the text, or None if there is none or it is malformed.
+    raw_decode parses in place from each candidate brace, so the text is never sliced or re-scanned.
+    """
+    for start in reversed([match.start() for match in SCORE_BLOCK_START_PATTERN.finditer(text or "")]):
+        try:
+            block, _ = _score_block_decoder.raw_decode(text, start)
+        except ValueError:
+            continue
+        if isinstance(block, dict):
+            return block
+    return None
+
+def strip_score_block(text):
+    """Text with its fenced JSON score block removed, for display"""
+    return SCORE_BLOCK_PATTERN.sub("", text or "")
+
+def _block_score(value):
+    """A 0-5 score from a score block value, or None if it is missing or out of range"""
+    if isinstance(value, bool):
+        return None
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return None
+    return score if 0 <= score <= 5 else None
+
+def parse_answer_score_block(text):
+    """The score from a question answer's score block, or None to fall back to the regex extractor"""
+    block = read_score_block(text)
+    return _block_score(block.get("score")) if block else None
+
+def parse_summary_score_block(text):
+    """
+    The overall, dimension and question scores from a hardness summary's score block, or None to fall
+    back to the regex extractors. The overall and all four dimension scores must be present and in range.
+    """
+    block = read_score_block(text)
+    if not block or not isinstance(block.get("dimension_scores"), dict):
+        return None
+    difficulty_score = _block_score(block.get("difficulty_score"))
+    dimension_scores = {dimension: _block_score(block["dimension_scores"].get(dimension)) for dimension in VUIA_MAPPING}
+    if difficulty_score is None or None in dimension_scores.values():
+        return None
+    question_scores = block.get("question_scores")
+    individual_scores = {}
+    if isinstance(question_scores, dict):
+        for question in SUMMARY_SECTIONS[1:]:
+            score = _block_score(question_scores.get(question))
+            if score is not None:
+                individual_scores[question] = score
+    return {
+        "difficulty_score": difficulty_score,
+        "dimension_scores": dimension_scores,
+        "individual_scores": individual_scores or extract_individual_scores(text)
+    }
+
+def record_score_parse(stage, structured):
+    """Count a stage's score as read from its score block or from the regex fallback"""
+    counts = _structured_scores["stages"].setdefault(stage, {"structured": 0, "fallback": 0})
+    counts["structured" if structured else "fallback"] += 1
+
+def answer_score(text, stage=None):
+    """
+    Score of a question answer as extract_score_from_answer_text formats it - from the answer's score
+    block in structured mode, else from the regex extractor. Passing the stage counts which was used.
+    """
+    if config.STRUCTURED_SCORES_ENABLED:
+        score = parse_answer_score_block(text)
+        if stage:
+            record_score_parse(stage, score is not None)
+        if score is not None:
+            return f"{score:.1f}"
+    return extract_score_from_answer_text(text)
+
+def summary_scores(text, stage=None):
+    """extract_summary_scores, read from the summary's score block first in structured mode"""
+    if config.STRUCTURED_SCORES_ENABLED:
+        scores = parse_summary_score_block(text)
+        if stage:
+            record_score_parse(stage, scores is not None)
+        if scores is not None:
+            return scores
+    return extract_summary_scores(text)
+
+def get_structured_score_stats():
+    """Get per-stage counts of scores read from score blocks versus the regex fallback"""
+    stages = {stage: dict(counts) for stage, counts in _structured_scores["stages"].items()}
+    structured = sum(counts["structured"] for counts in stages.values())
+    total = structured + sum(counts["fallback"] for counts in stages.values())
+    return {
+        "enabled": config.STRUCTURED_SCORES_ENABLED,
+        "stages": stages,
+        "structured": structured,
+        "fallback": total - structured,
+        "structured_rate": structured / total if total else 0.0
+    }
+
+# ----------------------------- ANALYSIS SCORES -----------------------------
+def score_outputs(outputs):
+    """Extract the question, dimension and overall difficulty scores from the stage outputs"""
+    scores = {
+        "individual_scores": {},
+        "difficulty_score": 0.0,
+        "dimension_scores": {
+            "Volatility": 0.0,
+            "Ambiguity": 0.0,
+            "Interconnectedness": 0.0,
+            "Uncertainty": 0.0
+        }
+    }
+    
+    # Individual scores come from the actual answer texts to ensure consistency
+    for i in range(1, 13):
+        question_key = f"Q{i}"
+        if outputs.get(question_key):
+            extracted_score = answer_score(outputs[question_key], question_key)
+            if extracted_score != "N/A":
+                scores["individual_scores"][question_key] = float(extracted_score)
+    
+    # Overall and dimension scores come from the hardness_summary API
+    if outputs.get("hardness_summary"):
+        hardness_scores = summary_scores(outputs["hardness_summary"], "hardness_summary")
+        scores["difficulty_score"] = hardness_scores["difficulty_score"]
+        scores["dimension_scores"] = hardness_scores["dimension_scores"]
+    
+    return scores
@@ -0,0 +1,186 @@
+"""Stage output store - full output texts spilled to compressed on-disk blobs, with the hot ones kept in memory"""
+import collections
+import collections.abc
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+from . import config
+
+# ----------------------------- OUTPUT STORE -----------------------------
+PRUNE_INTERVAL_SECONDS = 3600  # Expired blobs are swept at most this often per process
+MISSING_OUTPUT_PREFIX = "Stored output missing"
+
+_output_store = {
+    "hot": collections.OrderedDict(),  # Handle -> text, least recently used first
+    "hot_bytes": 0,
+    "lock": threading.Lock(),
+    "last_prune": 0.0,
+    "counters": {"hits": 0, "misses": 0, "missing": 0, "spilled": 0, "written": 0, "written_bytes": 0,
+                 "compressed_bytes": 0, "pruned": 0}
+}
+
+def output_handle(text):
+    """Content-addressed handle of an output text - the same text always gets the same handle"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _blob_path(handle):
+    return os.path.join(config.OUTPUT_STORE_DIR, handle[:2], f"{handle}.z")
+
+def _remember(handle, text):
+    """Put a text at the hot end of the in-memory LRU, dropping the coldest past OUTPUT_CACHE_MAX_BYTES"""
+    hot = _output_store["hot"]
+    if handle in hot:
+        hot.move_to_end(handle)
+        return
+    hot[handle] = text
+    _output_store["hot_bytes"] += len(text)
+    while _output_store["hot_bytes"] > config.OUTPUT_CACHE_MAX_BYTES and len(hot) > 1:
+        _, dropped = hot.popitem(last=False)
+        _output_store["hot_bytes"] -= len(dropped)
+
+def spill_output(text):
+    """Write an output text to its compressed blob, unless it is already on disk, and return its handle"""
+    handle = output_handle(text)
+    path = _blob_path(handle)
+    try:
+        os.utime(path)  # A blob spilled again is touched, so it does not expire with the first result that wrote it
+    except FileNotFoundError:
+        data = zlib.compress(text.encode("utf-8"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a temporary name and renamed, so a reader never sees a partial blob
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        with _output_store["lock"]:
+            counters = _output_store["counters"]
+            counters["written"] += 1
+            counters["written_bytes"] += len(text.encode("utf-8"))
+            counters["compressed_bytes"] += len(data)
+    with _output_store["lock"]:
+        _output_store["counters"]["spilled"] += 1
+        _remember(handle, text)
+        prune_due = time.time() - _output_store["last_prune"] > PRUNE_INTERVAL_SECONDS
+        if prune_due:
+            _output_store["last_prune"] = time.time()
+    if prune_due:
+        prune_output_store()
+    return handle
+
+def missing_output_text(handle):
+    """What a stage whose blob expired or cannot be read shows instead of its text"""
+    return f"{MISSING_OUTPUT_PREFIX} - {handle[:12]} has expired or cannot be read. Resume the analysis to restore it."
+
+def is_missing_output(text):
+    """Check whether an output is the stand-in for a blob that has gone"""
+    return text.startswith(MISSING_OUTPUT_PREFIX)
+
+def load_output(handle):
+    """Get the text behind a handle - from memory if it is hot, else from its blob. missing_output_text() if the blob is gone."""
+    with _output_store["lock"]:
+        text = _output_store["hot"].get(handle)
+        if text is not None:
+            _output_store["hot"].move_to_end(handle)
+            _output_store["counters"]["hits"] += 1
+            return text
+        _output_store["counters"]["misses"] += 1
+    path = _blob_path(handle)
+    try:
+        with open(path, "rb") as f:
+            text = zlib.decompress(f.read()).decode("utf-8")
+        os.utime(path)  # Reading a blob keeps it from expiring
+    except (OSError, zlib.error):
+        with _output_store["lock"]:
+            _output_store["counters"]["missing"] += 1
+        return missing_output_text(handle)
+    with _output_store["lock"]:
+        _remember(handle, text)
+    return text
+
+def prune_output_store():
+    """Delete blobs that have not been written or read for OUTPUT_STORE_RETENTION_SECONDS"""
+    cutoff = time.time() - config.OUTPUT_STORE_RETENTION_SECONDS
+    pruned = 0
+    for directory, _, names in os.walk(config.OUTPUT_STORE_DIR):
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    pruned += 1
+            except OSError:
+                continue
+    with _output_store["lock"]:
+        _output_store["counters"]["pruned"] += pruned
+    return pruned
+
+class StoredOutputs(collections.abc.Mapping):
+    """
+    Read-only stage name -> output text mapping that holds only handles. Each text is loaded
+    from the store when it is read, so a finished analysis costs a few hundred bytes to keep.
+    """
+    __slots__ = ("handles",)
+
+    def __init__(self, handles):
+        self.handles = dict(handles)
+
+    @classmethod
+    def spill(cls, outputs):
+        """Spill every output text to the store and return the mapping of their handles"""
+        return cls({name: spill_output(text) for name, text in outputs.items()})
+
+    def __getitem__(self, name):
+        return load_output(self.handles[name])
+
+    def __contains__(self, name):
+        return name in self.handles
+
+    def __iter__(self):
+        return iter(self.handles)
+
+    def __len__(self):
+        return len(self.handles)
+
+    def __repr__(self):
+        return f"StoredOutputs({len(self.handles)} stages)"
+
+def output_digests(outputs):
+    """Stage name -> content hash of its output, read from the handles without loading stored texts"""
+    if isinstance(outputs, StoredOutputs):
+        return dict(outputs.handles)
+    return {name: output_handle(text) for name, text in outputs.items()}
+
+def get_output_store_stats():
+    """Get the store's hit/miss counts, the hot texts held in memory and what this process spilled to disk"""
+    with _output_store["lock"]:
+        stats = dict(_output_store["counters"], hot_entries=len(_output_store["hot"]),
+                     hot_bytes=_output_store["hot_bytes"])
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / total if total else 0.0
+    stats["enabled"] = config.OUTPUT_STORE_ENABLED
+    stats["max_hot_bytes"] = config.OUTPUT_CACHE_MAX_BYTES
+    stats["compression_ratio"] = stats["compressed_bytes"] / stats["written_bytes"] if stats["written_bytes"] else 0.0
+    return stats
+
+# ----------------------------- PROCESS MEMORY -----------------------------
+def get_process_memory():
+    """Get this process's current and peak resident memory in bytes - None where the platform does not report it"""
+    rss = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    peak = None
+    try:
+        import resource
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    except ImportError:
+        pass
+    return {"rss_bytes": rss, "peak_rss_bytes": peak}
@@ -0,0 +1,35 @@
+"""Agency response text helpers"""
+import re
+
+API_FAILURE_PREFIX = "API failed after"
+
+# ----------------------------- UTILITY FUNCTIONS -----------------------------
+def json_to_text(data):
+    """Convert JSON response to readable text"""
+    if data is None: 
+        return ""
+    if isinstance(data, str): 
+        return data
+    if isinstance(data, dict):
+        for key in ("result", "output", "content", "text"):
+            if key in data and data[key]:
+                return json_to_text(data[key])
+        if "data" in data: 
+            return json_to_text(data["data"])
+        return "\n".join(f"{k}: {json_to_text(v)}" for k, v in data.items() if v)
+    if isinstance(data, list): 
+        return "\n".join(json_to_text(x) for x in data if x)
+    return str(data)
+
+def clean_output(text):
+    """
+    Remove Markdown headers like ###, ##, # and leading/trailing whitespace
+    """
+    if not text:
+        return ""
+    text = re.sub(r"^#{1,6}\s*", "", text, flags=re.MULTILINE)
+    return text.strip()
+
+def is_failed_response(text):
+    """Check whether call_api gave up on a stage"""
+    return text.startswith(API_FAILURE_PREFIX)
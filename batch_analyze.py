@@ -0,0 +1,158 @@
+"""
+Headless batch analysis - runs the API_CONFIGS pipeline over a CSV or JSONL file of
+business problems without Streamlit, writing one JSON result row per problem.
+
+Usage:
+    python batch_analyze.py problems.csv --output results.jsonl --concurrency 4
+
+Input rows need "customer" and "problem" fields, and may carry an "id" and "industry".
+Results are appended as each analysis finishes, so an interrupted run can be resumed by
+running the same command again - rows that already completed are skipped, and rows that
+failed part-way only rerun their missing stages.
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+
+from analysis_engine import (
+    run_analysis_async,
+    run_sync,
+    shutdown_engine,
+    summary_scores,
+)
+
+DEFAULT_CONCURRENCY = 4  # Analyses in flight at once - each one runs up to 12 stages in parallel
+
+def read_problems(path):
+    """Read (customer, problem) rows from a CSV or JSONL file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".json")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    problems = []
+    for row in rows:
+        customer = (row.get("customer") or "").strip()
+        problem = (row.get("problem") or "").strip()
+        if not problem:
+            continue
+        row_id = str(row.get("id") or "").strip()
+        if not row_id:
+            row_id = hashlib.sha1(f"{customer}\n{problem}".encode("utf-8")).hexdigest()[:16]
+        problems.append({
+            "id": row_id,
+            "customer": customer,
+            "industry": (row.get("industry") or "").strip(),
+            "problem": problem
+        })
+    return problems
+
+def read_completed_keys(path):
+    """
+    Get the batch_analysis_key of rows that already completed in a previous run of the same output
+    file - a later input that reuses an ID for another customer or problem does not match them
+    """
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue  # A partially written last line from an interrupted run
+            if row.get("status") == "done" and {"id", "customer", "problem"} <= row.keys():
+                completed.add(batch_analysis_key(row))
+    return completed
+
+def batch_analysis_key(row):
+    """Checkpoint key for a row - its ID together with the customer and problem it names"""
+    return hashlib.sha256(f"{row['id']}\n{row['customer']}\n{row['problem']}".encode("utf-8")).hexdigest()[:24]
+
+async def analyze_row(row, semaphore, use_cache=True, resume=True):
+    """Run the full pipeline for one row and build its result row"""
+    # Rows keep the same analysis ID across runs so a rerun resumes from their checkpointed stages - the
+    # customer and problem are hashed in, so files that reuse IDs like "1" never share checkpoints
+    analysis_id = f"batch-{batch_analysis_key(row)}" if resume else None
+    async with semaphore:
+        started = time.time()
+        result_row = dict(row, status="done", error=None)
+        try:
+            result = await run_analysis_async(row["problem"], use_cache=use_cache, analysis_id=analysis_id)
+        except Exception as e:
+            result_row.update(status="failed", error=str(e), elapsed_seconds=round(time.time() - started, 2))
+            return result_row
+
+    if result.failed_stages:
+        result_row.update(status="failed", error=f"Stages failed: {', '.join(result.failed_stages)}")
+
+    result_row.update(
+        difficulty_score=result.difficulty_score,
+        dimension_scores=result.dimension_scores,
+        individual_scores=result.individual_scores,
+        summary_individual_scores=summary_scores(result.outputs.get("hardness_summary", ""))["individual_scores"],
+        traffic=result.traffic,
+        timings=result.timings,
+        fingerprint=result.fingerprint,
+        outputs=dict(result.outputs),
+        elapsed_seconds=round(time.time() - started, 2)
+    )
+    return result_row
+
+async def run_batch(problems, output_path, concurrency, use_cache=True, resume=True):
+    """Analyze every problem, appending each result row to the output file as soon as it finishes"""
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [asyncio.ensure_future(analyze_row(row, semaphore, use_cache, resume)) for row in problems]
+    counts = {"done": 0, "failed": 0}
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        for i, task in enumerate(asyncio.as_completed(tasks), start=1):
+            result_row = await task
+            out.write(json.dumps(result_row, ensure_ascii=False) + "\n")
+            out.flush()
+            counts[result_row["status"]] += 1
+            score = result_row.get("difficulty_score")
+            print(f"[{i}/{len(tasks)}] {result_row['id']} {result_row['status']}"
+                  + (f" - difficulty {score:.2f}" if score is not None else ""), file=sys.stderr)
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score business problem statements without the Streamlit UI")
+    parser.add_argument("input", help="CSV or JSONL file with customer and problem fields")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL file to append result rows to")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Number of analyses to run at once")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Re-run every row from scratch, including ones that already completed")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the response cache and call every agency")
+    args = parser.parse_args(argv)
+
+    problems = read_problems(args.input)
+    if not args.no_resume:
+        completed = read_completed_keys(args.output)
+        skipped = sum(1 for row in problems if batch_analysis_key(row) in completed)
+        problems = [row for row in problems if batch_analysis_key(row) not in completed]
+        if skipped:
+            print(f"Resuming - skipping {skipped} completed rows", file=sys.stderr)
+
+    if not problems:
+        print("Nothing to analyze", file=sys.stderr)
+        return 0
+
+    try:
+        counts = run_sync(run_batch(problems, args.output, max(1, args.concurrency),
+                                    use_cache=not args.no_cache, resume=not args.no_resume))
+    finally:
+        shutdown_engine()
+    print(f"Finished: {counts['done']} done, {counts['failed']} failed", file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
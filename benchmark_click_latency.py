@@ -0,0 +1,144 @@
+"""
+Benchmark click-to-render latency of the running Streamlit app.
+
+Connects to the app's websocket the way a browser tab does, runs one analysis, then clicks the
+vocabulary toggle, the VUIA cards and the sidebar page buttons, timing each click from sending
+it to the end of the script run it triggered and counting the bytes the page was sent. The
+browser's paint comes after that. Ends with what the app's Render Timings expander shows.
+
+Speaks Streamlit's internal websocket protocol, so it is tied to the installed Streamlit's
+protobufs. Point the app at mock_talos_server.py to keep the analysis fast and offline.
+
+Usage:
+    python mock_talos_server.py --port 8765 --latency 0.05
+    TALOS_AGENCY_URL=http://127.0.0.1:8765/talos-engine/agency streamlit run "Application1 2.py"
+    python benchmark_click_latency.py ws://localhost:8501/_stcore/stream --clicks 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+PROBLEM = ("Weekly demand planning across regions is slow and inconsistent, "
+           "and store managers override the forecast by hand.")
+VUIA_BUTTON_KEYS = ["volatility_btn_page3", "ambiguity_btn_page3", "interconnectedness_btn_page3",
+                    "uncertainty_btn_page3"]
+WIDGET_ELEMENTS = ("button", "selectbox", "text_area", "checkbox")
+
+class AppSession:
+    """One browser tab's worth of state - the widgets it has been sent and the values it sends back"""
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}  # Widget ID -> (label, fragment ID)
+        self.values = {}   # Widget ID -> (WidgetState field, value), sent with every rerun like the browser does
+        self.captions = []
+        self.page_script_hash = ""
+
+    def find(self, key_or_label):
+        """Get the ID and fragment of the widget with this key or label"""
+        for widget_id, (label, fragment_id) in self.widgets.items():
+            if widget_id.endswith(f"-{key_or_label}") or label == key_or_label:
+                return widget_id, fragment_id
+        raise KeyError(f"No widget {key_or_label!r} on the page")
+
+    async def rerun(self, clicked=None, timeout=300):
+        """Send a rerun, clicking a button if given, and wait for it - returns seconds, bytes received and script runs"""
+        fragment_id = ""
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.page_script_hash = self.page_script_hash
+        for widget_id, (field, value) in self.values.items():
+            state = client_state.widget_states.widgets.add(id=widget_id)
+            setattr(state, field, value)
+        if clicked:
+            widget_id, fragment_id = self.find(clicked)
+            client_state.widget_states.widgets.add(id=widget_id, trigger_value=True)
+            client_state.fragment_id = fragment_id
+        self.captions = []
+
+        started = time.perf_counter()
+        await self.ws.send(message.SerializeToString())
+        received = runs = 0
+        while True:
+            raw = await asyncio.wait_for(self.ws.recv(), timeout)
+            received += len(raw)
+            forward = ForwardMsg()
+            forward.ParseFromString(raw)
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                self.page_script_hash = forward.new_session.page_script_hash
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self._read_element(forward.delta)
+            elif kind == "script_finished":
+                runs += 1
+                # A click handled with st.rerun() finishes early and runs the script again
+                if forward.script_finished != ForwardMsg.ScriptFinishedStatus.FINISHED_EARLY_FOR_RERUN:
+                    return time.perf_counter() - started, received, runs
+
+    def _read_element(self, delta):
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind in WIDGET_ELEMENTS:
+            widget = getattr(element, kind)
+            self.widgets[widget.id] = (widget.label, delta.fragment_id)
+        elif kind == "markdown":
+            self.captions.append(element.markdown.body)
+
+async def time_clicks(session, buttons):
+    """Click each button in turn - returns per-click seconds, bytes and script runs"""
+    results = [await session.rerun(button) for button in buttons]
+    return [seconds for seconds, _, _ in results], [size for _, size, _ in results], [runs for _, _, runs in results]
+
+async def benchmark(url, clicks):
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        session = AppSession(ws)
+        await session.rerun()
+        session.values[session.find("customer_select")[0]] = ("string_value", "Walmart")
+        await session.rerun()
+        session.values[session.find("problem_text_area")[0]] = ("string_value", PROBLEM)
+        await session.rerun()
+        seconds, _, _ = await session.rerun("🚀 Analyze Business Problem")
+        print(f"Analysis finished in {seconds:.1f}s\n")
+
+        # Region -> (the sidebar button that opens its page, the buttons clicked in turn)
+        regions = {
+            "Vocabulary toggle": (None, ["toggle_vocab_btn"] * clicks),
+            "VUIA card selection": ("sidebar_Page_3_VUIA_Dimensions",
+                                    [VUIA_BUTTON_KEYS[i % len(VUIA_BUTTON_KEYS)] for i in range(clicks)]),
+            "Sidebar page switch": (None, [("sidebar_Page_2_Analysis", "sidebar_Page_3_VUIA_Dimensions")[i % 2]
+                                           for i in range(clicks)])
+        }
+
+        print(f"{'click':<22}{'median ms':>11}{'p90 ms':>9}{'median KB':>11}{'runs':>6}")
+        for region, (page_button, buttons) in regions.items():
+            if page_button:
+                await session.rerun(page_button)
+            timings, sizes, runs = await time_clicks(session, buttons)
+            ordered = sorted(timings)
+            print(f"{region:<22}{statistics.median(timings) * 1000:>11.0f}"
+                  f"{ordered[int(0.9 * (len(ordered) - 1))] * 1000:>9.0f}"
+                  f"{statistics.median(sizes) / 1024:>11.1f}{statistics.median(runs):>6.0f}")
+
+        # A plain rerun redraws the sidebar, and with it the Render Timings expander
+        await session.rerun()
+        expander = [caption for caption in session.captions if " ms over " in caption]
+        print("\nRender Timings expander:" if expander else "\nNo Render Timings expander in this version")
+        for caption in expander:
+            print(f"  {caption}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark click-to-render latency of the running Streamlit app")
+    parser.add_argument("url", nargs="?", default="ws://localhost:8501/_stcore/stream",
+                        help="The app's websocket URL")
+    parser.add_argument("-n", "--clicks", type=int, default=20, help="Clicks timed per region")
+    args = parser.parse_args(argv)
+    asyncio.run(benchmark(args.url, max(1, args.clicks)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
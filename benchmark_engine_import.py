@@ -0,0 +1,55 @@
+"""
+Benchmark the cold-start import time of the analysis_engine package.
+
+Each entry point is imported in a fresh interpreter, the way a worker, CLI or Streamlit
+script would start, and is reported with its median import time and which of the heavy
+dependencies (asyncio, sqlite3, aiohttp) it loaded.
+
+Usage:
+    python benchmark_engine_import.py --repeats 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Entry point -> the import it runs, from the lightest to the whole pipeline
+ENTRY_POINTS = {
+    "package": "import analysis_engine",
+    "extractors": "from analysis_engine import extract_summary_scores, extract_score_from_answer_text",
+    "scoring": "from analysis_engine import answer_score, score_outputs, summary_scores",
+    "prompts": "from analysis_engine import API_CONFIGS, VUIA_MAPPING",
+    "pipeline": "from analysis_engine import run_analysis_async, submit_analysis_job",
+    "first request": "from analysis_engine import get_http_session; import aiohttp"
+}
+
+MEASURE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in ("asyncio", "sqlite3", "aiohttp") if m in sys.modules]}}))
+"""
+
+def measure(statement):
+    """Import time and loaded heavy dependencies of one statement in a fresh interpreter"""
+    output = subprocess.run([sys.executable, "-c", MEASURE.format(statement=statement)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark analysis_engine cold-start import time")
+    parser.add_argument("-r", "--repeats", type=int, default=10, help="Fresh interpreters per entry point")
+    args = parser.parse_args(argv)
+
+    print(f"{'entry point':<16}{'median ms':>11}{'worst ms':>10}  loaded")
+    for name, statement in ENTRY_POINTS.items():
+        runs = [measure(statement) for _ in range(max(1, args.repeats))]
+        timings = [run["seconds"] for run in runs]
+        print(f"{name:<16}{statistics.median(timings) * 1000:>11.1f}{max(timings) * 1000:>10.1f}  "
+              f"{', '.join(runs[-1]['loaded']) or '-'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
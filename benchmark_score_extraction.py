@@ -0,0 +1,257 @@
+"""
+Benchmark the extract_* score functions over a corpus of hardness summaries and question answers.
+
+The corpus is synthetic text from 1 KB to 1 MB in two layouts - paragraphs, like real agency
+output, and a single unbroken line, which is the worst case for the patterns' leading .*? -
+plus the mock server's canned answers and, optionally, real outputs captured by batch_analyze.py.
+Each function is reported with its throughput, worst-case time and which pattern it matched,
+and its result is checked against the reference implementation - the same patterns applied
+one re.search/re.findall at a time, as the extractors did before the single-pass engine.
+
+Usage:
+    python benchmark_score_extraction.py --corpus results.jsonl --repeats 5 --json timings.json
+"""
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+
+from analysis_engine import (
+    ANSWER_SCORE_PATTERNS,
+    DIFFICULTY_CALCULATED_PATTERNS,
+    DIFFICULTY_FALLBACK_PATTERNS,
+    DIMENSION_AVERAGE_PATTERNS,
+    DIMENSION_PATTERNS,
+    INDIVIDUAL_SCORE_PATTERNS,
+    extract_difficulty_score,
+    extract_dimension_scores,
+    extract_individual_scores,
+    extract_score_from_answer_text,
+)
+from mock_talos_server import hardness_summary, question_answer
+
+SIZES = [1 << 10, 1 << 12, 1 << 14, 1 << 16, 1 << 18, 1 << 20]
+SINGLE_LINE_MAX_SIZE = 1 << 13  # The reference grows super-linearly on single-line text - larger sizes take minutes to verify
+
+# Prose that mentions the dimensions and scores without giving any, so patterns have to scan past it
+FILLER = (
+    "The volatility of demand makes weekly planning hard for the regional teams. "
+    "Ownership of the pricing decision is ambiguous, and the overall score depends on how interconnected "
+    "the inventory, promotion and supply systems are. Uncertainty about competitor moves adds to the difficulty."
+)
+
+def reference_first_score(patterns, text):
+    index = first_match(patterns, text)
+    return float(re.search(patterns[index], text, re.IGNORECASE).group(1)) if index is not None else None
+
+def reference_difficulty_score(text):
+    for patterns in (DIFFICULTY_CALCULATED_PATTERNS, DIFFICULTY_FALLBACK_PATTERNS):
+        score = reference_first_score(patterns, text)
+        if score is not None:
+            return min(5, max(0, score))
+    dimension_scores = reference_dimension_scores(text)
+    if any(score > 0 for score in dimension_scores.values()):
+        return min(5, max(0, sum(dimension_scores.values()) / len(dimension_scores)))
+    return 0.0
+
+def reference_dimension_scores(text):
+    scores = {dimension: reference_first_score(patterns, text) or 0.0
+              for dimension, patterns in DIMENSION_AVERAGE_PATTERNS.items()}
+    if not all(scores.values()):
+        for dimension, patterns in DIMENSION_PATTERNS.items():
+            if scores[dimension] == 0.0:
+                scores[dimension] = reference_first_score(patterns, text) or 0.0
+    return scores
+
+def reference_individual_scores(text):
+    scores = {}
+    for i in range(1, 13):
+        score = reference_first_score([pattern.format(i=i) for pattern in INDIVIDUAL_SCORE_PATTERNS], text)
+        if score is not None:
+            scores[f"Q{i}"] = score
+    return scores
+
+def reference_score_from_answer_text(text):
+    all_scores = [float(match) for pattern in ANSWER_SCORE_PATTERNS
+                  for match in re.findall(pattern, text, re.IGNORECASE) if 0 <= float(match) <= 5]
+    return f"{all_scores[-1]:.1f}" if all_scores else "N/A"
+
+# Functions run on each kind of document, as the app and batch_analyze.py use them, with their references
+EXTRACTORS = {
+    "summary": [
+        (extract_difficulty_score, reference_difficulty_score),
+        (extract_dimension_scores, reference_dimension_scores),
+        (extract_individual_scores, reference_individual_scores)
+    ],
+    "answer": [(extract_score_from_answer_text, reference_score_from_answer_text)]
+}
+
+def padded(filler_size, tail, single_line):
+    """filler_size characters of filler prose followed by tail"""
+    separator = " " if single_line else "\n\n"
+    text = separator.join([FILLER] * (filler_size // (len(FILLER) + len(separator)) + 1))[:filler_size]
+    return text + separator + (tail.replace("\n", " ") if single_line else tail)
+
+def build_corpus(sizes=SIZES, single_line_max_size=SINGLE_LINE_MAX_SIZE, captured_path=None):
+    """List (name, kind, text) documents - every size, layout and score placement, plus captured outputs"""
+    summary = hardness_summary("benchmark")
+    answer = question_answer("Q1", "benchmark")
+    corpus = [("canned", "summary", summary), ("canned", "answer", answer)]
+    for single_line in (False, True):
+        layout = "single-line" if single_line else "paragraphs"
+        for size in sizes:
+            if single_line and size > single_line_max_size:
+                continue
+            corpus += [
+                (f"{layout} {size // 1024}KB", "summary", padded(size - len(summary), summary, single_line)),
+                (f"{layout} {size // 1024}KB", "answer", padded(size - len(answer), answer, single_line)),
+                (f"{layout} {size // 1024}KB no score", "summary", padded(size, "", single_line)),
+                (f"{layout} {size // 1024}KB no score", "answer", padded(size, "", single_line))
+            ]
+    if captured_path:
+        corpus += read_captured(captured_path)
+    return corpus
+
+def read_captured(path):
+    """Real hardness summaries and question answers from a batch_analyze.py results file"""
+    documents = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            for stage, text in (row.get("outputs") or {}).items():
+                if stage == "hardness_summary":
+                    documents.append((f"captured {row['id']}", "summary", text))
+                elif re.fullmatch(r"Q\d+", stage):
+                    documents.append((f"captured {row['id']} {stage}", "answer", text))
+    return documents
+
+def first_match(patterns, text):
+    """Index of the first pattern whose match parses as a score, as the extractors pick it"""
+    for index, pattern in enumerate(patterns):
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            try:
+                float(match.group(1))
+                return index
+            except ValueError:
+                continue
+    return None
+
+def matched_pattern(function, text):
+    """Describe which pattern list entry decided the function's result"""
+    if function is extract_difficulty_score:
+        index = first_match(DIFFICULTY_CALCULATED_PATTERNS, text)
+        if index is not None:
+            return f"calculated[{index}]"
+        index = first_match(DIFFICULTY_FALLBACK_PATTERNS, text)
+        return f"fallback[{index}]" if index is not None else "dimension average"
+    if function is extract_dimension_scores:
+        labels = []
+        for dimension in DIMENSION_AVERAGE_PATTERNS:
+            index = first_match(DIMENSION_AVERAGE_PATTERNS[dimension], text)
+            if index is None:
+                index = first_match(DIMENSION_PATTERNS[dimension], text)
+                labels.append(f"{dimension[0]}:dim[{index}]" if index is not None else f"{dimension[0]}:-")
+            else:
+                labels.append(f"{dimension[0]}:avg[{index}]")
+        return " ".join(labels)
+    if function is extract_individual_scores:
+        counts = {}
+        for i in range(1, 13):
+            index = first_match([pattern.format(i=i) for pattern in INDIVIDUAL_SCORE_PATTERNS], text)
+            label = f"[{index}]" if index is not None else "-"
+            counts[label] = counts.get(label, 0) + 1
+        return " ".join(f"{label}x{count}" for label, count in sorted(counts.items()))
+    # The last pattern with an in-range score wins
+    last = None
+    for index, pattern in enumerate(ANSWER_SCORE_PATTERNS):
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            try:
+                if 0 <= float(match) <= 5:
+                    last = index
+            except ValueError:
+                continue
+    return f"[{last}]" if last is not None else "none"
+
+def time_call(function, text, repeats, budget_seconds):
+    """Time repeated calls, stopping early once they have used budget_seconds"""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function(text)
+        timings.append(time.perf_counter() - started)
+        if sum(timings) > budget_seconds:
+            break
+    return timings
+
+def run_benchmark(corpus, repeats, budget_seconds, explain=True, reference=False, verify=True):
+    """Time every extractor (or its reference) over every document of its kind and return one row per call"""
+    rows = []
+    for name, kind, text in corpus:
+        for function, reference_function in EXTRACTORS[kind]:
+            timed = reference_function if reference else function
+            timings = time_call(timed, text, repeats, budget_seconds)
+            median = statistics.median(timings)
+            identical = function(text) == reference_function(text) if verify else None
+            rows.append({
+                "function": function.__name__,
+                "document": name,
+                "bytes": len(text.encode("utf-8")),
+                "median_seconds": median,
+                "worst_seconds": max(timings),
+                "mb_per_second": len(text.encode("utf-8")) / 1e6 / median if median else float("inf"),
+                "matched": matched_pattern(function, text) if explain else "",
+                "identical": identical
+            })
+            flag = {True: "", False: "  MISMATCH", None: ""}[identical]
+            print(f"{function.__name__:<32}{name:<32}{rows[-1]['bytes']:>9}{median * 1000:>11.2f}"
+                  f"{max(timings) * 1000:>11.2f}{rows[-1]['mb_per_second']:>9.2f}  {rows[-1]['matched']}{flag}",
+                  flush=True)
+    return rows
+
+def summarize(rows):
+    print("\nPer function:")
+    for function in dict.fromkeys(row["function"] for row in rows):
+        selected = [row for row in rows if row["function"] == function]
+        worst = max(selected, key=lambda row: row["worst_seconds"])
+        total_bytes = sum(row["bytes"] for row in selected)
+        total_seconds = sum(row["median_seconds"] for row in selected)
+        print(f"  {function:<32}{total_bytes / 1e6 / total_seconds:>8.2f} MB/s overall · worst "
+              f"{worst['worst_seconds'] * 1000:.1f} ms on {worst['document']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the score extraction functions")
+    parser.add_argument("--corpus", help="batch_analyze.py results file whose outputs are added to the corpus")
+    parser.add_argument("-r", "--repeats", type=int, default=5, help="Timed calls per function per document")
+    parser.add_argument("--budget", type=float, default=2.0,
+                        help="Seconds of repeats per function per document before moving on")
+    parser.add_argument("--max-size", type=int, default=SIZES[-1], help="Largest synthetic document in bytes")
+    parser.add_argument("--single-line-max-size", type=int, default=SINGLE_LINE_MAX_SIZE,
+                        help="Largest single-line synthetic document in bytes")
+    parser.add_argument("--no-explain", action="store_true", help="Skip working out which pattern matched")
+    parser.add_argument("--reference", action="store_true",
+                        help="Time the pattern-at-a-time reference implementations instead of the extractors")
+    parser.add_argument("--no-verify", action="store_true", help="Skip checking results against the references")
+    parser.add_argument("--json", help="Write the timing rows to this file, for comparing runs")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus([size for size in SIZES if size <= args.max_size], args.single_line_max_size, args.corpus)
+    print(f"{'function':<32}{'document':<32}{'bytes':>9}{'median ms':>11}{'worst ms':>11}{'MB/s':>9}  matched")
+    rows = run_benchmark(corpus, max(1, args.repeats), args.budget, explain=not args.no_explain,
+                         reference=args.reference, verify=not args.no_verify)
+    summarize(rows)
+    mismatches = [row for row in rows if row["identical"] is False]
+    if mismatches:
+        print(f"\n{len(mismatches)} results differ from the reference implementation", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Benchmark the compacted hardness_summary prompt against the full-context one.
+
+For each problem the stages before hardness_summary are run once (answered from the response
+cache when possible), then hardness_summary is called with both prompts, bypassing the cache,
+and their prompt size, latency and extracted overall difficulty score are compared.
+
+Usage:
+    python benchmark_summary_compaction.py problems.csv --repeats 3 --budget 6000
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from analysis_engine import (
+    API_CONFIGS,
+    call_api_async,
+    config,
+    extract_difficulty_score,
+    is_failed_response,
+    run_stages_async,
+    run_sync,
+)
+from batch_analyze import read_problems
+
+SUMMARY_CONFIG = next(api for api in API_CONFIGS if api["name"] == "hardness_summary")
+
+def summary_config(compact):
+    """The hardness_summary config with its prompt pinned to the full or compacted context"""
+    def prompt(problem, outputs):
+        enabled = config.SUMMARY_COMPACTION_ENABLED
+        config.SUMMARY_COMPACTION_ENABLED = compact
+        try:
+            return SUMMARY_CONFIG["prompt"](problem, outputs)
+        finally:
+            config.SUMMARY_COMPACTION_ENABLED = enabled
+    return dict(SUMMARY_CONFIG, prompt=prompt)
+
+async def benchmark_problem(problem, repeats):
+    """Time both hardness_summary prompts for one problem and extract their overall scores"""
+    upstream = [api for api in API_CONFIGS if api["name"] != "hardness_summary"]
+    outputs = await run_stages_async(problem, upstream)
+    if any(is_failed_response(output) for output in outputs.values()):
+        return None
+
+    result = {}
+    for mode, compact in (("full", False), ("compact", True)):
+        api_cfg = summary_config(compact)
+        latencies, scores = [], []
+        for _ in range(repeats):
+            started = time.monotonic()
+            text = await call_api_async(api_cfg, problem, outputs, use_cache=False)
+            latencies.append(time.monotonic() - started)
+            if not is_failed_response(text):
+                scores.append(extract_difficulty_score(text))
+        result[mode] = {
+            "prompt_chars": len(api_cfg["prompt"](problem, outputs)),
+            "latency": statistics.median(latencies),
+            "score": statistics.mean(scores) if scores else None
+        }
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the compacted and full-context hardness_summary prompts")
+    parser.add_argument("input", help="CSV or JSONL file with customer and problem fields")
+    parser.add_argument("-n", "--limit", type=int, default=5, help="Number of problems to benchmark")
+    parser.add_argument("-r", "--repeats", type=int, default=3, help="Calls per prompt per problem")
+    parser.add_argument("-b", "--budget", type=int, default=config.SUMMARY_CONTEXT_BUDGET_CHARS,
+                        help="Character budget for the compacted digests")
+    args = parser.parse_args(argv)
+    config.SUMMARY_CONTEXT_BUDGET_CHARS = args.budget
+
+    rows = []
+    print(f"{'id':<18}{'full chars':>11}{'compact':>9}{'full s':>9}{'compact s':>11}{'full score':>12}{'compact':>9}")
+    for row in read_problems(args.input)[:args.limit]:
+        result = run_sync(benchmark_problem(row["problem"], max(1, args.repeats)))
+        if result is None:
+            print(f"{row['id']:<18}upstream stages failed - skipped", file=sys.stderr)
+            continue
+        rows.append(result)
+        full, compact = result["full"], result["compact"]
+        fmt = lambda score: f"{score:.2f}" if score is not None else "N/A"
+        print(f"{row['id']:<18}{full['prompt_chars']:>11}{compact['prompt_chars']:>9}{full['latency']:>9.2f}"
+              f"{compact['latency']:>11.2f}{fmt(full['score']):>12}{fmt(compact['score']):>9}")
+
+    if not rows:
+        return 1
+    scored = [r for r in rows if r["full"]["score"] is not None and r["compact"]["score"] is not None]
+    print(f"\nPrompt size: {statistics.mean(r['compact']['prompt_chars'] / r['full']['prompt_chars'] for r in rows):.0%}"
+          f" of full context")
+    print(f"Median latency: {statistics.median(r['full']['latency'] for r in rows):.2f}s full, "
+          f"{statistics.median(r['compact']['latency'] for r in rows):.2f}s compact")
+    if scored:
+        print(f"Overall score: mean absolute difference "
+              f"{statistics.mean(abs(r['full']['score'] - r['compact']['score']) for r in scored):.2f} "
+              f"over {len(scored)} problems")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Local stand-in for the talos reasoning_api, for load testing and benchmarking the pipeline
+without touching the production endpoint.
+
+It accepts the same POST body as the real agencies (agency_goal, multiround_convo, user_id)
+and answers {"result": ...} with canned VUIA-style text that the extract_* functions parse -
+question answers carry a "Score (0–5)" line and the hardness summary carries the dimension
+averages and overall difficulty score worked out from the question scores in its prompt.
+
+Latency, error, 429 and timeout behaviour is set per agency_id in a JSON profile file:
+
+    {
+        "default": {"latency_median": 0.8, "latency_sigma": 0.5, "error_rate": 0.02},
+        "agencies": {"1758619658634": {"latency_median": 4.0, "rate_limit_rate": 0.1}}
+    }
+
+Usage:
+    python mock_talos_server.py --port 8080 --profiles profiles.json
+    TALOS_AGENCY_URL=http://127.0.0.1:8080/talos-engine/agency streamlit run "Application1 2.py"
+
+GET /stats returns request and outcome counts per agency_id.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import sys
+
+from aiohttp import web
+
+from analysis_engine import (
+    API_CONFIGS,
+    SCORE_BLOCK_REQUESTS,
+    VUIA_MAPPING,
+    extract_score_from_answer_text,
+    get_agency_id,
+)
+
+DEFAULT_PROFILE = {
+    "latency_median": 0.5,    # Seconds - latencies are log-normally distributed around this
+    "latency_sigma": 0.4,     # Spread of the log-normal distribution - higher gives a longer tail
+    "error_rate": 0.0,        # Fraction of requests answered with a 500
+    "rate_limit_rate": 0.0,   # Fraction of requests answered with a 429
+    "timeout_rate": 0.0,      # Fraction of requests that hang for timeout_seconds before answering
+    "timeout_seconds": 120.0,
+    "require_tenant_header": None  # e.g. "X-Tenant-ID" to reject requests without that header with a 401
+}
+
+STAGE_NAMES = {get_agency_id(api["url"]): api["name"] for api in API_CONFIGS}
+
+def load_profiles(path, overrides):
+    """Read the per-agency profiles, layering the file's default and the command line over DEFAULT_PROFILE"""
+    config = {}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    default = dict(DEFAULT_PROFILE, **config.get("default", {}), **overrides)
+    agencies = {agency_id: dict(default, **profile) for agency_id, profile in config.get("agencies", {}).items()}
+    return default, agencies
+
+def seeded_random(*parts):
+    """Random generator seeded from the request, so the same prompt always gets the same canned answer"""
+    return random.Random(hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest())
+
+def wants_score_block(kind, goal):
+    """Whether the prompt asks for a JSON score block, as it does in the engine's structured mode"""
+    return SCORE_BLOCK_REQUESTS[kind].strip() in goal
+
+def score_block(block):
+    return f"\n\n```json\n{json.dumps(block)}\n```"
+
+def question_answer(stage, goal):
+    # A follow-up round gets the previous answer as its goal and keeps its score
+    previous = re.search(r"Score \(0–5\): (\d)", goal)
+    score = int(previous.group(1)) if previous else seeded_random(stage, goal).randint(1, 5)
+    justification = (f"The evidence in the problem statement points to a score of {score} because "
+                     "the drivers are only partly observable and decisions depend on several teams.")
+    answer = (
+        f"### {stage} Analysis\n\n"
+        "The key inputs driving this business change on a mixed cadence - some follow seasonal cycles, "
+        "others move with customer behaviour and competitor actions that are hard to anticipate.\n\n"
+        f"**Score (0–5): {score}**\n\n"
+        f"**Justification:** {justification}"
+    )
+    if wants_score_block("question", goal):
+        answer += score_block({"score": score, "justification": justification})
+    return answer
+
+def hardness_summary(goal):
+    # A follow-up round gets the previous summary as its goal and restates it
+    if goal.startswith("### Hardness Summary"):
+        return goal.replace(SCORE_BLOCK_REQUESTS["summary"], "")
+    # Reuse the question scores from the prompt so the averages are consistent with them
+    rng = seeded_random("hardness_summary", goal)
+    found = {}
+    sections = re.split(r"^(Q\d+)\b", goal.replace(SCORE_BLOCK_REQUESTS["summary"], ""), flags=re.MULTILINE)
+    for question, section in zip(sections[1::2], sections[2::2]):
+        score = extract_score_from_answer_text(section)
+        if score != "N/A":
+            found[question] = float(score)
+    lines = ["### Hardness Summary\n"]
+    averages = {}
+    question_scores = {}
+    for dimension, questions in VUIA_MAPPING.items():
+        scores = [found.get(q, float(rng.randint(1, 5))) for q in questions]
+        for q, score in zip(questions, scores):
+            lines.append(f"- {q} Score: {score:.1f}/5")
+            question_scores[q] = score
+        averages[dimension] = sum(scores) / len(scores)
+        lines.append(f"Avg {dimension} = ({' + '.join(f'{s:.1f}' for s in scores)}) / 3 = {averages[dimension]:.2f}\n")
+    overall = sum(averages.values()) / len(averages)
+    lines.append(f"Overall Difficulty Score = ({' + '.join(f'{a:.2f}' for a in averages.values())}) / 4 = {overall:.2f}")
+    lines.append("\n**Key Takeaways:** Ambiguity in ownership and interconnected systems drive most of the difficulty.")
+    summary = "\n".join(lines)
+    if wants_score_block("summary", goal):
+        summary += score_block({"difficulty_score": round(overall, 2),
+                                "dimension_scores": {d: round(a, 2) for d, a in averages.items()},
+                                "question_scores": question_scores})
+    return summary
+
+def canned_answer(stage, goal):
+    """A VUIA-style answer for the stage an agency_id belongs to"""
+    if stage == "hardness_summary":
+        return hardness_summary(goal)
+    if stage and stage.startswith("Q"):
+        return question_answer(stage, goal)
+    if stage == "vocabulary":
+        words = sorted({w.strip(".,;:()").lower() for w in goal.split() if len(w) > 6})[:12]
+        return "### Vocabulary\n\n" + "\n".join(f"- **{w}**: domain term used in the problem statement" for w in words)
+    return (
+        "### Current System\n\n**Inputs:** transactional data, spreadsheets and manual reports.\n"
+        "**Outputs:** weekly plans reviewed by regional managers.\n"
+        "**Pain points:** slow hand-offs, inconsistent data definitions and little visibility across teams."
+    )
+
+def make_app(default, agencies):
+    stats = {}
+
+    async def reasoning_api(request):
+        agency_id = request.query.get("agency_id", "")
+        profile = agencies.get(agency_id, default)
+        agency_stats = stats.setdefault(agency_id, {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0,
+                                                    "timeouts": 0, "unauthorized": 0, "bad_requests": 0})
+        agency_stats["requests"] += 1
+
+        try:
+            body = await request.json()
+            goal = body["agency_goal"]
+        except (ValueError, KeyError, TypeError):
+            agency_stats["bad_requests"] += 1
+            return web.Response(status=400, text="Body must be JSON with an agency_goal")
+
+        if profile["require_tenant_header"] and profile["require_tenant_header"] not in request.headers:
+            agency_stats["unauthorized"] += 1
+            return web.Response(status=401, text=f"Missing {profile['require_tenant_header']} header")
+
+        roll = random.random()
+        if roll < profile["rate_limit_rate"]:
+            agency_stats["rate_limited"] += 1
+            return web.Response(status=429, text="Too many requests", headers={"Retry-After": "1"})
+        roll -= profile["rate_limit_rate"]
+        if roll < profile["error_rate"]:
+            agency_stats["errors"] += 1
+            return web.Response(status=500, text="Agency failed to reason")
+        roll -= profile["error_rate"]
+        if roll < profile["timeout_rate"]:
+            agency_stats["timeouts"] += 1
+            await asyncio.sleep(profile["timeout_seconds"])
+        else:
+            await asyncio.sleep(random.lognormvariate(0, profile["latency_sigma"]) * profile["latency_median"])
+
+        agency_stats["ok"] += 1
+        return web.json_response({"result": canned_answer(STAGE_NAMES.get(agency_id), goal)})
+
+    async def get_stats(request):
+        return web.json_response(stats)
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post("/talos-engine/agency/reasoning_api", reasoning_api)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local mock of the talos reasoning_api")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--profiles", help="JSON file with a default profile and per-agency_id overrides")
+    parser.add_argument("--latency", type=float, help="Median latency in seconds for every agency")
+    parser.add_argument("--error-rate", type=float, help="Fraction of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, help="Fraction of requests answered with a 429")
+    parser.add_argument("--timeout-rate", type=float, help="Fraction of requests that hang past the client timeout")
+    parser.add_argument("--seed", type=int, help="Seed for the latency and failure rolls")
+    args = parser.parse_args(argv)
+
+    overrides = {key: value for key, value in (("latency_median", args.latency), ("error_rate", args.error_rate),
+                                               ("rate_limit_rate", args.rate_limit_rate),
+                                               ("timeout_rate", args.timeout_rate)) if value is not None}
+    if args.seed is not None:
+        random.seed(args.seed)
+    default, agencies = load_profiles(args.profiles, overrides)
+    print(f"Mock talos agencies on http://{args.host}:{args.port}/talos-engine/agency", file=sys.stderr)
+    web.run_app(make_app(default, agencies), host=args.host, port=args.port, print=None)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
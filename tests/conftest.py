@@ -0,0 +1,50 @@
+"""
+Shared fixtures - the engine runs against an in-process mock_talos_server, with its caches,
+checkpoints and output blobs in a temporary directory.
+"""
+import os
+import socket
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+# The stage URLs are built from TALOS_AGENCY_URL when the engine is imported, so it is set first
+MOCK_PORT = _free_port()
+os.environ["TALOS_AGENCY_URL"] = f"http://127.0.0.1:{MOCK_PORT}/talos-engine/agency"
+
+import pytest
+from aiohttp import web
+
+from analysis_engine import cache, config, run_sync
+from mock_talos_server import DEFAULT_PROFILE, make_app
+
+@pytest.fixture(autouse=True)
+def engine_storage(tmp_path, monkeypatch):
+    """Point the response cache, checkpoints and output store at a fresh directory for each test"""
+    monkeypatch.setattr(config, "RESPONSE_CACHE_PATH", str(tmp_path / "agency_responses.sqlite3"))
+    monkeypatch.setattr(config, "CHECKPOINT_PATH", str(tmp_path / "analysis_checkpoints.sqlite3"))
+    monkeypatch.setattr(config, "OUTPUT_STORE_DIR", str(tmp_path / "outputs"))
+    for store in (cache._response_cache, cache._checkpoints):
+        if store["connection"] is not None:
+            store["connection"].close()
+        monkeypatch.setitem(store, "connection", None)
+    yield tmp_path
+
+@pytest.fixture(scope="session")
+def mock_agencies():
+    """Serve the mock talos agencies on MOCK_PORT for the whole test session"""
+    async def start():
+        runner = web.AppRunner(make_app(dict(DEFAULT_PROFILE, latency_median=0.01), {}))
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", MOCK_PORT).start()
+        return runner
+
+    runner = run_sync(start())
+    yield os.environ["TALOS_AGENCY_URL"]
+    run_sync(runner.cleanup())
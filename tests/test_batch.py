@@ -0,0 +1,15 @@
+import json
+
+from batch_analyze import batch_analysis_key, read_completed_keys
+
+def test_completed_rows_are_matched_by_customer_and_problem_not_id(tmp_path):
+    output = tmp_path / "results.jsonl"
+    done = {"id": "1", "customer": "Walmart", "industry": "Retail", "problem": "Demand planning is slow."}
+    failed = {"id": "2", "customer": "Pfizer", "industry": "Pharma", "problem": "Site selection is hard."}
+    output.write_text(json.dumps(dict(done, status="done")) + "\n" + json.dumps(dict(failed, status="failed")) + "\n"
+                      + '{"id": "3", "sta', encoding="utf-8")
+    completed = read_completed_keys(str(output))
+    assert batch_analysis_key(done) in completed
+    assert batch_analysis_key(failed) not in completed
+    # A later file that reuses ID "1" for another problem is not skipped
+    assert batch_analysis_key(dict(done, problem="Store replenishment is manual.")) not in completed
@@ -0,0 +1,77 @@
+import os
+
+from analysis_engine import run_analysis_async, run_sync, store
+from analysis_engine.cache import (finish_checkpoint, find_resumable_analysis, load_checkpoint, reopen_checkpoint,
+                                   save_stage_checkpoint, start_checkpoint)
+from batch_analyze import batch_analysis_key
+
+WALMART = "Walmart: weekly demand planning across regions is slow and inconsistent."
+PFIZER = "Pfizer: clinical trial site selection depends on several teams and changing regulations."
+
+def test_unfinished_analysis_resumes_its_saved_stages():
+    start_checkpoint("a1", WALMART)
+    save_stage_checkpoint("a1", "vocabulary", "walmart vocabulary")
+    finish_checkpoint("a1", complete=False)
+    assert load_checkpoint("a1", WALMART) == {"vocabulary": "walmart vocabulary"}
+
+def test_saved_stages_are_not_loaded_for_a_different_problem():
+    start_checkpoint("a1", WALMART)
+    save_stage_checkpoint("a1", "vocabulary", "walmart vocabulary")
+    finish_checkpoint("a1", complete=False)
+    assert load_checkpoint("a1", PFIZER) == {}
+    # Starting the other problem under the same ID drops the old stages for good
+    start_checkpoint("a1", PFIZER)
+    assert load_checkpoint("a1", WALMART) == {}
+
+def test_completed_analysis_is_not_replayed():
+    start_checkpoint("a1", WALMART)
+    save_stage_checkpoint("a1", "vocabulary", "walmart vocabulary")
+    finish_checkpoint("a1", complete=True)
+    assert load_checkpoint("a1", WALMART) == {}
+
+def test_resume_offer_is_superseded_by_a_later_complete_analysis():
+    start_checkpoint("a1", WALMART)
+    save_stage_checkpoint("a1", "vocabulary", "walmart vocabulary")
+    finish_checkpoint("a1", complete=False)
+    assert find_resumable_analysis(WALMART)["analysis_id"] == "a1"
+    start_checkpoint("a2", WALMART)
+    finish_checkpoint("a2", complete=True)
+    assert find_resumable_analysis(WALMART) is None
+    # A run that fails after the complete one is offered again
+    start_checkpoint("a3", WALMART)
+    finish_checkpoint("a3", complete=False)
+    assert find_resumable_analysis(WALMART)["analysis_id"] == "a3"
+
+def test_reused_analysis_id_runs_the_new_problem(mock_agencies):
+    first = run_sync(run_analysis_async(WALMART, use_cache=False, analysis_id="batch-1"))
+    second = run_sync(run_analysis_async(PFIZER, use_cache=False, analysis_id="batch-1"))
+    assert second.traffic["requests"] > 0
+    assert second.provenance["resumed_stages"] == []
+    assert dict(second.outputs)["vocabulary"] != dict(first.outputs)["vocabulary"]
+
+def test_expired_outputs_are_restored_by_resuming(mock_agencies):
+    first = run_sync(run_analysis_async(WALMART, use_cache=False, analysis_id="expiring"))
+    assert find_resumable_analysis(WALMART) is None
+    os.remove(store._blob_path(first.outputs.handles["Q1"]))
+    store._output_store["hot"].pop(first.outputs.handles["Q1"])
+    assert first.missing_stages == ["Q1"]
+
+    reopen_checkpoint(first.analysis_id, first.problem)
+    assert find_resumable_analysis(WALMART)["analysis_id"] == "expiring"
+    resumed = run_sync(run_analysis_async(WALMART, use_cache=False, analysis_id="expiring"))
+    assert resumed.missing_stages == []
+    assert resumed.traffic["requests"] == 0
+    assert resumed == first
+
+def test_reopen_leaves_an_id_used_for_another_problem_alone():
+    start_checkpoint("a1", WALMART)
+    finish_checkpoint("a1", complete=True)
+    reopen_checkpoint("a1", PFIZER)
+    assert find_resumable_analysis(WALMART) is None
+    assert find_resumable_analysis(PFIZER) is None
+
+def test_batch_keys_differ_for_reused_row_ids():
+    walmart = {"id": "1", "customer": "Walmart", "problem": WALMART}
+    pfizer = {"id": "1", "customer": "Pfizer", "problem": PFIZER}
+    assert batch_analysis_key(walmart) != batch_analysis_key(pfizer)
+    assert batch_analysis_key(walmart) == batch_analysis_key(dict(walmart))
@@ -0,0 +1,47 @@
+import pytest
+
+from analysis_engine import agency, config
+from analysis_engine.agency import CircuitOpenError, circuit_allow, circuit_record, get_circuit_stats
+
+ENDPOINT = "http://127.0.0.1/talos-engine/agency/reasoning_api"
+
+def agency_url(agency_id):
+    return f"{ENDPOINT}?society_id=1&agency_id={agency_id}&level=1"
+
+@pytest.fixture(autouse=True)
+def fresh_circuits(monkeypatch):
+    monkeypatch.setattr(agency, "_circuits", {})
+    monkeypatch.setattr(agency, "_endpoint_circuits", {})
+
+def test_failures_across_agencies_open_the_endpoint_circuit():
+    for agency_id in range(config.CIRCUIT_FAILURE_THRESHOLD):
+        circuit_allow(agency_url(agency_id))
+        circuit_record(agency_url(agency_id), True)
+    # An agency that has not been tried yet fails fast too
+    with pytest.raises(CircuitOpenError, match="endpoint"):
+        circuit_allow(agency_url("untried"))
+    stats = get_circuit_stats()
+    assert stats["endpoints"][ENDPOINT]["state"] == "open"
+    assert stats["agencies"]["0"]["state"] == "closed"
+
+def test_successes_elsewhere_keep_the_endpoint_closed():
+    for _ in range(config.CIRCUIT_FAILURE_THRESHOLD):
+        circuit_allow(agency_url("flaky"))
+        circuit_record(agency_url("flaky"), True)
+        circuit_allow(agency_url("healthy"))
+        circuit_record(agency_url("healthy"), False)
+    circuit_allow(agency_url("healthy"))
+    with pytest.raises(CircuitOpenError, match="agency flaky"):
+        circuit_allow(agency_url("flaky"))
+
+def test_rejected_request_holds_no_probe(monkeypatch):
+    for _ in range(config.CIRCUIT_FAILURE_THRESHOLD):
+        circuit_allow(agency_url("down"))
+        circuit_record(agency_url("down"), True)
+    # The endpoint and the agency circuits are both open - once they may probe, the endpoint's probe
+    # must not be taken by a request that another agency's circuit turns away
+    agency._circuits[agency_url("down")]["opened_at"] = float("inf")
+    monkeypatch.setitem(agency._endpoint_circuits[ENDPOINT], "opened_at", 0.0)
+    with pytest.raises(CircuitOpenError, match="agency down"):
+        circuit_allow(agency_url("down"))
+    circuit_allow(agency_url("other"))
@@ -0,0 +1,49 @@
+from analysis_engine import (agency, close_http_session, config, get_job, pipeline, run_analysis_async, run_sync,
+                             submit_analysis_job)
+from analysis_engine.cache import cache_get, response_cache_key
+
+PROBLEM = "Walmart: weekly demand planning across regions is slow and inconsistent."
+
+def test_close_http_session_closes_the_shared_session(mock_agencies):
+    run_sync(run_analysis_async(PROBLEM, use_cache=False, analysis_id="session-test"))
+    session = agency._http_session
+    assert session is not None and not session.closed
+    run_sync(close_http_session())
+    assert session.closed
+    assert agency._http_session is None
+    # The next analysis opens a fresh session
+    result = run_sync(run_analysis_async(PROBLEM, use_cache=False, analysis_id="session-test-2"))
+    assert not result.failed_stages
+
+def test_defaults_follow_config_set_after_import(mock_agencies, monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_DEADLINE_SECONDS", 0)
+    result = run_sync(run_analysis_async(PROBLEM, use_cache=False, analysis_id="deadline-test"))
+    assert len(result.failed_stages) == len(result.outputs)
+    assert result.traffic["requests"] == 0
+
+def test_job_semaphore_is_created_on_first_job(mock_agencies, monkeypatch):
+    monkeypatch.setattr(config, "MAX_CONCURRENT_JOBS", 1)
+    monkeypatch.setitem(pipeline.get_job_runner(), "semaphore", None)
+    job = get_job(submit_analysis_job(PROBLEM, use_cache=False))
+    job["future"].result(timeout=30)
+    assert job["status"] == "done"
+    assert pipeline.get_job_runner()["semaphore"]._value == 1
+
+def test_answer_with_a_failed_follow_up_round_is_not_cached(monkeypatch):
+    api_cfg = {"url": "http://127.0.0.1/talos-engine/agency?agency_id=multiround-test",
+               "prompt": lambda problem, outputs: f"Analyze: {problem}", "multiround_convo": 2}
+    statuses = [200, 500, 200, 200]
+
+    async def post_agency(session, url, headers, payload, deadline):
+        status = statuses.pop(0)
+        return status, {"response": f"round answer {status}"} if status == 200 else "Agency failed to reason"
+    monkeypatch.setattr(agency, "_post_agency", post_agency)
+    key = response_cache_key(api_cfg, api_cfg["prompt"](PROBLEM, {}), config.TENANT_ID)
+
+    first = agency.call_api(api_cfg, PROBLEM, {}, use_cache=True)
+    assert not agency.is_failed_response(first)
+    assert cache_get(key) is None
+    # The next call makes every round and caches the full answer
+    second = agency.call_api(api_cfg, PROBLEM, {}, use_cache=True)
+    assert not statuses
+    assert cache_get(key) == second
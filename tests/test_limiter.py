@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from analysis_engine import agency
+from analysis_engine.agency import AdaptiveLimiter, limit_agency_request
+
+AGENCY_URL = "http://127.0.0.1/talos-engine/agency?agency_id=limiter-test"
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_woken_then_cancelled_waiter_passes_its_wakeup_on():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", 1, 1)
+        await limiter.acquire()
+        first = asyncio.ensure_future(limiter.acquire())
+        second = asyncio.ensure_future(limiter.acquire())
+        await settle()
+        limiter.release(0.01, False)
+        # first is woken but cancelled before it gets to run
+        first.cancel()
+        await settle()
+        assert first.cancelled()
+        assert second.done()
+        assert limiter.in_flight == 1
+        assert not limiter.waiters
+    asyncio.run(scenario())
+
+def test_cancelled_request_gives_back_the_slots_it_took(monkeypatch):
+    async def scenario():
+        monkeypatch.setattr(agency, "_agency_limiters", {})
+        monkeypatch.setattr(agency, "_process_limiter", AdaptiveLimiter("process", 1, 1))
+        await agency._process_limiter.acquire()
+
+        async def send():
+            async with limit_agency_request(AGENCY_URL):
+                pass
+        task = asyncio.ensure_future(send())
+        await settle()
+        agency_limiter = agency._get_agency_limiter(AGENCY_URL)
+        assert agency_limiter.in_flight == 1
+        limit = agency_limiter.limit
+        task.cancel()
+        await settle()
+        assert agency_limiter.in_flight == 0
+        assert agency_limiter.limit == limit
+        assert not agency._process_limiter.waiters
+    asyncio.run(scenario())
+
+def test_request_cancelled_in_flight_leaves_the_limit_alone(monkeypatch):
+    async def scenario():
+        monkeypatch.setattr(agency, "_agency_limiters", {})
+        monkeypatch.setattr(agency, "_process_limiter", AdaptiveLimiter("process", 4, 4))
+        sent = asyncio.Event()
+
+        async def send():
+            async with limit_agency_request(AGENCY_URL):
+                sent.set()
+                await asyncio.sleep(10)
+        task = asyncio.ensure_future(send())
+        await sent.wait()
+        agency_limiter = agency._get_agency_limiter(AGENCY_URL)
+        agency_limiter.avg_latency = 1.0
+        limit = agency_limiter.limit
+        task.cancel()
+        await settle()
+        assert agency_limiter.in_flight == 0
+        assert agency_limiter.limit == limit
+        assert agency_limiter.avg_latency == 1.0
+        assert agency._process_limiter.avg_latency is None
+    asyncio.run(scenario())
+
+def test_acquire_gives_up_at_the_deadline():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", 1, 1)
+        await limiter.acquire()
+        try:
+            await limiter.acquire(time.monotonic() + 0.05)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("acquire waited past its deadline")
+        assert limiter.in_flight == 1
+        assert not limiter.waiters
+    asyncio.run(scenario())
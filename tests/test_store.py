@@ -0,0 +1,35 @@
+import collections
+import os
+
+import pytest
+
+from analysis_engine import AnalysisResult, store
+from analysis_engine.store import StoredOutputs, load_output, spill_output
+
+@pytest.fixture(autouse=True)
+def cold_store(monkeypatch):
+    """Start each test with nothing held in memory, so reads go to the blobs"""
+    monkeypatch.setitem(store._output_store, "hot", collections.OrderedDict())
+    monkeypatch.setitem(store._output_store, "hot_bytes", 0)
+
+def forget_hot_texts():
+    store._output_store["hot"].clear()
+    store._output_store["hot_bytes"] = 0
+
+def test_spilling_an_existing_blob_touches_it():
+    handle = spill_output("vocabulary text")
+    path = store._blob_path(handle)
+    os.utime(path, (0, 0))
+    assert spill_output("vocabulary text") == handle
+    assert os.path.getmtime(path) > 0
+    forget_hot_texts()
+    assert load_output(handle) == "vocabulary text"
+
+def test_missing_blob_shows_as_a_missing_stage():
+    outputs = StoredOutputs.spill({"vocabulary": "vocabulary text", "Q1": "Q1 answer"})
+    os.remove(store._blob_path(outputs.handles["Q1"]))
+    forget_hot_texts()
+    result = AnalysisResult("a1", "problem", outputs, {}, {}, 0.0, {}, {})
+    assert outputs["vocabulary"] == "vocabulary text"
+    assert result.missing_stages == ["Q1"]
+    assert result.failed_stages == []